@@ -1,26 +1,46 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime
+from typing import Optional
+from app.config import settings
 from app.database import get_db
 from app.models.user import User
-from app.schemas.user import UserCreate, UserLogin, UserResponse, TokenResponse, PasswordResetRequest, PasswordReset
-from app.core.security import verify_password, get_password_hash, create_access_token
-from app.utils.email import send_password_reset_email, generate_reset_token
+from app.schemas.user import UserCreate, UserLogin, UserResponse, TokenResponse, RefreshTokenRequest, PasswordResetRequest, PasswordReset
+from app.core.security import verify_password, get_password_hash, create_access_token, decode_access_token
+from app.core.deps import oauth2_scheme, get_current_user
+from app.services.token_service import refresh_tokens, reset_tokens, revocation_list
+from app.utils.email import queue_password_reset_email
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
-@router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
-    """Yeni kullanıcı kaydı"""
+def release_connection(db: Session, user: User):
+    """bcrypt süreç havuzunda beklenirken DB bağlantısını havuza geri ver (kullanıcı nesnesi expire olmadan)"""
+    db.expunge(user)
+    db.rollback()
+
+
+def issue_tokens(db: Session, user: User, refresh_token: Optional[str] = None) -> TokenResponse:
+    """Kısa ömürlü access token ve (verilmediyse yeni ailede) refresh token üret"""
     
-    # Şifrelerin eşleşmesi kontrolü
-    if user_data.password != user_data.password_confirm:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Şifreler eşleşmiyor"
-        )
+    user_response = UserResponse.model_validate(user)
+    
+    if refresh_token is None:
+        refresh_token = refresh_tokens.issue(db, user.id)
+        db.commit()
+    
+    return TokenResponse(
+        access_token=create_access_token(data={"sub": str(user.id)}),
+        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        refresh_token=refresh_token,
+        user=user_response
+    )
+
+
+def check_registration(db: Session, user_data: UserCreate):
+    """Kayıt bilgilerini kontrol et ve hash beklenirken DB bağlantısını havuza geri ver"""
     
     # Email kontrolü
     if db.query(User).filter(User.email == user_data.email).first():
@@ -36,32 +56,58 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
             detail="Bu kullanıcı adı zaten kullanımda"
         )
     
-    # Yeni kullanıcı oluştur
+    db.rollback()
+
+
+def create_user(db: Session, user_data: UserCreate, hashed_password: str) -> TokenResponse:
+    """Yeni kullanıcıyı kaydet ve token üret"""
+    
     new_user = User(
         username=user_data.username,
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password)
+        hashed_password=hashed_password
     )
     
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
     
-    # Token oluştur
-    access_token = create_access_token(data={"sub": str(new_user.id)})
+    return issue_tokens(db, new_user)
+
+
+@router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
+async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+    """Yeni kullanıcı kaydı"""
     
-    return TokenResponse(
-        access_token=access_token,
-        user=UserResponse.model_validate(new_user)
-    )
+    # Şifrelerin eşleşmesi kontrolü
+    if user_data.password != user_data.password_confirm:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Şifreler eşleşmiyor"
+        )
+    
+    # DB işleri threadpool'da; bcrypt süreç havuzunda iş parçacığı tutmadan beklenir
+    await run_in_threadpool(check_registration, db, user_data)
+    hashed_password = await get_password_hash(user_data.password)
+    
+    return await run_in_threadpool(create_user, db, user_data, hashed_password)
+
+
+def find_user_by_email(db: Session, email: str) -> Optional[User]:
+    """Kullanıcıyı bul ve bcrypt beklenirken DB bağlantısını havuza geri ver"""
+    
+    user = db.query(User).filter(User.email == email).first()
+    if user:
+        release_connection(db, user)
+    return user
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, db: Session = Depends(get_db)):
     """Kullanıcı girişi"""
     
     # Kullanıcıyı bul
-    user = db.query(User).filter(User.email == user_data.email).first()
+    user = await run_in_threadpool(find_user_by_email, db, user_data.email)
     
     if not user:
         raise HTTPException(
@@ -69,7 +115,7 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
             detail="E-posta veya şifre hatalı"
         )
     
-    password_correct = verify_password(user_data.password, user.hashed_password)
+    password_correct = await verify_password(user_data.password, user.hashed_password)
     
     if not password_correct:
         raise HTTPException(
@@ -84,33 +130,62 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
         )
     
     # Token oluştur
-    access_token = create_access_token(data={"sub": str(user.id)})
-    
-    return TokenResponse(
-        access_token=access_token,
-        user=UserResponse.model_validate(user)
-    )
+    return await run_in_threadpool(issue_tokens, db, user)
 
 
 @router.post("/login/token", response_model=TokenResponse)
-def login_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """OAuth2 uyumlu token login (Swagger UI için)"""
     
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = await run_in_threadpool(find_user_by_email, db, form_data.username)
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="E-posta veya şifre hatalı",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = create_access_token(data={"sub": str(user.id)})
+    return await run_in_threadpool(issue_tokens, db, user)
+
+
+@router.post("/refresh", response_model=TokenResponse)
+def refresh_access_token(data: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Refresh token ile yeni access token al (bcrypt yok); refresh token her kullanımda yenilenir"""
     
-    return TokenResponse(
-        access_token=access_token,
-        user=UserResponse.model_validate(user)
-    )
+    user_id, new_refresh_token = refresh_tokens.rotate(db, data.refresh_token)
+    
+    user = db.query(User).filter(User.id == user_id).first()
+    
+    if not user or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz veya süresi dolmuş oturum",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return issue_tokens(db, user, new_refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_200_OK)
+def logout(
+    data: Optional[RefreshTokenRequest] = None,
+    token: str = Depends(oauth2_scheme),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Çıkış: access token'ı ve refresh token ailesini iptal et"""
+    
+    payload = decode_access_token(token) or {}
+    if payload.get("jti") and payload.get("exp"):
+        revocation_list.revoke(db, payload["jti"], datetime.utcfromtimestamp(payload["exp"]))
+    
+    if data:
+        refresh_tokens.revoke_family(db, data.refresh_token)
+    
+    db.commit()
+    
+    return {"message": "Çıkış yapıldı"}
 
 
 @router.post("/password-reset-request", status_code=status.HTTP_200_OK)
@@ -123,28 +198,45 @@ def request_password_reset(request: PasswordResetRequest, db: Session = Depends(
     if not user:
         return {"message": "Eğer bu e-posta kayıtlıysa, şifre sıfırlama linki gönderildi"}
     
-    # Reset token oluştur
-    reset_token = generate_reset_token()
-    user.reset_token = reset_token
-    user.reset_token_expires = datetime.utcnow() + timedelta(hours=1)
+    # Reset token oluştur (önceki token'lar geçersiz olur)
+    reset_token = reset_tokens.issue(db, user.id)
     
-    db.commit()
+    # Email aynı transaction'da outbox'a yazılır; SMTP gönderimi isteği bekletmez
+    queue_password_reset_email(db, user.email, reset_token)
     
-    # Email gönder
-    try:
-        email_sent = send_password_reset_email(user.email, reset_token)
-        if email_sent:
-            print(f"[OK] Email basariyla gonderildi: {user.email}")
-        else:
-            print(f"[UYARI] Email gonderilemedi: {user.email}")
-    except Exception as e:
-        print(f"[HATA] Email gonderme hatasi: {e}")
+    db.commit()
     
     return {"message": "Eğer bu e-posta kayıtlıysa, şifre sıfırlama linki gönderildi"}
 
 
+def find_reset_user(db: Session, token: str) -> Optional[int]:
+    """Token'ın kullanıcısı; hash beklenirken DB bağlantısı havuza döner"""
+    
+    user_id = reset_tokens.get_user_id(db, token)
+    db.rollback()
+    return user_id
+
+
+def apply_password_reset(db: Session, token: str, user_id: int, hashed_password: str) -> bool:
+    """Token'ı tüket ve yeni şifreyi yaz (token bu arada kullanıldıysa False)"""
+    
+    # Token tek kullanımlık: bu arada başka bir istek kullandıysa reddet
+    if not reset_tokens.consume(db, token):
+        db.rollback()
+        return False
+    
+    user = db.get(User, user_id)
+    user.hashed_password = hashed_password
+    
+    # Açık oturumlar yeni şifreyle tekrar giriş yapsın
+    refresh_tokens.revoke_user(db, user.id)
+    
+    db.commit()
+    return True
+
+
 @router.post("/password-reset", status_code=status.HTTP_200_OK)
-def reset_password(reset_data: PasswordReset, db: Session = Depends(get_db)):
+async def reset_password(reset_data: PasswordReset, db: Session = Depends(get_db)):
     """Şifre sıfırlama"""
     
     # Şifrelerin eşleşmesi kontrolü
@@ -154,24 +246,20 @@ def reset_password(reset_data: PasswordReset, db: Session = Depends(get_db)):
             detail="Şifreler eşleşmiyor"
         )
     
-    # Token'ı kontrol et
-    user = db.query(User).filter(
-        User.reset_token == reset_data.token,
-        User.reset_token_expires > datetime.utcnow()
-    ).first()
+    invalid_token = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Geçersiz veya süresi dolmuş token"
+    )
     
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Geçersiz veya süresi dolmuş token"
-        )
+    # Token'ı kontrol et
+    user_id = await run_in_threadpool(find_reset_user, db, reset_data.token)
+    if user_id is None:
+        raise invalid_token
     
-    # Şifreyi güncelle
-    user.hashed_password = get_password_hash(reset_data.new_password)
-    user.reset_token = None
-    user.reset_token_expires = None
+    # Şifreyi hashle (güncelleme yeni transaction'da yazılır)
+    hashed_password = await get_password_hash(reset_data.new_password)
     
-    db.commit()
+    if not await run_in_threadpool(apply_password_reset, db, reset_data.token, user_id, hashed_password):
+        raise invalid_token
     
     return {"message": "Şifreniz başarıyla güncellendi"}
-
@@ -12,10 +12,20 @@ from app.models.review import Review
 from app.schemas.content import MovieResponse, BookResponse, ContentSearchResponse
 from app.services.tmdb_service import tmdb_service
 from app.services.books_service import google_books_service
+from app.services.recommendation_service import recommendation_service
+from app.services.similarity_service import content_similarity_index
+from app.services.catalog_service import save_movie_from_tmdb
 
 router = APIRouter(prefix="/contents", tags=["Contents"])
 
 
+def serialize_content(content: Content):
+    """İçeriği tipine göre yanıt şemasına çevir"""
+    if content.content_type == ContentType.MOVIE:
+        return MovieResponse.model_validate(content)
+    return BookResponse.model_validate(content)
+
+
 @router.get("/movies/search", response_model=ContentSearchResponse)
 async def search_movies(
     query: str = Query(..., min_length=1),
@@ -94,31 +104,7 @@ async def get_movie_by_tmdb_id(tmdb_id: int, db: Session = Depends(get_db)):
         )
     
     # Veritabanına kaydet
-    # Tarih parse et (güvenli)
-    release_date = None
-    if movie_data.get("release_date"):
-        try:
-            release_date = datetime.strptime(movie_data["release_date"], "%Y-%m-%d").date()
-        except (ValueError, TypeError):
-            release_date = None
-    
-    new_movie = Movie(
-        title=movie_data.get("title"),
-        original_title=movie_data.get("original_title"),
-        description=movie_data.get("overview"),
-        cover_image_url=movie_data.get("poster_url"),
-        tmdb_id=tmdb_id,
-        release_date=release_date,
-        runtime=movie_data.get("runtime"),
-        director=movie_data.get("director"),
-        cast=movie_data.get("cast"),
-        genres=movie_data.get("genres_text"),
-        original_language=movie_data.get("original_language")
-    )
-    
-    db.add(new_movie)
-    db.commit()
-    db.refresh(new_movie)
+    new_movie = save_movie_from_tmdb(tmdb_id, movie_data, db)
     
     return MovieResponse.model_validate(new_movie)
 
@@ -194,6 +180,9 @@ async def get_book_by_google_id(google_books_id: str, db: Session = Depends(get_
     db.commit()
     db.refresh(new_book)
     
+    # Benzerlik indeksini güncelle
+    content_similarity_index.add(new_book)
+    
     return BookResponse.model_validate(new_book)
 
 
@@ -213,7 +202,8 @@ def get_content_details(content_id: int, db: Session = Depends(get_db)):
     stats = {
         "average_rating": content.average_rating,
         "total_ratings": content.total_ratings,
-        "total_reviews": content.total_reviews
+        "total_reviews": content.total_reviews,
+        "rating_histogram": content.rating_histogram
     }
     
     # İçerik tipine göre yanıt döndür
@@ -231,6 +221,57 @@ def get_content_details(content_id: int, db: Session = Depends(get_db)):
         }
 
 
+@router.get("/{content_id}/similar")
+def get_similar_contents(
+    content_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Benzer içerikler (önceden hesaplanmış puanlama komşuları)"""
+    
+    neighbors = recommendation_service.get_similar_contents(content_id, db, limit)
+    
+    return [
+        {"content": serialize_content(content), "similarity": round(similarity, 4)}
+        for content, similarity in neighbors
+    ]
+
+
+@router.get("/{content_id}/more-like-this")
+def get_more_like_this(
+    content_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Açıklama ve metadata'sı benzer içerikler (puanlaması olmayan içerikler için de çalışır)"""
+    
+    content = db.query(Content).filter(Content.id == content_id).first()
+    
+    if not content:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="İçerik bulunamadı"
+        )
+    
+    matches, complete = content_similarity_index.similar_to(content, limit)
+    
+    contents = {}
+    if matches:
+        contents = {
+            item.id: item
+            for item in db.query(Content).filter(Content.id.in_([match_id for match_id, _ in matches])).all()
+        }
+    
+    return {
+        "complete": complete,
+        "results": [
+            {"content": serialize_content(contents[match_id]), "similarity": round(similarity, 4)}
+            for match_id, similarity in matches
+            if match_id in contents
+        ]
+    }
+
+
 @router.get("/", response_model=List[dict])
 def get_all_contents(
     content_type: Optional[ContentType] = None,
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy import select, func, literal
 from typing import List
+from datetime import datetime
 from app.database import get_db
 from app.models.user import User
 from app.models.content import Content
@@ -8,6 +10,8 @@ from app.models.custom_list import CustomList, CustomListItem
 from app.models.activity import Activity, ActivityType
 from app.schemas.custom_list import CustomListCreate, CustomListUpdate, CustomListResponse, CustomListItemCreate
 from app.core.deps import get_current_active_user
+from app.services.user_stats_service import user_stats
+from app.utils.upsert import insert_ignore
 
 router = APIRouter(prefix="/lists", tags=["Custom Lists"])
 
@@ -28,6 +32,7 @@ def create_custom_list(
     )
     
     db.add(new_list)
+    user_stats.change(db, current_user.id, lists_count=1)
     db.commit()
     db.refresh(new_list)
     
@@ -111,6 +116,7 @@ def delete_custom_list(
     ).delete(synchronize_session=False)
     
     db.delete(custom_list)
+    user_stats.change(db, current_user.id, lists_count=-1)
     db.commit()
     
     return None
@@ -215,41 +221,34 @@ def add_item_to_list(
             detail="Bu listeye ekleme yetkiniz yok"
         )
     
-    # İçeriği kontrol et
-    content = db.query(Content).filter(Content.id == item_data.content_id).first()
-    
-    if not content:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="İçerik bulunamadı"
-        )
-    
-    # Zaten listede mi?
-    existing_item = db.query(CustomListItem).filter(
-        CustomListItem.list_id == list_id,
-        CustomListItem.content_id == item_data.content_id
-    ).first()
-    
-    if existing_item:
+    # Sıra değerini hesaplayıp tek sorguda ekle; unique kısıtı tekrar eklemeyi sessizce atlar
+    items_table = CustomListItem.__table__
+    next_order = select(
+        literal(list_id),
+        literal(item_data.content_id),
+        func.count(items_table.c.id),
+        literal(datetime.utcnow())
+    ).where(items_table.c.list_id == list_id)
+    
+    inserted = db.execute(
+        insert_ignore(items_table).from_select(["list_id", "content_id", "order", "added_at"], next_order)
+    ).rowcount
+    
+    if not inserted:
+        db.rollback()
+        
+        # Satır eklenmediyse ya içerik zaten listede ya da içerik yok
+        if not db.query(Content.id).filter(Content.id == item_data.content_id).first():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="İçerik bulunamadı"
+            )
+        
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Bu içerik zaten listede"
         )
     
-    # Sıralama için son order değerini al
-    last_order = db.query(CustomListItem).filter(
-        CustomListItem.list_id == list_id
-    ).count()
-    
-    new_item = CustomListItem(
-        list_id=list_id,
-        content_id=item_data.content_id,
-        order=last_order
-    )
-    
-    db.add(new_item)
-    db.commit()
-    
     # Aktivite oluştur
     activity = Activity(
         user_id=current_user.id,
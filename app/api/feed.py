@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session, joinedload
-from typing import List
+from typing import Dict, List, Optional
 from app.database import get_db
 from app.models.user import User
 from app.models.activity import Activity
@@ -11,15 +11,27 @@ from app.models.like import Like
 from app.models.custom_list import CustomList, CustomListItem
 from app.schemas.activity import ActivityResponse
 from app.core.deps import get_current_active_user
+from app.services.like_counter_service import like_counter
 
 router = APIRouter(prefix="/feed", tags=["Feed"])
 
 
-def enrich_activity(activity: Activity, db: Session, current_user: User = None) -> dict:
-    """Aktiviteyi review, rating ve likes detaylarıyla zenginleştir"""
+def enrich_activity(
+    activity: Activity,
+    db: Session,
+    current_user: User = None,
+    reviews: Optional[Dict[int, Review]] = None,
+    review_likes: Optional[Dict[int, int]] = None
+) -> dict:
+    """
+    Aktiviteyi review, rating ve likes detaylarıyla zenginleştir
+    
+    Sayfa halinde çağrılırken yorumlar ve beğeni sayıları enrich_activities ile
+    önceden toplu getirilip verilir; verilmezse aktivite başına sorgulanır.
+    """
     
-    # Aktivitenin beğeni sayısını say
-    likes_count = db.query(Like).filter(Like.activity_id == activity.id).count()
+    # Aktivitenin beğeni sayısı (sayaç sütunundan)
+    likes_count = activity.likes_count or 0
     
     # Kullanıcı bu aktiviteyi beğenmiş mi?
     is_liked = False
@@ -48,10 +60,16 @@ def enrich_activity(activity: Activity, db: Session, current_user: User = None)
     
     # Review detaylarını ekle
     if activity.review_id:
-        review = db.query(Review).filter(Review.id == activity.review_id).first()
+        if reviews is None:
+            review = db.query(Review).filter(Review.id == activity.review_id).first()
+        else:
+            review = reviews.get(activity.review_id)
         if review:
             activity_dict["review_text"] = review.text
-            activity_dict["review_likes_count"] = review.likes_count
+            if review_likes is None:
+                activity_dict["review_likes_count"] = like_counter.get_count(db, review)
+            else:
+                activity_dict["review_likes_count"] = review_likes.get(review.id, 0)
     
     # Rating detaylarını ekle
     if activity.rating_id:
@@ -85,6 +103,19 @@ def enrich_activity(activity: Activity, db: Session, current_user: User = None)
     return activity_dict
 
 
+def enrich_activities(activities: List[Activity], db: Session, current_user: User = None) -> List[dict]:
+    """Sayfadaki aktiviteleri zenginleştir; yorumlar ve beğeni sayıları tek seferde getirilir"""
+    
+    review_ids = {activity.review_id for activity in activities if activity.review_id}
+    reviews = {
+        review.id: review
+        for review in db.query(Review).filter(Review.id.in_(review_ids)).all()
+    } if review_ids else {}
+    review_likes = like_counter.get_counts(db, reviews.values())
+    
+    return [enrich_activity(activity, db, current_user, reviews, review_likes) for activity in activities]
+
+
 @router.get("/", response_model=List[ActivityResponse])
 def get_feed(
     skip: int = Query(0, ge=0),
@@ -124,7 +155,7 @@ def get_feed(
         .all()
     
     # Her aktiviteyi zenginleştir
-    enriched_activities = [enrich_activity(activity, db, current_user) for activity in activities]
+    enriched_activities = enrich_activities(activities, db, current_user)
     
     return [ActivityResponse.model_validate(act) for act in enriched_activities]
 
@@ -154,7 +185,7 @@ def get_global_feed(
         .all()
     
     # Her aktiviteyi zenginleştir
-    enriched_activities = [enrich_activity(activity, db, current_user) for activity in activities]
+    enriched_activities = enrich_activities(activities, db, current_user)
     
     return [ActivityResponse.model_validate(act) for act in enriched_activities]
 
@@ -186,7 +217,7 @@ def get_user_feed(
         .all()
     
     # Her aktiviteyi zenginleştir
-    enriched_activities = [enrich_activity(activity, db, current_user) for activity in activities]
+    enriched_activities = enrich_activities(activities, db, current_user)
     
     return [ActivityResponse.model_validate(act) for act in enriched_activities]
 
@@ -215,7 +246,7 @@ def get_my_activities(
         .all()
     
     # Her aktiviteyi zenginleştir
-    enriched_activities = [enrich_activity(activity, db, current_user) for activity in activities]
+    enriched_activities = enrich_activities(activities, db, current_user)
     
     return [ActivityResponse.model_validate(act) for act in enriched_activities]
 
@@ -1,4 +1,9 @@
+import json
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select, update, delete
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from app.database import get_db
@@ -6,8 +11,14 @@ from app.models.user import User
 from app.models.content import Content
 from app.models.library import UserLibrary, LibraryStatus
 from app.models.activity import Activity, ActivityType
-from app.schemas.library import LibraryItemCreate, LibraryItemResponse
+from app.schemas.library import (
+    LibraryItemCreate, LibraryItemResponse, LibraryStatsResponse,
+    LibraryBulkRequest, LibraryBulkResponse, LibraryBulkResult
+)
 from app.core.deps import get_current_active_user
+from app.services.user_stats_service import user_stats
+from app.services.library_stats_service import library_stats
+from app.utils.upsert import insert_ignore
 
 router = APIRouter(prefix="/library", tags=["Library"])
 
@@ -18,56 +29,208 @@ def add_to_library(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Kütüphaneye içerik ekle"""
+    """Kütüphaneye içerik ekle (varsa durumunu güncelle)"""
     
-    # İçeriği kontrol et
-    content = db.query(Content).filter(Content.id == library_item.content_id).first()
-    
-    if not content:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="İçerik bulunamadı"
-        )
-    
-    # Daha önce eklenmiş mi?
-    existing_item = db.query(UserLibrary).filter(
+    # Eski durum yalnızca istatistik deltası için okunur; kilit alınmaz (olmayan satırda gap lock
+    # eşzamanlı eklemeleri deadlock'a sokar). Yarışta oluşabilecek küçük sapmayı rebuild/reconcile onarır.
+    old_status = db.query(UserLibrary.status).filter(
         UserLibrary.user_id == current_user.id,
         UserLibrary.content_id == library_item.content_id
-    ).first()
+    ).scalar()
     
-    if existing_item:
-        # Varsa durumu güncelle
-        existing_item.status = library_item.status
-        db.commit()
-        db.refresh(existing_item)
-        # Content'i yükle
-        db.refresh(existing_item, ['content'])
-        return LibraryItemResponse.model_validate(existing_item)
-    
-    # Yeni ekle
-    new_item = UserLibrary(
-        user_id=current_user.id,
-        content_id=library_item.content_id,
-        status=library_item.status
-    )
+    if old_status != library_item.status:
+        # Tek sorguda ekle ya da durumu güncelle
+        now = datetime.utcnow()
+        statement = mysql_insert(UserLibrary.__table__).values(
+            user_id=current_user.id,
+            content_id=library_item.content_id,
+            status=library_item.status.value,
+            created_at=now,
+            updated_at=now
+        )
+        try:
+            result = db.execute(statement.on_duplicate_key_update(
+                status=statement.inserted.status,
+                updated_at=statement.inserted.updated_at
+            ))
+        except IntegrityError:
+            # Yalnızca foreign key hatası olabilir: içerik yok
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="İçerik bulunamadı"
+            )
+        
+        # rowcount: 1 eklendi, 2 mevcut satır güncellendi
+        inserted = result.rowcount == 1
+        if inserted:
+            old_status = None
+        
+        # Okumadan sonra başka bir istek eklediyse eski durum bilinmez; delta atlanır
+        if inserted or old_status is not None:
+            library_stats.library_changed(db, current_user.id, [
+                (library_item.content_id, old_status, library_item.status, now if inserted else None)
+            ])
+        
+        if inserted:
+            user_stats.change(db, current_user.id, library_count=1)
+            
+            # Aktivite oluştur
+            activity = Activity(
+                user_id=current_user.id,
+                activity_type=ActivityType.LIBRARY_ADD,
+                content_id=library_item.content_id,
+                extra_data=f'{{"status": "{library_item.status.value}"}}'
+            )
+            db.add(activity)
     
-    db.add(new_item)
     db.commit()
-    db.refresh(new_item)
-    # Content'i yükle
-    db.refresh(new_item, ['content'])
-    
-    # Aktivite oluştur
-    activity = Activity(
-        user_id=current_user.id,
-        activity_type=ActivityType.LIBRARY_ADD,
-        content_id=library_item.content_id,
-        extra_data=f'{{"status": "{library_item.status.value}"}}'
-    )
-    db.add(activity)
+    
+    # Son durumu içerikle birlikte döndür
+    item = db.query(UserLibrary)\
+        .options(joinedload(UserLibrary.content))\
+        .filter(
+            UserLibrary.user_id == current_user.id,
+            UserLibrary.content_id == library_item.content_id
+        ).first()
+    
+    return LibraryItemResponse.model_validate(item)
+
+
+def lock_library_rows(db: Session, *conditions) -> dict:
+    """Koşula uyan mevcut kütüphane kayıtlarını kilitle (içerik ID -> satır)"""
+    
+    rows = db.query(UserLibrary.content_id, UserLibrary.status, UserLibrary.created_at)\
+        .filter(*conditions)\
+        .with_for_update()\
+        .all()
+    return {row.content_id: row for row in rows}
+
+
+def insert_library_rows(db: Session, rows: List[dict]) -> set:
+    """Satırları INSERT IGNORE ile ekle; gerçekten eklenen içerik ID'lerini döndür"""
+    
+    if not rows:
+        return set()
+    
+    # Olağan durumda tek INSERT; eşzamanlı bir ekleme yüzünden satır atlandıysa hangisi olduğu
+    # bilinmediğinden toplu ekleme geri alınıp satır satır tekrarlanır
+    savepoint = db.begin_nested()
+    if db.execute(insert_ignore(UserLibrary.__table__), rows).rowcount == len(rows):
+        savepoint.commit()
+        return {row["content_id"] for row in rows}
+    savepoint.rollback()
+    
+    return {
+        row["content_id"]
+        for row in rows
+        if db.execute(insert_ignore(UserLibrary.__table__).values(**row)).rowcount
+    }
+
+
+@router.post("/bulk", response_model=LibraryBulkResponse)
+def bulk_update_library(
+    request: LibraryBulkRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Toplu kütüphane işlemi: birden fazla içeriği tek transaction'da ekle, durumunu değiştir veya çıkar"""
+    
+    # Aynı içerik birden fazla geçerse son öğe geçerli (sonuç sırası ilk geçişe göre)
+    targets = {}
+    for item in request.items:
+        targets[item.content_id] = item.status
+    content_ids = list(targets)
+    
+    table = UserLibrary.__table__
+    
+    # Yalnızca var olan kayıtlar birincil anahtarla kilitlenir: olmayan içeriklerde gap lock alınırsa
+    # aynı içerikleri ekleyen eşzamanlı isteklerle deadlock oluşur
+    present_ids = db.execute(
+        select(table.c.id).where(table.c.user_id == current_user.id, table.c.content_id.in_(content_ids))
+    ).scalars().all()
+    existing = lock_library_rows(db, table.c.id.in_(present_ids)) if present_ids else {}
+    
+    to_add = [cid for cid in content_ids if cid not in existing and targets[cid] is not None]
+    valid = set(db.execute(select(Content.id).where(Content.id.in_(to_add))).scalars()) if to_add else set()
+    
+    now = datetime.utcnow()
+    added = insert_library_rows(db, [
+        {"user_id": current_user.id, "content_id": cid, "status": targets[cid].value, "created_at": now, "updated_at": now}
+        for cid in to_add if cid in valid
+    ])
+    
+    # Okumadan sonra başka bir istekle eklenenler artık var: kilitleyip durum değişikliği olarak işle
+    raced = [cid for cid in to_add if cid in valid and cid not in added]
+    if raced:
+        existing.update(lock_library_rows(db, table.c.user_id == current_user.id, table.c.content_id.in_(raced)))
+    
+    results = {}
+    changes = []
+    moves, removals = {}, []
+    
+    for cid in content_ids:
+        new_status, row = targets[cid], existing.get(cid)
+        if cid in added:
+            changes.append((cid, None, new_status, now))
+            results[cid] = LibraryBulkResult(content_id=cid, outcome="added", status=new_status.value)
+        elif row is None:
+            if new_status is not None and cid not in valid:
+                results[cid] = LibraryBulkResult(content_id=cid, outcome="not_found")
+            else:
+                results[cid] = LibraryBulkResult(content_id=cid, outcome="not_in_library")
+        elif new_status is None:
+            removals.append(cid)
+            changes.append((cid, row.status, None, row.created_at))
+            results[cid] = LibraryBulkResult(content_id=cid, outcome="removed")
+        elif row.status != new_status:
+            moves.setdefault(new_status, []).append(cid)
+            changes.append((cid, row.status, new_status, None))
+            results[cid] = LibraryBulkResult(content_id=cid, outcome="moved", status=new_status.value)
+        else:
+            results[cid] = LibraryBulkResult(content_id=cid, outcome="unchanged", status=new_status.value)
+    
+    # Durum başına tek UPDATE/DELETE (satırlar kilitli olduğundan etkilenen satırlar okunanlarla aynıdır)
+    for new_status, ids in moves.items():
+        db.execute(
+            update(UserLibrary.__table__)
+            .where(UserLibrary.__table__.c.user_id == current_user.id, UserLibrary.__table__.c.content_id.in_(ids))
+            .values(status=new_status.value, updated_at=now)
+        )
+    if removals:
+        db.execute(
+            delete(UserLibrary.__table__)
+            .where(UserLibrary.__table__.c.user_id == current_user.id, UserLibrary.__table__.c.content_id.in_(removals))
+        )
+    
+    if changes:
+        user_stats.change(db, current_user.id, library_count=len(added) - len(removals))
+        library_stats.library_changed(db, current_user.id, changes)
+    
+    # Her içerik için ayrı aktivite yerine tek toplu aktivite (tek içerikse tekil eklemeyle aynı biçim)
+    if len(added) == 1:
+        content_id = next(iter(added))
+        db.add(Activity(
+            user_id=current_user.id,
+            activity_type=ActivityType.LIBRARY_ADD,
+            content_id=content_id,
+            extra_data=json.dumps({"status": targets[content_id].value})
+        ))
+    elif added:
+        db.add(Activity(
+            user_id=current_user.id,
+            activity_type=ActivityType.LIBRARY_ADD,
+            extra_data=json.dumps({"added": len(added)})
+        ))
+    
     db.commit()
     
-    return LibraryItemResponse.model_validate(new_item)
+    return LibraryBulkResponse(
+        added=len(added),
+        moved=sum(len(ids) for ids in moves.values()),
+        removed=len(removals),
+        results=[results[cid] for cid in content_ids]
+    )
 
 
 @router.delete("/{content_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -90,6 +253,10 @@ def remove_from_library(
         )
     
     db.delete(library_item)
+    user_stats.change(db, current_user.id, library_count=-1)
+    library_stats.library_changed(db, current_user.id, [
+        (content_id, library_item.status, None, library_item.created_at)
+    ])
     db.commit()
     
     return None
@@ -118,6 +285,15 @@ def get_my_library(
     return [LibraryItemResponse.model_validate(item) for item in library_items]
 
 
+@router.get("/me/stats", response_model=LibraryStatsResponse)
+def get_my_library_stats(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Kütüphane istatistiklerim (durum sayıları, izleme süresi, okunan sayfa, türler, aylık aktivite)"""
+    return library_stats.get(db, current_user.id)
+
+
 @router.get("/user/{user_id}", response_model=List[LibraryItemResponse])
 def get_user_library(
     user_id: int,
@@ -1,14 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, update, delete
 from app.database import get_db
 from app.models.user import User
 from app.models.activity import Activity
+from app.models.review import Review
 from app.models.like import Like
 from app.core.deps import get_current_active_user
+from app.services.like_counter_service import like_counter
+from app.utils.upsert import insert_ignore
+from app.utils.pagination import keyset_paginate, set_next_cursor
 
 router = APIRouter(prefix="/likes", tags=["Likes"])
 
+activities_table = Activity.__table__
+
+
+def change_activity_likes(db: Session, activity_id: int, delta: int):
+    """Aktivite beğeni sayacını göreli olarak güncelle (commit etmez)"""
+    db.execute(
+        update(activities_table)
+        .where(activities_table.c.id == activity_id)
+        .values(likes_count=activities_table.c.likes_count + delta)
+    )
+
+
+def get_activity_likes(db: Session, activity_id: int) -> int:
+    """Sayaçtan aktivitenin beğeni sayısı (COUNT(*) yerine)"""
+    likes_count = db.query(Activity.likes_count).filter(Activity.id == activity_id).scalar()
+    return likes_count or 0
+
+
+def paginate_likers(db: Session, condition, cursor: Optional[str], limit: int, response: Response) -> list:
+    """Beğenenleri (created_at, id) üzerinde imleçle sayfala"""
+    
+    query = db.query(Like, User)\
+        .join(User, Like.user_id == User.id)\
+        .filter(condition)
+    
+    rows, next_cursor = keyset_paginate(
+        query,
+        [Like.created_at, Like.id],
+        cursor,
+        limit,
+        key=lambda row: [row[0].created_at, row[0].id]
+    )
+    set_next_cursor(response, next_cursor)
+    
+    return [
+        {
+            "id": user.id,
+            "username": user.username,
+            "avatar_url": user.avatar_url,
+            "liked_at": like.created_at
+        }
+        for like, user in rows
+    ]
+
 
 @router.post("/activities/{activity_id}", status_code=status.HTTP_201_CREATED)
 def like_activity(
@@ -18,41 +67,28 @@ def like_activity(
 ):
     """Aktiviteyi beğen"""
     
-    # Aktivite var mı kontrol et
-    activity = db.query(Activity).filter(Activity.id == activity_id).first()
-    if not activity:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Aktivite bulunamadı"
-        )
-    
-    # Daha önce beğenmiş mi?
-    existing_like = db.query(Like).filter(
-        and_(
-            Like.user_id == current_user.id,
-            Like.activity_id == activity_id
-        )
-    ).first()
-    
-    if existing_like:
-        return {"message": "Zaten beğenilmiş", "liked": True}
-    
-    # Beğeni oluştur
-    new_like = Like(
-        user_id=current_user.id,
-        activity_id=activity_id
-    )
-    
-    db.add(new_like)
-    db.commit()
-    
-    # Beğeni sayısını say
-    likes_count = db.query(Like).filter(Like.activity_id == activity_id).count()
+    # Tek sorguda ekle; unique kısıtı tekrar beğeniyi sessizce atlar
+    inserted = db.execute(
+        insert_ignore(Like.__table__).values(user_id=current_user.id, activity_id=activity_id)
+    ).rowcount
+    
+    if inserted:
+        change_activity_likes(db, activity_id, 1)
+        db.commit()
+    else:
+        db.rollback()
+        
+        # Satır eklenmediyse ya zaten beğenilmiş ya da aktivite yok
+        if not db.query(Activity.id).filter(Activity.id == activity_id).first():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Aktivite bulunamadı"
+            )
     
     return {
-        "message": "Beğenildi",
+        "message": "Beğenildi" if inserted else "Zaten beğenilmiş",
         "liked": True,
-        "likes_count": likes_count
+        "likes_count": get_activity_likes(db, activity_id)
     }
 
 
@@ -64,30 +100,28 @@ def unlike_activity(
 ):
     """Aktivite beğenisini kaldır"""
     
-    # Beğeni var mı?
-    like = db.query(Like).filter(
-        and_(
-            Like.user_id == current_user.id,
-            Like.activity_id == activity_id
+    # Tek sorguda sil; silinen satır yoksa beğeni de yok
+    deleted = db.execute(
+        delete(Like.__table__).where(
+            Like.__table__.c.user_id == current_user.id,
+            Like.__table__.c.activity_id == activity_id
         )
-    ).first()
+    ).rowcount
     
-    if not like:
+    if not deleted:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Beğeni bulunamadı"
         )
     
-    db.delete(like)
+    change_activity_likes(db, activity_id, -1)
     db.commit()
     
-    # Beğeni sayısını say
-    likes_count = db.query(Like).filter(Like.activity_id == activity_id).count()
-    
     return {
         "message": "Beğeni kaldırıldı",
         "liked": False,
-        "likes_count": likes_count
+        "likes_count": get_activity_likes(db, activity_id)
     }
 
 
@@ -98,11 +132,9 @@ def get_activity_likes_count(
 ):
     """Aktivitenin beğeni sayısını getir"""
     
-    likes_count = db.query(Like).filter(Like.activity_id == activity_id).count()
-    
     return {
         "activity_id": activity_id,
-        "likes_count": likes_count
+        "likes_count": get_activity_likes(db, activity_id)
     }
 
 
@@ -121,43 +153,60 @@ def check_if_liked(
         )
     ).first()
     
-    likes_count = db.query(Like).filter(Like.activity_id == activity_id).count()
-    
     return {
         "activity_id": activity_id,
         "liked": like is not None,
-        "likes_count": likes_count
+        "likes_count": get_activity_likes(db, activity_id)
     }
 
 
 @router.get("/activities/{activity_id}/users")
 def get_activity_likers(
     activity_id: int,
-    limit: int = 50,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
     db: Session = Depends(get_db)
 ):
-    """Aktiviteyi beğenen kullanıcıları getir"""
+    """Aktiviteyi beğenen kullanıcıları getir (sonraki sayfa imleci X-Next-Cursor başlığında)"""
     
-    # Likes ile User'ları join et
-    likes = db.query(Like, User)\
-        .join(User, Like.user_id == User.id)\
-        .filter(Like.activity_id == activity_id)\
-        .order_by(Like.created_at.desc())\
-        .limit(limit)\
-        .all()
-    
-    users = []
-    for like, user in likes:
-        users.append({
-            "id": user.id,
-            "username": user.username,
-            "avatar_url": user.avatar_url,
-            "liked_at": like.created_at
-        })
+    likes_count = db.query(Activity.likes_count).filter(Activity.id == activity_id).first()
+    if likes_count is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Aktivite bulunamadı"
+        )
+    
+    users = paginate_likers(db, Like.activity_id == activity_id, cursor, limit, response)
     
     return {
         "activity_id": activity_id,
-        "total_count": len(users),
+        "total_count": likes_count[0] or 0,
         "users": users
     }
 
+
+@router.get("/reviews/{review_id}/users")
+def get_review_likers(
+    review_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Yorumu beğenen kullanıcıları getir (sonraki sayfa imleci X-Next-Cursor başlığında)"""
+    
+    review = db.query(Review).filter(Review.id == review_id).first()
+    if not review:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Yorum bulunamadı"
+        )
+    
+    users = paginate_likers(db, Like.review_id == review_id, cursor, limit, response)
+    
+    return {
+        "review_id": review_id,
+        "total_count": like_counter.get_count(db, review),
+        "users": users
+    }
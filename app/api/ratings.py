@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional
 from app.database import get_db
 from app.models.user import User
 from app.models.content import Content
@@ -9,6 +9,12 @@ from app.models.rating import Rating
 from app.models.activity import Activity, ActivityType
 from app.schemas.rating import RatingCreate, RatingUpdate, RatingResponse
 from app.core.deps import get_current_active_user
+from app.services.taste_service import taste_service
+from app.services.content_stats_service import apply_rating_delta
+from app.services.rating_import_service import rating_import_service
+from app.services.user_stats_service import user_stats
+from app.services.library_stats_service import library_stats
+from app.utils.pagination import keyset_paginate, set_next_cursor
 
 router = APIRouter(prefix="/ratings", tags=["Ratings"])
 
@@ -50,11 +56,14 @@ def create_rating(
     )
     
     db.add(new_rating)
-    db.commit()
-    db.refresh(new_rating)
+    db.flush()
     
-    # İçeriğin ortalama puanını güncelle
-    update_content_rating_stats(rating_data.content_id, db)
+    # İçeriğin puanlama istatistiklerini aynı transaction içinde güncelle
+    apply_rating_delta(db, rating_data.content_id, None, rating_data.score)
+    user_stats.change(db, current_user.id, total_ratings=1)
+    library_stats.ratings_changed(db, current_user.id, [
+        (rating_data.content_id, None, rating_data.score, new_rating.created_at)
+    ])
     
     # Aktivite oluştur
     activity = Activity(
@@ -65,10 +74,35 @@ def create_rating(
     )
     db.add(activity)
     db.commit()
+    db.refresh(new_rating)
+    
+    # Zevk uyumu önbelleğini geçersiz kıl
+    taste_service.invalidate_user(current_user.id)
     
     return RatingResponse.model_validate(new_rating)
 
 
+@router.post("/import")
+async def import_ratings(
+    file: UploadFile = File(...),
+    scale: float = Query(10.0, gt=0, le=100, description="Kaynak puan ölçeği (ör. 5 yıldız için 5)"),
+    overwrite: bool = Query(False, description="Mevcut puanlamaların üzerine yaz"),
+    upstream: bool = Query(True, description="Yerelde bulunamayanları TMDb'de ara"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Harici servislerden dışa aktarılmış puanlamaları içe aktar (CSV)
+    
+    Sütunlar: başlık, yıl, IMDb/TMDb ID, puan. Yanıt, her partiden sonra bir
+    ilerleme satırı içeren NDJSON akışıdır; son satır özet sonucu içerir.
+    """
+    
+    return StreamingResponse(
+        rating_import_service.import_csv(file.file, current_user.id, scale, overwrite, upstream),
+        media_type="application/x-ndjson"
+    )
+
+
 @router.put("/{rating_id}", response_model=RatingResponse)
 def update_rating(
     rating_id: int,
@@ -78,7 +112,8 @@ def update_rating(
 ):
     """Puanlamayı güncelle"""
     
-    rating = db.query(Rating).filter(Rating.id == rating_id).first()
+    # Eski puanın delta hesabı için tutarlı kalması adına satırı kilitle
+    rating = db.query(Rating).filter(Rating.id == rating_id).with_for_update().first()
     
     if not rating:
         raise HTTPException(
@@ -93,12 +128,20 @@ def update_rating(
             detail="Bu puanlamayı güncelleme yetkiniz yok"
         )
     
+    old_score = rating.score
     rating.score = rating_update.score
+    
+    # İçeriğin puanlama istatistiklerini aynı transaction içinde güncelle
+    apply_rating_delta(db, rating.content_id, old_score, rating_update.score)
+    library_stats.ratings_changed(db, current_user.id, [
+        (rating.content_id, old_score, rating_update.score, rating.created_at)
+    ])
+    
     db.commit()
     db.refresh(rating)
     
-    # İçeriğin ortalama puanını güncelle
-    update_content_rating_stats(rating.content_id, db)
+    # Zevk uyumu önbelleğini geçersiz kıl
+    taste_service.invalidate_user(current_user.id)
     
     return RatingResponse.model_validate(rating)
 
@@ -111,7 +154,7 @@ def delete_rating(
 ):
     """Puanlamayı sil"""
     
-    rating = db.query(Rating).filter(Rating.id == rating_id).first()
+    rating = db.query(Rating).filter(Rating.id == rating_id).with_for_update().first()
     
     if not rating:
         raise HTTPException(
@@ -126,12 +169,19 @@ def delete_rating(
             detail="Bu puanlamayı silme yetkiniz yok"
         )
     
-    content_id = rating.content_id
     db.delete(rating)
+    
+    # İçeriğin puanlama istatistiklerini aynı transaction içinde güncelle
+    apply_rating_delta(db, rating.content_id, rating.score, None)
+    user_stats.change(db, current_user.id, total_ratings=-1)
+    library_stats.ratings_changed(db, current_user.id, [
+        (rating.content_id, rating.score, None, rating.created_at)
+    ])
+    
     db.commit()
     
-    # İçeriğin ortalama puanını güncelle
-    update_content_rating_stats(content_id, db)
+    # Zevk uyumu önbelleğini geçersiz kıl
+    taste_service.invalidate_user(current_user.id)
     
     return None
 
@@ -139,15 +189,19 @@ def delete_rating(
 @router.get("/content/{content_id}", response_model=List[RatingResponse])
 def get_content_ratings(
     content_id: int,
-    skip: int = Query(0, ge=0),
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Önceki sayfanın X-Next-Cursor değeri"),
     limit: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db)
 ):
     """İçeriğin puanlamalarını listele"""
     
-    ratings = db.query(Rating).filter(Rating.content_id == content_id)\
-        .order_by(Rating.created_at.desc())\
-        .offset(skip).limit(limit).all()
+    query = db.query(Rating)\
+        .options(joinedload(Rating.user), joinedload(Rating.content))\
+        .filter(Rating.content_id == content_id)
+    
+    ratings, next_cursor = keyset_paginate(query, [Rating.created_at, Rating.id], cursor, limit)
+    set_next_cursor(response, next_cursor)
     
     return [RatingResponse.model_validate(rating) for rating in ratings]
 
@@ -155,15 +209,19 @@ def get_content_ratings(
 @router.get("/user/{user_id}", response_model=List[RatingResponse])
 def get_user_ratings(
     user_id: int,
-    skip: int = Query(0, ge=0),
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Önceki sayfanın X-Next-Cursor değeri"),
     limit: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db)
 ):
     """Kullanıcının puanlamalarını listele"""
     
-    ratings = db.query(Rating).filter(Rating.user_id == user_id)\
-        .order_by(Rating.created_at.desc())\
-        .offset(skip).limit(limit).all()
+    query = db.query(Rating)\
+        .options(joinedload(Rating.user), joinedload(Rating.content))\
+        .filter(Rating.user_id == user_id)
+    
+    ratings, next_cursor = keyset_paginate(query, [Rating.created_at, Rating.id], cursor, limit)
+    set_next_cursor(response, next_cursor)
     
     return [RatingResponse.model_validate(rating) for rating in ratings]
 
@@ -189,19 +247,3 @@ def get_my_rating_for_content(
     
     return RatingResponse.model_validate(rating)
 
-
-def update_content_rating_stats(content_id: int, db: Session):
-    """İçeriğin puanlama istatistiklerini güncelle"""
-    
-    stats = db.query(
-        func.avg(Rating.score).label('avg_score'),
-        func.count(Rating.id).label('total_ratings')
-    ).filter(Rating.content_id == content_id).first()
-    
-    content = db.query(Content).filter(Content.id == content_id).first()
-    
-    if content:
-        content.average_rating = round(stats.avg_score, 2) if stats.avg_score else 0.0
-        content.total_ratings = stats.total_ratings
-        db.commit()
-
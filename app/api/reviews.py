@@ -1,15 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional, Set
 from app.database import get_db
 from app.models.user import User
 from app.models.content import Content
 from app.models.review import Review
 from app.models.like import Like
 from app.models.activity import Activity, ActivityType
-from app.schemas.review import ReviewCreate, ReviewUpdate, ReviewResponse
-from app.core.deps import get_current_active_user
+from app.schemas.review import ReviewCreate, ReviewUpdate, ReviewResponse, ReviewSort
+from app.core.deps import get_current_active_user, get_current_user_optional
+from app.services.content_stats_service import apply_review_delta
+from app.services.like_counter_service import like_counter
+from app.services.review_search_service import review_search_service
+from app.services.user_stats_service import user_stats
+from app.utils.pagination import keyset_paginate, set_next_cursor
+from app.utils.upsert import insert_ignore
 
 router = APIRouter(prefix="/reviews", tags=["Reviews"])
 
@@ -39,11 +44,11 @@ def create_review(
     )
     
     db.add(new_review)
-    db.commit()
-    db.refresh(new_review)
+    db.flush()
     
-    # İçeriğin yorum sayısını güncelle
-    update_content_review_count(review_data.content_id, db)
+    # İçeriğin yorum sayısını aynı transaction içinde güncelle
+    apply_review_delta(db, review_data.content_id, 1)
+    user_stats.change(db, current_user.id, total_reviews=1)
     
     # Aktivite oluştur
     activity = Activity(
@@ -54,6 +59,7 @@ def create_review(
     )
     db.add(activity)
     db.commit()
+    db.refresh(new_review)
     
     # Username ile birlikte döndür
     review_dict = {
@@ -104,7 +110,7 @@ def update_review(
         "user_id": review.user_id,
         "content_id": review.content_id,
         "text": review.text,
-        "likes_count": review.likes_count,
+        "likes_count": like_counter.get_count(db, review),
         "created_at": review.created_at,
         "updated_at": review.updated_at,
         "username": current_user.username
@@ -136,28 +142,64 @@ def delete_review(
             detail="Bu yorumu silme yetkiniz yok"
         )
     
-    content_id = review.content_id
     db.delete(review)
-    db.commit()
     
-    # İçeriğin yorum sayısını güncelle
-    update_content_review_count(content_id, db)
+    # İçeriğin yorum sayısını aynı transaction içinde güncelle
+    apply_review_delta(db, review.content_id, -1)
+    user_stats.change(db, current_user.id, total_reviews=-1)
+    
+    db.commit()
     
     return None
 
 
+@router.get("/search")
+def search_reviews(
+    q: str = Query(..., min_length=3, max_length=200),
+    content_id: Optional[int] = Query(None, description="Sadece bu içeriğin yorumları"),
+    user_id: Optional[int] = Query(None, description="Sadece bu kullanıcının yorumları"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Yorum metinlerinde ara (ilgi skoruna göre sıralı, eşleşen bölümle birlikte)"""
+    return review_search_service.search(db, q, content_id, user_id, skip, limit)
+
+
 @router.get("/content/{content_id}", response_model=List[ReviewResponse])
 def get_content_reviews(
     content_id: int,
-    skip: int = Query(0, ge=0),
+    response: Response,
+    sort: ReviewSort = Query(ReviewSort.NEW, description="top: en çok beğenilen (kararlı değil), new: en yeni"),
+    cursor: Optional[str] = Query(None, description="Önceki sayfanın X-Next-Cursor değeri"),
     limit: int = Query(20, ge=1, le=100),
+    current_user: Optional[User] = Depends(get_current_user_optional),
     db: Session = Depends(get_db)
 ):
-    """İçeriğin yorumlarını listele"""
+    """
+    İçeriğin yorumlarını listele
     
-    reviews = db.query(Review).filter(Review.content_id == content_id)\
-        .order_by(Review.created_at.desc())\
-        .offset(skip).limit(limit).all()
+    İmleç yalnızca üretildiği sıralamayla kullanılabilir. top sıralaması likes_count'a göredir ve
+    beğeniler periyodik olarak katlandığından (LIKE_FOLD_INTERVAL_SECONDS) sayfalar arasında bir yorum
+    atlanabilir veya tekrar görünebilir; new sıralaması kararlıdır.
+    """
+    
+    # Kullanıcılar aynı sorguda yüklenir (satır başına ayrı sorgu yok)
+    query = db.query(Review)\
+        .options(joinedload(Review.user))\
+        .filter(Review.content_id == content_id)
+    
+    # Her iki sıralama da (content_id, ..., id) indeksini baştan tarar
+    if sort == ReviewSort.TOP:
+        order_columns = [Review.likes_count, Review.id]
+    else:
+        order_columns = [Review.created_at, Review.id]
+    
+    reviews, next_cursor = keyset_paginate(query, order_columns, cursor, limit, scope=sort.value)
+    set_next_cursor(response, next_cursor)
+    
+    likes_counts = like_counter.get_counts(db, reviews)
+    liked = liked_review_ids(db, current_user.id, [review.id for review in reviews]) if current_user else set()
     
     # Her yorum için kullanıcı adını ekle
     result = []
@@ -167,10 +209,11 @@ def get_content_reviews(
             "user_id": review.user_id,
             "content_id": review.content_id,
             "text": review.text,
-            "likes_count": review.likes_count,
+            "likes_count": likes_counts[review.id],
             "created_at": review.created_at,
             "updated_at": review.updated_at,
-            "username": review.user.username if review.user else "Bilinmeyen"
+            "username": review.user.username if review.user else "Bilinmeyen",
+            "is_liked_by_me": review.id in liked
         }
         result.append(review_dict)
     
@@ -180,17 +223,26 @@ def get_content_reviews(
 @router.get("/user/{user_id}", response_model=List[ReviewResponse])
 def get_user_reviews(
     user_id: int,
-    skip: int = Query(0, ge=0),
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Önceki sayfanın X-Next-Cursor değeri"),
     limit: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db)
 ):
     """Kullanıcının yorumlarını listele"""
     
-    reviews = db.query(Review).filter(Review.user_id == user_id)\
-        .order_by(Review.created_at.desc())\
-        .offset(skip).limit(limit).all()
+    query = db.query(Review)\
+        .options(joinedload(Review.user), joinedload(Review.content))\
+        .filter(Review.user_id == user_id)
+    
+    reviews, next_cursor = keyset_paginate(query, [Review.created_at, Review.id], cursor, limit)
+    set_next_cursor(response, next_cursor)
     
-    return [ReviewResponse.model_validate(review) for review in reviews]
+    likes_counts = like_counter.get_counts(db, reviews)
+    
+    return [
+        ReviewResponse.model_validate(review).model_copy(update={"likes_count": likes_counts[review.id]})
+        for review in reviews
+    ]
 
 
 @router.post("/{review_id}/like", status_code=status.HTTP_201_CREATED)
@@ -199,42 +251,29 @@ def like_review(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Yorumu beğen"""
+    """Yorumu beğen (tekrar beğenmek bir şey değiştirmez)"""
     
-    review = db.query(Review).filter(Review.id == review_id).first()
+    # Tek sorguda ekle; unique kısıtı tekrar beğeniyi sessizce atlar
+    inserted = db.execute(
+        insert_ignore(Like.__table__).values(user_id=current_user.id, review_id=review_id)
+    ).rowcount
     
-    if not review:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Yorum bulunamadı"
-        )
+    if inserted:
+        # Beğeni sayısını rastgele bir sayaç parçasında artır (yorum satırı kilitlenmez)
+        like_counter.increment(db, review_id, 1)
+        db.commit()
+        return {"message": "Yorum beğenildi", "liked": True}
     
-    # Daha önce beğenilmiş mi?
-    existing_like = db.query(Like).filter(
-        Like.user_id == current_user.id,
-        Like.review_id == review_id
-    ).first()
+    db.rollback()
     
-    if existing_like:
+    # Satır eklenmediyse ya zaten beğenilmiş ya da yorum yok
+    if not db.query(Review.id).filter(Review.id == review_id).first():
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Bu yorumu zaten beğendiniz"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Yorum bulunamadı"
         )
     
-    # Beğeni oluştur
-    new_like = Like(
-        user_id=current_user.id,
-        review_id=review_id
-    )
-    
-    db.add(new_like)
-    
-    # Beğeni sayısını artır
-    review.likes_count += 1
-    
-    db.commit()
-    
-    return {"message": "Yorum beğenildi"}
+    return {"message": "Bu yorumu zaten beğendiniz", "liked": True}
 
 
 @router.delete("/{review_id}/unlike", status_code=status.HTTP_200_OK)
@@ -245,38 +284,35 @@ def unlike_review(
 ):
     """Yorumun beğenisini geri al"""
     
-    like = db.query(Like).filter(
+    # Silinen satır sayısı kontrol edilir: eşzamanlı iki geri alma sayacı iki kez azaltmaz
+    deleted = db.query(Like).filter(
         Like.user_id == current_user.id,
         Like.review_id == review_id
-    ).first()
+    ).delete(synchronize_session=False)
     
-    if not like:
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Bu yorumu beğenmemişsiniz"
         )
     
-    review = db.query(Review).filter(Review.id == review_id).first()
-    
-    db.delete(like)
-    
-    # Beğeni sayısını azalt
-    if review and review.likes_count > 0:
-        review.likes_count -= 1
+    # Beğeni sayısını rastgele bir sayaç parçasında azalt
+    like_counter.increment(db, review_id, -1)
     
     db.commit()
     
     return {"message": "Beğeni geri alındı"}
 
 
-def update_content_review_count(content_id: int, db: Session):
-    """İçeriğin yorum sayısını güncelle"""
+def liked_review_ids(db: Session, user_id: int, review_ids: List[int]) -> Set[int]:
+    """Kullanıcının verilen yorumlardan beğendiklerini tek sorguda bul"""
     
-    count = db.query(func.count(Review.id)).filter(Review.content_id == content_id).scalar()
+    if not review_ids:
+        return set()
     
-    content = db.query(Content).filter(Content.id == content_id).first()
-    
-    if content:
-        content.total_reviews = count
-        db.commit()
-
+    return {
+        review_id for (review_id,) in db.query(Like.review_id).filter(
+            Like.user_id == user_id,
+            Like.review_id.in_(review_ids)
+        )
+    }
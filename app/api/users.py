@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from sqlalchemy import and_, or_
+from typing import List, Optional, Set, Tuple
 from app.database import get_db
 from app.models.user import User
 from app.models.follow import Follow
 from app.models.rating import Rating
 from app.models.review import Review
-from app.schemas.user import UserResponse, UserUpdate
-from app.core.deps import get_current_active_user
+from app.models.library import UserLibrary
+from app.schemas.user import UserResponse, UserUpdate, FollowUserResponse
+from app.core.deps import get_current_active_user, get_current_user_optional
+from app.services.recommendation_service import recommendation_service
+from app.services.taste_service import taste_service
+from app.services.follow_graph_service import follow_graph
+from app.services.user_stats_service import user_stats
+from app.api.contents import serialize_content
+from app.utils.upsert import insert_ignore
+from app.utils.pagination import keyset_paginate, set_next_cursor
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -50,35 +58,101 @@ def update_current_user_profile(
     return UserResponse.model_validate(current_user)
 
 
-@router.get("/{username}", response_model=dict)
-def get_user_profile(username: str, db: Session = Depends(get_db)):
-    """Belirli bir kullanıcının profilini getir"""
+@router.get("/me/recommendations")
+def get_my_recommendations(
+    limit: int = Query(20, ge=1, le=50),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Beğendiğim içeriklere benzer, henüz puanlamadığım içerikler"""
     
-    user = db.query(User).filter(User.username == username).first()
+    recommendations = recommendation_service.get_recommendations(current_user.id, db, limit)
     
-    if not user:
+    return [
+        {"content": serialize_content(content), "score": round(strength, 4)}
+        for content, strength in recommendations
+    ]
+
+
+@router.get("/me/similar-taste")
+def get_users_with_similar_taste(
+    limit: int = Query(20, ge=1, le=50),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Zevki bana en çok benzeyen kullanıcılar"""
+    return taste_service.get_similar_users(current_user.id, db, limit)
+
+
+@router.get("/me/suggestions")
+def get_follow_suggestions(
+    limit: int = Query(20, ge=1, le=50),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Takip önerileri (takip ettiklerimin takip ettikleri)"""
+    return follow_graph.suggest(current_user.id, db, limit)
+
+
+@router.get("/me/content-state")
+def get_my_content_state(
+    ids: str = Query(..., description="Virgülle ayrılmış içerik ID'leri (en fazla 100)"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Birden fazla içerik için puanım, kütüphane durumum ve yorum yapıp yapmadığım"""
+    
+    try:
+        content_ids = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Kullanıcı bulunamadı"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="İçerik ID'leri virgülle ayrılmış sayılar olmalı"
+        )
+    
+    if not content_ids or len(content_ids) > 100:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="1 ile 100 arasında içerik ID'si gönderilmeli"
         )
     
-    # İstatistikleri hesapla
-    stats = {
-        "total_ratings": db.query(func.count(Rating.id)).filter(Rating.user_id == user.id).scalar(),
-        "total_reviews": db.query(func.count(Review.id)).filter(Review.user_id == user.id).scalar(),
-        "followers_count": db.query(func.count(Follow.id)).filter(Follow.followed_id == user.id).scalar(),
-        "following_count": db.query(func.count(Follow.id)).filter(Follow.follower_id == user.id).scalar(),
+    # Kart başına ayrı istek yerine her tablo için tek IN sorgusu
+    ratings = db.query(Rating.content_id, Rating.id, Rating.score).filter(
+        Rating.user_id == current_user.id,
+        Rating.content_id.in_(content_ids)
+    ).all()
+    
+    library_statuses = dict(db.query(UserLibrary.content_id, UserLibrary.status).filter(
+        UserLibrary.user_id == current_user.id,
+        UserLibrary.content_id.in_(content_ids)
+    ).all())
+    
+    reviewed = {
+        content_id for (content_id,) in db.query(Review.content_id).filter(
+            Review.user_id == current_user.id,
+            Review.content_id.in_(content_ids)
+        ).distinct()
     }
     
+    my_ratings = {content_id: {"id": rating_id, "score": score} for content_id, rating_id, score in ratings}
+    
     return {
-        "user": UserResponse.model_validate(user),
-        "stats": stats
+        str(content_id): {
+            "rating": my_ratings.get(content_id),
+            "library_status": library_statuses[content_id].value if content_id in library_statuses else None,
+            "reviewed": content_id in reviewed
+        }
+        for content_id in content_ids
     }
 
 
-@router.get("/{username}/followers", response_model=List[UserResponse])
-def get_user_followers(username: str, db: Session = Depends(get_db)):
-    """Kullanıcının takipçilerini listele"""
+@router.get("/{username}", response_model=dict)
+def get_user_profile(
+    username: str,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    """Belirli bir kullanıcının profilini getir"""
     
     user = db.query(User).filter(User.username == username).first()
     
@@ -88,16 +162,30 @@ def get_user_followers(username: str, db: Session = Depends(get_db)):
             detail="Kullanıcı bulunamadı"
         )
     
-    followers = db.query(User).join(Follow, Follow.follower_id == User.id)\
-        .filter(Follow.followed_id == user.id).all()
+    # İstatistikler: sayaç tablosundan tek birincil anahtar okuması
+    stats = user_stats.get(db, user.id)
+    
+    # Giriş yapmış kullanıcı ile profil sahibi arasındaki zevk uyumu ve takip ilişkisi
+    taste_match = None
+    relationship = None
+    if current_user and current_user.id != user.id:
+        taste_match = taste_service.get_match(current_user.id, user.id, db)
+        relationship = follow_graph.relationship(current_user.id, user.id, db)
+        
+        # Takip butonu için kesin durum: diğer worker'ların indeksi takip olayını henüz görmemiş olabilir
+        follows_you, you_follow = relationship_flags(db, current_user.id, [user.id])
+        relationship["follows_you"] = user.id in follows_you
+        relationship["you_follow"] = user.id in you_follow
     
-    return [UserResponse.model_validate(follower) for follower in followers]
+    return {
+        "user": UserResponse.model_validate(user),
+        "stats": stats,
+        "taste_match": taste_match,
+        "relationship": relationship
+    }
 
 
-@router.get("/{username}/following", response_model=List[UserResponse])
-def get_user_following(username: str, db: Session = Depends(get_db)):
-    """Kullanıcının takip ettiklerini listele"""
-    
+def get_user_or_404(username: str, db: Session) -> User:
     user = db.query(User).filter(User.username == username).first()
     
     if not user:
@@ -106,10 +194,99 @@ def get_user_following(username: str, db: Session = Depends(get_db)):
             detail="Kullanıcı bulunamadı"
         )
     
-    following = db.query(User).join(Follow, Follow.followed_id == User.id)\
-        .filter(Follow.follower_id == user.id).all()
+    return user
+
+
+def relationship_flags(db: Session, viewer_id: int, user_ids: List[int]) -> Tuple[Set[int], Set[int]]:
+    """Görüntüleyenin sayfadaki kullanıcılarla takip ilişkileri (tek sorguda): (beni takip edenler, takip ettiklerim)"""
+    
+    if not user_ids:
+        return set(), set()
+    
+    edges = db.query(Follow.follower_id, Follow.followed_id).filter(
+        or_(
+            and_(Follow.follower_id == viewer_id, Follow.followed_id.in_(user_ids)),
+            and_(Follow.followed_id == viewer_id, Follow.follower_id.in_(user_ids))
+        )
+    ).all()
+    
+    follows_you = {follower_id for follower_id, followed_id in edges if followed_id == viewer_id}
+    you_follow = {followed_id for follower_id, followed_id in edges if follower_id == viewer_id}
+    return follows_you, you_follow
+
+
+def list_follows(
+    db: Session,
+    condition,
+    user_column,
+    cursor: Optional[str],
+    limit: int,
+    viewer: Optional[User],
+    response: Response
+) -> List[FollowUserResponse]:
+    """Takip kayıtlarını (created_at, id) üzerinde imleçle sayfala ve ilişki bayraklarını ekle"""
+    
+    query = db.query(Follow, User)\
+        .join(User, user_column == User.id)\
+        .filter(condition)
+    
+    rows, next_cursor = keyset_paginate(
+        query,
+        [Follow.created_at, Follow.id],
+        cursor,
+        limit,
+        key=lambda row: [row[0].created_at, row[0].id]
+    )
+    set_next_cursor(response, next_cursor)
+    
+    follows_you, you_follow = set(), set()
+    if viewer:
+        follows_you, you_follow = relationship_flags(db, viewer.id, [user.id for _, user in rows])
+    
+    return [
+        FollowUserResponse.model_validate(user).model_copy(update={
+            "followed_at": follow.created_at,
+            "follows_you": user.id in follows_you,
+            "you_follow": user.id in you_follow
+        })
+        for follow, user in rows
+    ]
+
+
+@router.get("/{username}/followers", response_model=List[FollowUserResponse])
+def get_user_followers(
+    username: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    """Kullanıcının takipçilerini listele (en yeni takip önce, sonraki sayfa imleci X-Next-Cursor başlığında)"""
+    
+    user = get_user_or_404(username, db)
+    
+    return list_follows(
+        db, Follow.followed_id == user.id, Follow.follower_id, cursor, limit, current_user, response
+    )
+
+
+@router.get("/{username}/following", response_model=List[FollowUserResponse])
+def get_user_following(
+    username: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    """Kullanıcının takip ettiklerini listele (en yeni takip önce, sonraki sayfa imleci X-Next-Cursor başlığında)"""
+    
+    user = get_user_or_404(username, db)
     
-    return [UserResponse.model_validate(followed) for followed in following]
+    return list_follows(
+        db, Follow.follower_id == user.id, Follow.followed_id, cursor, limit, current_user, response
+    )
 
 
 @router.post("/{username}/follow", status_code=status.HTTP_201_CREATED)
@@ -135,28 +312,25 @@ def follow_user(
             detail="Kendinizi takip edemezsiniz"
         )
     
-    # Zaten takip ediliyor mu?
-    existing_follow = db.query(Follow).filter(
-        Follow.follower_id == current_user.id,
-        Follow.followed_id == user_to_follow.id
-    ).first()
+    # Tek sorguda ekle; unique kısıtı tekrar takibi sessizce atlar
+    inserted = db.execute(
+        insert_ignore(Follow.__table__).values(follower_id=current_user.id, followed_id=user_to_follow.id)
+    ).rowcount
     
-    if existing_follow:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Bu kullanıcıyı zaten takip ediyorsunuz"
-        )
+    if inserted:
+        user_stats.apply(db, {
+            current_user.id: {"following_count": 1},
+            user_to_follow.id: {"followers_count": 1}
+        })
+    db.commit()
     
-    # Takip ilişkisi oluştur
-    new_follow = Follow(
-        follower_id=current_user.id,
-        followed_id=user_to_follow.id
-    )
+    if not inserted:
+        return {"message": f"{username} zaten takip ediliyor", "following": True}
     
-    db.add(new_follow)
-    db.commit()
+    # Takip grafiği indeksini güncelle
+    follow_graph.add_edge(current_user.id, user_to_follow.id)
     
-    return {"message": f"{username} takip edildi"}
+    return {"message": f"{username} takip edildi", "following": True}
 
 
 @router.delete("/{username}/unfollow", status_code=status.HTTP_200_OK)
@@ -175,20 +349,27 @@ def unfollow_user(
             detail="Kullanıcı bulunamadı"
         )
     
-    # Takip ilişkisini bul
-    follow = db.query(Follow).filter(
+    # Tek sorguda sil; sayaçlar yalnızca gerçekten silinen takip için düşer
+    deleted = db.query(Follow).filter(
         Follow.follower_id == current_user.id,
         Follow.followed_id == user_to_unfollow.id
-    ).first()
+    ).delete(synchronize_session=False)
     
-    if not follow:
+    if not deleted:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Bu kullanıcıyı takip etmiyorsunuz"
         )
     
-    db.delete(follow)
+    user_stats.apply(db, {
+        current_user.id: {"following_count": -1},
+        user_to_unfollow.id: {"followers_count": -1}
+    })
     db.commit()
     
+    # Takip grafiği indeksini güncelle
+    follow_graph.remove_edge(current_user.id, user_to_unfollow.id)
+    
     return {"message": f"{username} takipten çıkarıldı"}
 
@@ -16,7 +16,11 @@ class Settings(BaseSettings):
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    TOKEN_REVOCATION_SYNC_SECONDS: float = 5.0  # Diğer worker'lardaki çıkışların bu worker'a yansıma süresi
+    PASSWORD_RESET_TOKEN_EXPIRE_MINUTES: int = 60
+    PASSWORD_RESET_SWEEP_SECONDS: float = 600.0  # Süresi dolmuş şifre sıfırlama token'larının silinme aralığı
     
     # Harici API'ler
     TMDB_API_KEY: str
@@ -28,12 +32,31 @@ class Settings(BaseSettings):
     SMTP_USER: Optional[str] = None
     SMTP_PASSWORD: Optional[str] = None
     EMAIL_FROM: str = "noreply@weblibrary.com"
+    EMAIL_TRANSPORT: Optional[str] = None  # smtp, console veya file (boşsa SMTP bilgisi varsa smtp, yoksa console)
+    EMAIL_FILE_DIR: str = "outbox_emails"  # file gönderici .eml dosyalarını buraya yazar
+    EMAIL_SEND_INTERVAL_SECONDS: float = 2.0  # Outbox'taki bekleyen e-postaların gönderilme aralığı
     
     # Uygulama
     APP_NAME: str = "Web Library Platform"
     APP_VERSION: str = "1.0.0"
     DEBUG: bool = True
     
+    # İçerik istatistikleri: True ise sayaç değişiklikleri outbox'a yazılıp periyodik olarak toplu uygulanır
+    STATS_WRITE_BEHIND: bool = False
+    STATS_FLUSH_INTERVAL_SECONDS: float = 2.0
+    
+    # Yorum beğeni sayacı parçalarının likes_count'a katlanma aralığı
+    LIKE_FOLD_INTERVAL_SECONDS: float = 300.0
+    
+    # Kimliği doğrulanmış kullanıcı önbelleği (profil/şifre değişikliği diğer worker'lara en geç TTL sonunda yansır)
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    
+    # Şifre hashleme süreç havuzu (0: istek iş parçacığında çalıştır); dolunca 503 + Retry-After
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 32
+    PASSWORD_HASH_TIMEOUT_SECONDS: float = 10.0
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,8 +1,11 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+from typing import Optional
 from app.database import get_db
 from app.core.security import decode_access_token
+from app.core.principal_cache import principal_cache
+from app.services.token_service import revocation_list
 from app.models.user import User
 
 # OAuth2 şeması
@@ -20,25 +23,42 @@ def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    payload = decode_access_token(token)
+    claims = principal_cache.get_claims(token)
     
-    if payload is None:
-        raise credentials_exception
-    
-    user_id_str = payload.get("sub")
+    if claims is None:
+        payload = decode_access_token(token)
+        
+        if payload is None:
+            raise credentials_exception
+        
+        user_id_str = payload.get("sub")
+        
+        if user_id_str is None:
+            raise credentials_exception
+        
+        try:
+            claims = (int(user_id_str), payload.get("jti"))
+        except (ValueError, TypeError):
+            raise credentials_exception
+        
+        principal_cache.set_claims(token, *claims, payload.get("exp"))
     
-    if user_id_str is None:
-        raise credentials_exception
+    user_id, jti = claims
     
-    try:
-        user_id: int = int(user_id_str)
-    except (ValueError, TypeError):
+    # Çıkış yapılmış token: bellekteki iptal listesinden (DB sorgusu yok)
+    if revocation_list.is_revoked(jti):
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == user_id).first()
+    # Önbellek isabetinde DB sorgusu yapılmaz
+    user = principal_cache.get_user(user_id, db)
     
     if user is None:
-        raise credentials_exception
+        user = db.query(User).filter(User.id == user_id).first()
+        
+        if user is None:
+            raise credentials_exception
+        
+        principal_cache.set_user(user)
     
     return user
 
@@ -52,3 +72,23 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
         )
     return current_user
 
+
+
+# Token zorunlu olmayan endpoint'ler için OAuth2 şeması
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login/token", auto_error=False)
+
+
+def get_current_user_optional(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> Optional[User]:
+    """Token varsa aktif kullanıcıyı getir, yoksa None döndür"""
+    if not token:
+        return None
+    
+    try:
+        user = get_current_user(token, db)
+    except HTTPException:
+        return None
+    
+    return user if user.is_active else None
@@ -0,0 +1,87 @@
+import time
+from typing import Optional, Tuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.config import settings
+from app.models.user import User
+from app.utils.cache import TTLCache
+
+
+class PrincipalCache:
+    """
+    Kimliği doğrulanmış kullanıcı önbelleği
+    
+    Çözülmüş token -> (kullanıcı ID, jti) ve kullanıcı ID -> oturumdan ayrılmış (detached) User
+    kopyası tutulur. İsabette kopya merge(load=False) ile isteğin oturumuna sorgusuz
+    bağlanır. User satırı ORM üzerinden güncellenince veya silinince kayıt düşürülür;
+    diğer worker'lardaki kopyalar en geç TTL sonunda yenilenir.
+    """
+    
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._tokens = TTLCache(max_size, ttl_seconds)
+        self._users = TTLCache(max_size, ttl_seconds)
+    
+    def get_claims(self, token: str) -> Optional[Tuple[int, Optional[str]]]:
+        return self._tokens.get(token)
+    
+    def set_claims(self, token: str, user_id: int, jti: Optional[str], expires_at: Optional[float]):
+        """Token'ı en geç kendi son kullanma zamanında düşecek şekilde kaydet"""
+        
+        ttl = self.ttl_seconds
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        if ttl > 0:
+            self._tokens.set(token, (user_id, jti), ttl)
+    
+    def get_user(self, user_id: int, db: Session) -> Optional[User]:
+        """Önbellekteki kullanıcıyı DB'ye gitmeden isteğin oturumuna bağla"""
+        
+        snapshot = self._users.get(user_id)
+        if snapshot is None:
+            return None
+        
+        # Önbellekteki kopya değişmez; oturuma onun durumunu taşıyan yeni bir örnek eklenir
+        return db.merge(snapshot, load=False)
+    
+    def set_user(self, user: User):
+        """Yüklenen kullanıcının sütun değerlerinden oturumsuz bir kopya sakla"""
+        
+        values = {attribute.key: getattr(user, attribute.key) for attribute in inspect(User).column_attrs}
+        snapshot = User(**values)
+        make_transient_to_detached(snapshot)
+        self._users.set(user.id, snapshot)
+    
+    def invalidate(self, user_id: int):
+        self._users.pop(user_id)
+    
+    def clear(self):
+        self._tokens.clear()
+        self._users.clear()
+
+
+# Singleton instance
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+INVALIDATED_KEY = "principal_cache_invalidated"
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target: User):
+    # Hemen düşür; commit'ten önce eski satırı okuyup tekrar önbelleğe alanlar için commit'te bir kez daha
+    principal_cache.invalidate(target.id)
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault(INVALIDATED_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session):
+    for user_id in session.info.pop(INVALIDATED_KEY, ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidated_users(session: Session):
+    session.info.pop(INVALIDATED_KEY, None)
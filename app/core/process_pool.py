@@ -0,0 +1,95 @@
+import math
+import time
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Optional
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+
+class BoundedProcessPool:
+    """
+    CPU yoğun işler için kabul kontrollü süreç havuzu
+    
+    İşler GIL dışında ayrı süreçlerde çalışır ve sonuç event loop'ta beklenir; bekleyen
+    istekler iş parçacığı tutmadığı için ortak threadpool'daki diğer endpoint'ler aç kalmaz.
+    Aynı anda en fazla workers + queue_size iş kabul edilir (zaman aşımına uğrayan ama
+    çalışmaya devam eden işler de sayılır), fazlası beklemeden 503 ve tahmini Retry-After
+    ile reddedilir.
+    """
+    
+    def __init__(self, name: str, workers: int, queue_size: int, timeout_seconds: float):
+        self.name = name
+        self.workers = workers
+        self.timeout_seconds = timeout_seconds
+        self._slots = threading.BoundedSemaphore(workers + queue_size) if workers > 0 else None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._average_seconds = 0.25  # Kuyruk beklemesi dahil iş süresi (üstel hareketli ortalama)
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # fork, ana süreçteki iş parçacıklarının kilitlerini kopyalayabilir
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+    
+    def start(self):
+        """Süreçleri ilk istekten önce başlat (spawn maliyeti istek sırasında ödenmesin)"""
+        if self.workers > 0:
+            executor = self._get_executor()
+            for future in [executor.submit(time.sleep, 0) for _ in range(self.workers)]:
+                future.result()
+    
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def _retry_after(self) -> int:
+        """Havuz doluyken son işlerin kuyruk dahil süresi, yer açılması için iyi bir tahmindir"""
+        return max(1, math.ceil(self._average_seconds))
+    
+    def _busy(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Sunucu şu anda yoğun, lütfen biraz sonra tekrar deneyin",
+            headers={"Retry-After": str(self._retry_after())}
+        )
+    
+    def _finished(self, future: Future, started: float):
+        """İş gerçekten bittiğinde (veya kuyruktayken iptal edildiğinde) yeri boşalt"""
+        
+        self._slots.release()
+        if not future.cancelled():
+            with self._lock:
+                self._average_seconds = 0.9 * self._average_seconds + 0.1 * (time.perf_counter() - started)
+    
+    async def run(self, func: Callable, *args) -> Any:
+        """İşi havuzda çalıştır ve sonucunu iş parçacığı tutmadan bekle (havuz doluysa 503)"""
+        
+        if self._slots is None:
+            return await run_in_threadpool(func, *args)
+        
+        if not self._slots.acquire(blocking=False):
+            raise self._busy()
+        
+        started = time.perf_counter()
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda done: self._finished(done, started))
+        
+        try:
+            # Zaman aşımında kuyruktaki iş iptal edilir; çalışmakta olan iş bitene kadar yerini tutar
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            raise self._busy()
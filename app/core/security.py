@@ -1,23 +1,41 @@
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config import settings
+from app.core.process_pool import BoundedProcessPool
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt ortak threadpool'u ve GIL'i meşgul etmesin diye ayrı süreçlerde çalışır
+password_pool = BoundedProcessPool(
+    "password-hash",
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_QUEUE_SIZE,
+    settings.PASSWORD_HASH_TIMEOUT_SECONDS
+)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Şifreyi doğrula"""
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
-    """Şifreyi hashle"""
+def _hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Şifreyi doğrula (havuz doluysa 503)"""
+    return await password_pool.run(_verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash(password: str) -> str:
+    """Şifreyi hashle (havuz doluysa 503)"""
+    return await password_pool.run(_hash_password, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Access token oluştur"""
     to_encode = data.copy()
@@ -27,7 +45,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # jti: çıkışta token'ı süresi dolmadan iptal edebilmek için benzersiz kimlik
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     
     return encoded_jwt
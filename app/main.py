@@ -1,8 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.database import engine, Base
+from app.database import engine, Base, SessionLocal
 from app.api import auth, users, contents, ratings, reviews, library, custom_lists, feed, likes
+from app.services.similarity_service import content_similarity_index
+from app.services.content_stats_service import stats_write_behind
+from app.services.like_counter_service import like_counter
+from app.services.follow_graph_service import follow_graph
+from app.core.security import password_pool
+from app.services.token_service import reset_tokens, revocation_list
+from app.services.email_service import email_outbox
 
 # Veritabanı tablolarını oluştur
 Base.metadata.create_all(bind=engine)
@@ -50,6 +57,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Router'ları dahil et
@@ -64,6 +72,37 @@ app.include_router(feed.router, prefix="/api")
 app.include_router(likes.router, prefix="/api")
 
 
+@app.on_event("startup")
+def load_in_memory_indexes():
+    """Bellek içi indeksleri yükle"""
+    content_similarity_index.build_in_background(SessionLocal)
+    follow_graph.start(SessionLocal)
+
+
+@app.on_event("startup")
+def start_background_workers():
+    """Arka plan iş parçacıklarını başlat"""
+    if settings.STATS_WRITE_BEHIND:
+        stats_write_behind.start(SessionLocal, settings.STATS_FLUSH_INTERVAL_SECONDS)
+    like_counter.start(SessionLocal, settings.LIKE_FOLD_INTERVAL_SECONDS)
+    password_pool.start()
+    revocation_list.start(SessionLocal, settings.TOKEN_REVOCATION_SYNC_SECONDS)
+    email_outbox.start(SessionLocal, settings.EMAIL_SEND_INTERVAL_SECONDS)
+    reset_tokens.start(SessionLocal, settings.PASSWORD_RESET_SWEEP_SECONDS)
+
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    """Kapanışta bekleyen istatistik deltalarını boşalt"""
+    stats_write_behind.stop()
+    like_counter.stop()
+    password_pool.shutdown()
+    revocation_list.stop()
+    follow_graph.stop()
+    email_outbox.stop()
+    reset_tokens.stop()
+
+
 @app.get("/")
 def root():
     """API Ana Sayfası"""
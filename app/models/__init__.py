@@ -8,7 +8,13 @@ from app.models.library import UserLibrary, LibraryStatus
 from app.models.custom_list import CustomList, CustomListItem
 from app.models.follow import Follow
 from app.models.activity import Activity, ActivityType
-from app.models.like import Like
+from app.models.like import Like, ReviewLikeShard
+from app.models.recommendation import ContentNeighbor
+from app.models.content_stat_delta import ContentStatDelta
+from app.models.user_stats import UserStats
+from app.models.library_stat import LibraryStat
+from app.models.auth_token import RefreshToken, RevokedToken, PasswordResetToken
+from app.models.email_outbox import OutboxEmail
 
 __all__ = [
     "User",
@@ -25,6 +31,15 @@ __all__ = [
     "Follow",
     "Activity",
     "ActivityType",
-    "Like"
+    "Like",
+    "ReviewLikeShard",
+    "ContentNeighbor",
+    "ContentStatDelta",
+    "UserStats",
+    "LibraryStat",
+    "RefreshToken",
+    "RevokedToken",
+    "PasswordResetToken",
+    "OutboxEmail"
 ]
 
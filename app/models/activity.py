@@ -33,6 +33,9 @@ class Activity(Base):
     # Ek bilgi (JSON formatında ekstra veri saklanabilir)
     extra_data = Column(String(1000), nullable=True)
     
+    # Beğeni sayacı (beğenme/geri almada göreli olarak güncellenir)
+    likes_count = Column(Integer, default=0)
+    
     # Zaman damgası
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     
@@ -0,0 +1,70 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from datetime import datetime
+from app.database import Base
+
+
+class RefreshToken(Base):
+    """Yenileme (refresh) token'ı; token'ın kendisi değil SHA-256 özeti saklanır"""
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    token_hash = Column(String(64), unique=True, nullable=False)
+    
+    # Aynı girişten dönen tüm token'lar bir aileye aittir; kullanılmış token tekrar gelirse aile iptal edilir
+    family_id = Column(String(32), nullable=False)
+    
+    # Zaman damgaları
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)  # Döndürüldü veya iptal edildi
+    
+    __table_args__ = (
+        Index('idx_refresh_tokens_user', 'user_id'),
+        Index('idx_refresh_tokens_family', 'family_id'),
+        Index('idx_refresh_tokens_expires', 'expires_at'),
+    )
+    
+    def __repr__(self):
+        return f"<RefreshToken(id={self.id}, user_id={self.user_id}, family='{self.family_id}')>"
+
+
+class RevokedToken(Base):
+    """Süresi dolmadan iptal edilen access token (jti); her worker bellekteki filtresini buradan eşitler"""
+    __tablename__ = "revoked_tokens"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String(32), unique=True, nullable=False)
+    
+    # Token'ın kendi son kullanma zamanı; sonrasında kayıt silinebilir
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('idx_revoked_tokens_expires', 'expires_at'),
+        Index('idx_revoked_tokens_created', 'created_at'),
+    )
+    
+    def __repr__(self):
+        return f"<RevokedToken(jti='{self.jti}', expires_at={self.expires_at})>"
+
+
+class PasswordResetToken(Base):
+    """Şifre sıfırlama token'ı; token'ın kendisi değil SHA-256 özeti saklanır (tek kullanımlık)"""
+    __tablename__ = "password_reset_tokens"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    token_hash = Column(String(64), unique=True, nullable=False)
+    
+    # Zaman damgaları
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+    
+    __table_args__ = (
+        Index('idx_password_reset_tokens_user', 'user_id'),
+        Index('idx_password_reset_tokens_expires', 'expires_at'),
+    )
+    
+    def __repr__(self):
+        return f"<PasswordResetToken(id={self.id}, user_id={self.user_id}, expires_at={self.expires_at})>"
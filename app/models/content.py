@@ -11,6 +11,10 @@ class ContentType(str, Enum):
     BOOK = "book"
 
 
+# Puan dağılımı kovaları (1-10)
+RATING_BUCKETS = range(1, 11)
+
+
 class Content(Base):
     """İçerik base modeli (Film ve Kitap için ortak)"""
     __tablename__ = "contents"
@@ -28,11 +32,24 @@ class Content(Base):
     tmdb_id = Column(Integer, nullable=True, index=True)  # TMDb için
     google_books_id = Column(String(50), nullable=True, index=True)  # Google Books için
     
-    # İstatistikler
+    # İstatistikler (average_rating, rating_sum / total_ratings'ten türetilir)
     average_rating = Column(Float, default=0.0)
+    rating_sum = Column(Float, default=0.0)
     total_ratings = Column(Integer, default=0)
     total_reviews = Column(Integer, default=0)
     
+    # Puan dağılımı: her tam puan için bir sayaç (9.5 -> 9, 10 -> 10)
+    rating_count_1 = Column(Integer, default=0)
+    rating_count_2 = Column(Integer, default=0)
+    rating_count_3 = Column(Integer, default=0)
+    rating_count_4 = Column(Integer, default=0)
+    rating_count_5 = Column(Integer, default=0)
+    rating_count_6 = Column(Integer, default=0)
+    rating_count_7 = Column(Integer, default=0)
+    rating_count_8 = Column(Integer, default=0)
+    rating_count_9 = Column(Integer, default=0)
+    rating_count_10 = Column(Integer, default=0)
+    
     # Zaman damgaları
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -51,6 +68,11 @@ class Content(Base):
     list_items = relationship("CustomListItem", back_populates="content", cascade="all, delete-orphan")
     activities = relationship("Activity", back_populates="content", cascade="all, delete-orphan")
     
+    @property
+    def rating_histogram(self) -> list:
+        """1'den 10'a kadar puan dağılımı"""
+        return [getattr(self, f"rating_count_{bucket}") or 0 for bucket in RATING_BUCKETS]
+    
     def __repr__(self):
         return f"<Content(id={self.id}, title='{self.title}', type='{self.content_type}')>"
 
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index
+from datetime import datetime
+from app.database import Base
+
+
+class ContentStatDelta(Base):
+    """Henüz contents tablosuna uygulanmamış istatistik değişikliği (write-behind outbox)"""
+    __tablename__ = "content_stat_deltas"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # contents satırı kilitlenmesin diye foreign key yok; içerik silinirse delta boşa uygulanır
+    content_id = Column(Integer, nullable=False)
+    
+    # Güncellenecek sayaç sütunu (rating_sum, total_ratings, rating_count_N, total_reviews)
+    field = Column(String(30), nullable=False)
+    delta = Column(Float, nullable=False)
+    
+    # Zaman damgası
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('idx_content_stat_deltas_created', 'created_at'),
+        Index('idx_content_stat_deltas_content', 'content_id'),
+    )
+    
+    def __repr__(self):
+        return f"<ContentStatDelta(content_id={self.content_id}, field='{self.field}', delta={self.delta})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -42,6 +42,11 @@ class CustomListItem(Base):
     # Zaman damgası
     added_at = Column(DateTime, default=datetime.utcnow)
     
+    # Bir içerik bir listede sadece bir kez bulunabilir
+    __table_args__ = (
+        UniqueConstraint('list_id', 'content_id', name='unique_list_content'),
+    )
+    
     # İlişkiler
     custom_list = relationship("CustomList", back_populates="items")
     content = relationship("Content", back_populates="list_items")
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from datetime import datetime
+from app.database import Base
+
+
+class OutboxEmail(Base):
+    """Gönderilmeyi bekleyen e-posta (istek sırasında yazılır, arka planda gönderilir)"""
+    __tablename__ = "email_outbox"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    recipient = Column(String(100), nullable=False)
+    subject = Column(String(255), nullable=False)
+    text_body = Column(Text, nullable=False)
+    html_body = Column(Text, nullable=True)
+    
+    # pending: gönderilecek, sent: gönderildi, failed: deneme hakkı bitti
+    status = Column(String(10), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String(500), nullable=True)
+    
+    # Zaman damgaları
+    created_at = Column(DateTime, default=datetime.utcnow)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index('idx_email_outbox_due', 'status', 'next_attempt_at'),
+    )
+    
+    def __repr__(self):
+        return f"<OutboxEmail(id={self.id}, recipient='{self.recipient}', status='{self.status}')>"
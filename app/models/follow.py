@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -18,6 +18,9 @@ class Follow(Base):
     # Bir kullanıcı başka bir kullanıcıyı sadece bir kez takip edebilir
     __table_args__ = (
         UniqueConstraint('follower_id', 'followed_id', name='unique_follow'),
+        # Takipçi/takip listelerinin imleçli sayfalaması için
+        Index('idx_follows_followed_created', 'followed_id', 'created_at', 'id'),
+        Index('idx_follows_follower_created', 'follower_id', 'created_at', 'id'),
     )
     
     # İlişkiler
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from datetime import datetime
+from app.database import Base
+
+
+class LibraryStat(Base):
+    """Kullanıcının kütüphane/puanlama istatistiklerinin bir kovası (durum, tür veya ay)"""
+    __tablename__ = "user_library_stats"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    
+    # status: kütüphane durumu, genre: tür/kategori (izlenen/okunanlar), month: YYYY-MM
+    # Kova ikili karşılaştırılır: Python'da farklı olan tür adları anahtar çakışmasına yol açmasın
+    dimension = Column(String(10), primary_key=True)
+    bucket = Column(String(100, collation="utf8mb4_bin"), primary_key=True)
+    
+    # Yazma işlemleriyle aynı transaction içinde göreli olarak güncellenir
+    items = Column(Integer, nullable=False, default=0)
+    runtime_minutes = Column(Integer, nullable=False, default=0)
+    pages = Column(Integer, nullable=False, default=0)
+    ratings = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Float, nullable=False, default=0.0)
+    
+    # Zaman damgası
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<LibraryStat(user_id={self.user_id}, {self.dimension}='{self.bucket}', items={self.items})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -22,6 +22,9 @@ class Like(Base):
     __table_args__ = (
         UniqueConstraint('user_id', 'review_id', name='unique_user_review_like'),
         UniqueConstraint('user_id', 'activity_id', name='unique_user_activity_like'),
+        # Beğenenler listesinin imleçli sayfalaması için
+        Index('idx_likes_activity_created', 'activity_id', 'created_at', 'id'),
+        Index('idx_likes_review_created', 'review_id', 'created_at', 'id'),
     )
     
     # İlişkiler
@@ -31,3 +34,18 @@ class Like(Base):
     def __repr__(self):
         return f"<Like(user_id={self.user_id}, review_id={self.review_id}, activity_id={self.activity_id})>"
 
+
+
+class ReviewLikeShard(Base):
+    """Yorum beğeni sayacı parçası (popüler yorumlarda satır kilidi yarışını dağıtmak için)"""
+    __tablename__ = "review_like_shards"
+    
+    # Her yorum için SHARD_COUNT parça; toplam beğeni = likes_count + parçaların toplamı
+    review_id = Column(Integer, ForeignKey("reviews.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    
+    # Henüz likes_count'a katlanmamış değişim (geri almalarda negatif olabilir)
+    count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<ReviewLikeShard(review_id={self.review_id}, shard={self.shard}, count={self.count})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -22,6 +22,9 @@ class Rating(Base):
     # Bir kullanıcı bir içeriğe sadece bir kez puan verebilir
     __table_args__ = (
         UniqueConstraint('user_id', 'content_id', name='unique_user_content_rating'),
+        # İmleçli sayfalama (created_at, id) için
+        Index('idx_ratings_content_created', 'content_id', 'created_at', 'id'),
+        Index('idx_ratings_user_created', 'user_id', 'created_at', 'id'),
     )
     
     # İlişkiler
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.database import Base
+
+
+class ContentNeighbor(Base):
+    """Önceden hesaplanmış benzer içerik modeli (item-to-item öneriler için)"""
+    __tablename__ = "content_neighbors"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    content_id = Column(Integer, ForeignKey("contents.id", ondelete="CASCADE"), nullable=False)
+    neighbor_id = Column(Integer, ForeignKey("contents.id", ondelete="CASCADE"), nullable=False)
+    
+    # Benzerlik skoru ve sıra (1 = en benzer)
+    similarity = Column(Float, nullable=False)
+    rank = Column(Integer, nullable=False)
+    
+    # Zaman damgası
+    computed_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Bir içerik için her komşu sadece bir kez tutulur
+    __table_args__ = (
+        UniqueConstraint('content_id', 'neighbor_id', name='unique_content_neighbor'),
+        Index('idx_content_neighbors_content_rank', 'content_id', 'rank'),
+        Index('idx_content_neighbors_neighbor', 'neighbor_id'),
+    )
+    
+    # İlişkiler
+    neighbor = relationship("Content", foreign_keys=[neighbor_id])
+    
+    def __repr__(self):
+        return f"<ContentNeighbor(content_id={self.content_id}, neighbor_id={self.neighbor_id}, similarity={self.similarity})>"
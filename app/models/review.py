@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -22,6 +22,16 @@ class Review(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # İmleçli sayfalama için
+    __table_args__ = (
+        Index('idx_reviews_content_created', 'content_id', 'created_at', 'id'),
+        Index('idx_reviews_user_created', 'user_id', 'created_at', 'id'),
+        # En çok beğenilen sıralaması için
+        Index('idx_reviews_content_likes', 'content_id', 'likes_count', 'id'),
+        # Yorum araması için (MySQL FULLTEXT)
+        Index('idx_reviews_text_fulltext', 'text', mysql_prefix='FULLTEXT'),
+    )
+    
     # İlişkiler
     user = relationship("User", back_populates="reviews")
     content = relationship("Content", back_populates="reviews")
@@ -21,10 +21,6 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     is_verified = Column(Boolean, default=False)
     
-    # Şifre sıfırlama
-    reset_token = Column(String(100), nullable=True)
-    reset_token_expires = Column(DateTime, nullable=True)
-    
     # Zaman damgaları
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
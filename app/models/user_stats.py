@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from datetime import datetime
+from app.database import Base
+
+
+class UserStats(Base):
+    """Kullanıcı istatistik sayaçları (profil görüntülemede COUNT sorguları yerine)"""
+    __tablename__ = "user_stats"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    
+    # Yazma işlemleriyle aynı transaction içinde göreli olarak güncellenir
+    total_ratings = Column(Integer, nullable=False, default=0)
+    total_reviews = Column(Integer, nullable=False, default=0)
+    followers_count = Column(Integer, nullable=False, default=0)
+    following_count = Column(Integer, nullable=False, default=0)
+    library_count = Column(Integer, nullable=False, default=0)
+    lists_count = Column(Integer, nullable=False, default=0)
+    
+    # Zaman damgası
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<UserStats(user_id={self.user_id}, ratings={self.total_ratings}, followers={self.followers_count})>"
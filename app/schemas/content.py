@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 from datetime import date, datetime
 
 
@@ -14,6 +14,18 @@ class ContentBase(BaseModel):
     average_rating: float
     total_ratings: int
     total_reviews: int
+    rating_histogram: List[int] = []
+    
+    class Config:
+        from_attributes = True
+
+
+class ContentSummary(BaseModel):
+    """Listelerde gösterilen kısa içerik şeması"""
+    id: int
+    content_type: str
+    title: str
+    cover_image_url: Optional[str] = None
     
     class Config:
         from_attributes = True
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from app.models.library import LibraryStatus
 
 
@@ -10,6 +10,32 @@ class LibraryItemCreate(BaseModel):
     status: LibraryStatus
 
 
+class LibraryBulkItem(BaseModel):
+    """Toplu kütüphane işlemindeki tek öğe (status boşsa kütüphaneden çıkarılır)"""
+    content_id: int
+    status: Optional[LibraryStatus] = None
+
+
+class LibraryBulkRequest(BaseModel):
+    """Toplu kütüphane işlemi şeması (aynı içerik birden fazla geçerse son öğe geçerlidir)"""
+    items: List[LibraryBulkItem] = Field(..., min_length=1, max_length=500)
+
+
+class LibraryBulkResult(BaseModel):
+    """Toplu işlemde bir içeriğin sonucu"""
+    content_id: int
+    outcome: str  # added, moved, unchanged, removed, not_found, not_in_library
+    status: Optional[str] = None
+
+
+class LibraryBulkResponse(BaseModel):
+    """Toplu kütüphane işlemi yanıt şeması"""
+    added: int
+    moved: int
+    removed: int
+    results: List[LibraryBulkResult]
+
+
 class LibraryItemResponse(BaseModel):
     """Kütüphane öğesi yanıt şeması"""
     id: int
@@ -39,3 +65,31 @@ class LibraryItemResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+
+class GenreStat(BaseModel):
+    """Tür bazında kütüphane istatistiği (izlenen/okunanlar ve puanlamalar)"""
+    genre: str
+    items: int
+    runtime_minutes: int
+    pages: int
+    ratings: int
+    average_rating: Optional[float] = None
+
+
+class MonthlyStat(BaseModel):
+    """Aylık aktivite (kütüphaneye eklenenler ve puanlamalar)"""
+    month: str
+    library_added: int
+    ratings: int
+    average_rating: Optional[float] = None
+
+
+class LibraryStatsResponse(BaseModel):
+    """Kişisel kütüphane istatistikleri şeması"""
+    status_counts: Dict[str, int]
+    total_items: int
+    watched_minutes: int
+    pages_read: int
+    genres: List[GenreStat]
+    monthly: List[MonthlyStat]
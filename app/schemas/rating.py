@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional
 from app.schemas.user import UserResponse
+from app.schemas.content import ContentSummary
 
 
 class RatingCreate(BaseModel):
@@ -24,6 +25,7 @@ class RatingResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     user: Optional[UserResponse] = None
+    content: Optional[ContentSummary] = None
     
     class Config:
         from_attributes = True
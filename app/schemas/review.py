@@ -1,7 +1,15 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
+from enum import Enum
 from typing import Optional
 from app.schemas.user import UserResponse
+from app.schemas.content import ContentSummary
+
+
+class ReviewSort(str, Enum):
+    """Yorum listeleme sırası"""
+    TOP = "top"  # En çok beğenilen
+    NEW = "new"  # En yeni
 
 
 class ReviewCreate(BaseModel):
@@ -25,7 +33,9 @@ class ReviewResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     username: Optional[str] = None
+    is_liked_by_me: bool = False
     user: Optional[UserResponse] = None
+    content: Optional[ContentSummary] = None
     
     class Config:
         from_attributes = True
@@ -38,13 +38,27 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+class FollowUserResponse(UserResponse):
+    """Takipçi/takip edilen listesi öğesi (görüntüleyen kullanıcıyla ilişki bayraklarıyla)"""
+    followed_at: Optional[datetime] = None
+    follows_you: bool = False  # Bu kullanıcı beni takip ediyor mu?
+    you_follow: bool = False  # Ben bu kullanıcıyı takip ediyor muyum?
+
+
 class TokenResponse(BaseModel):
     """Token yanıt şeması"""
     access_token: str
     token_type: str = "bearer"
+    expires_in: Optional[int] = None  # Access token ömrü (saniye)
+    refresh_token: Optional[str] = None
     user: UserResponse
 
 
+class RefreshTokenRequest(BaseModel):
+    """Token yenileme / çıkış şeması"""
+    refresh_token: str
+
+
 class PasswordResetRequest(BaseModel):
     """Şifre sıfırlama isteği şeması"""
     email: EmailStr
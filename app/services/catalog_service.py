@@ -0,0 +1,40 @@
+from datetime import datetime
+from sqlalchemy.orm import Session
+from app.models.movie import Movie
+from app.services.similarity_service import content_similarity_index
+
+
+def save_movie_from_tmdb(tmdb_id: int, movie_data: dict, db: Session) -> Movie:
+    """TMDb film verisini veritabanına kaydet ve benzerlik indeksine ekle"""
+    
+    # Tarih parse et (güvenli)
+    release_date = None
+    if movie_data.get("release_date"):
+        try:
+            release_date = datetime.strptime(movie_data["release_date"], "%Y-%m-%d").date()
+        except (ValueError, TypeError):
+            release_date = None
+    
+    new_movie = Movie(
+        title=movie_data.get("title"),
+        original_title=movie_data.get("original_title"),
+        description=movie_data.get("overview"),
+        cover_image_url=movie_data.get("poster_url"),
+        tmdb_id=tmdb_id,
+        release_date=release_date,
+        runtime=movie_data.get("runtime"),
+        director=movie_data.get("director"),
+        cast=movie_data.get("cast"),
+        genres=movie_data.get("genres_text"),
+        original_language=movie_data.get("original_language"),
+        imdb_id=movie_data.get("imdb_id")
+    )
+    
+    db.add(new_movie)
+    db.commit()
+    db.refresh(new_movie)
+    
+    # Benzerlik indeksini güncelle
+    content_similarity_index.add(new_movie)
+    
+    return new_movie
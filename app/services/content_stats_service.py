@@ -0,0 +1,383 @@
+import time
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import update, select, delete, func, bindparam, or_, and_, case, true, event, inspect
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.content import Content, RATING_BUCKETS
+from app.models.rating import Rating
+from app.models.review import Review
+from app.models.content_stat_delta import ContentStatDelta
+from app.utils.periodic import PeriodicTask
+
+contents_table = Content.__table__
+deltas_table = ContentStatDelta.__table__
+
+RECONCILE_CHUNK_SIZE = 1000
+
+# Göreli olarak güncellenen sayaç sütunları
+RATING_FIELDS = {"rating_sum", "total_ratings"} | {f"rating_count_{bucket}" for bucket in RATING_BUCKETS}
+STAT_FIELDS = RATING_FIELDS | {"total_reviews"}
+
+
+def _average_rating(rating_sum, total_ratings):
+    """Ortalama puanı sayaçlardan türet (puanlama yoksa 0)"""
+    return func.coalesce(func.round(rating_sum / func.nullif(total_ratings, 0), 2), 0.0)
+
+
+def rating_bucket(score: float) -> int:
+    """Puanın dağılım kovası (9.5 -> 9, 10 -> 10)"""
+    return min(max(int(score), RATING_BUCKETS[0]), RATING_BUCKETS[-1])
+
+
+def _histogram_column(bucket: int):
+    return contents_table.c[f"rating_count_{bucket}"]
+
+
+def _bucket_condition(bucket: int):
+    """Puanın verilen kovaya düştüğü SQL koşulu (rating_bucket ile aynı kural)"""
+    if bucket == RATING_BUCKETS[-1]:
+        return Rating.score >= bucket
+    return and_(Rating.score >= bucket, Rating.score < bucket + 1)
+
+
+def _rating_deltas(old_score: Optional[float], new_score: Optional[float]) -> Dict[str, float]:
+    """Puanlama değişikliğinin sayaçlara etkisi (sıfır olanlar atlanır)"""
+    
+    deltas = {
+        "rating_sum": (new_score or 0.0) - (old_score or 0.0),
+        "total_ratings": (new_score is not None) - (old_score is not None),
+    }
+    
+    # Dağılım kovaları (güncellemede kova değişmediyse dokunulmaz)
+    old_bucket = rating_bucket(old_score) if old_score is not None else None
+    new_bucket = rating_bucket(new_score) if new_score is not None else None
+    if old_bucket != new_bucket:
+        if old_bucket is not None:
+            deltas[f"rating_count_{old_bucket}"] = -1
+        if new_bucket is not None:
+            deltas[f"rating_count_{new_bucket}"] = 1
+    
+    return {field: delta for field, delta in deltas.items() if delta}
+
+
+def apply_counter_deltas(db: Session, content_id: int, deltas: Dict[str, float]):
+    """Sayaç değişikliklerini içeriğe tek göreli UPDATE ile uygula (commit etmez)"""
+    
+    deltas = {field: delta for field, delta in deltas.items() if field in STAT_FIELDS and delta}
+    if not deltas:
+        return
+    
+    values = []
+    
+    # MySQL atamaları soldan sağa uygular: ortalama, sayaçlar değişmeden önce
+    # eski değerler + delta üzerinden hesaplanır
+    if "rating_sum" in deltas or "total_ratings" in deltas:
+        values.append((
+            contents_table.c.average_rating,
+            _average_rating(
+                contents_table.c.rating_sum + deltas.get("rating_sum", 0.0),
+                contents_table.c.total_ratings + int(deltas.get("total_ratings", 0))
+            )
+        ))
+    
+    for field, delta in deltas.items():
+        column = contents_table.c[field]
+        values.append((column, column + (delta if field == "rating_sum" else int(delta))))
+    
+    db.execute(
+        update(contents_table)
+        .where(contents_table.c.id == content_id)
+        .ordered_values(*values)
+    )
+
+
+def _record_deltas(db: Session, content_id: int, deltas: Dict[str, float]):
+    if settings.STATS_WRITE_BEHIND:
+        stats_write_behind.record(db, content_id, deltas)
+    else:
+        apply_counter_deltas(db, content_id, deltas)
+
+
+def apply_rating_delta(db: Session, content_id: int, old_score: Optional[float], new_score: Optional[float]):
+    """İçeriğin puanlama sayaçlarını güncelle (commit etmez)"""
+    
+    # Oluşturmada old_score, silmede new_score None'dır.
+    # Okuma-yazma yerine göreli güncelleme: eşzamanlı puanlamalar birbirini ezmez
+    _record_deltas(db, content_id, _rating_deltas(old_score, new_score))
+
+
+def apply_review_delta(db: Session, content_id: int, delta: int):
+    """İçeriğin yorum sayacını güncelle (commit etmez)"""
+    _record_deltas(db, content_id, {"total_reviews": delta})
+
+
+class StatsWriteBehind:
+    """
+    İçerik sayaçları için write-behind tamponu
+    
+    Her yazma, isteğin transaction'ı içinde content_stat_deltas outbox'ına bir satır ekler;
+    commit sonrası delta süreç içi tampona alınır ve arka plan iş parçacığı tamponu periyodik
+    olarak içerik başına tek UPDATE ile uygular. Böylece popüler bir içeriğin contents satırı
+    her yazmada değil, her boşaltmada bir kez kilitlenir. Outbox satırı delta ile aynı
+    transaction'da silindiğinden süreç çökse bile sayaçlar kaybolmaz veya iki kez uygulanmaz.
+    """
+    
+    PENDING_KEY = "content_stat_deltas"
+    STALE_SECONDS = 300  # Bu süreden eski outbox satırları (çöken süreçlerden kalanlar) kurtarılır
+    RECOVERY_INTERVAL_SECONDS = 60
+    DRAIN_CHUNK_SIZE = 5000
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids: List[int] = []
+        self._deltas: Dict[int, Dict[str, float]] = {}
+        self._next_recovery = 0.0
+        self._task = PeriodicTask("content-stats-flush", self._tick, run_on_stop=True)
+    
+    def record(self, db: Session, content_id: int, deltas: Dict[str, float]):
+        """Delta'yı outbox'a ekle; tampona commit sonrası alınır"""
+        
+        pending = db.info.setdefault(self.PENDING_KEY, [])
+        for field, delta in deltas.items():
+            row = ContentStatDelta(content_id=content_id, field=field, delta=delta)
+            db.add(row)
+            pending.append((row, content_id, field, delta))
+    
+    def _on_commit(self, pending: list):
+        with self._lock:
+            for row, content_id, field, delta in pending:
+                identity = inspect(row).identity
+                if identity is None:
+                    continue
+                self._ids.append(identity[0])
+                fields = self._deltas.setdefault(content_id, {})
+                fields[field] = fields.get(field, 0.0) + delta
+    
+    def _requeue(self, ids: List[int], deltas: Dict[int, Dict[str, float]]):
+        with self._lock:
+            self._ids.extend(ids)
+            for content_id, fields in deltas.items():
+                current = self._deltas.setdefault(content_id, {})
+                for field, delta in fields.items():
+                    current[field] = current.get(field, 0.0) + delta
+    
+    def flush(self, db: Session) -> int:
+        """Tampondaki deltaları içerik başına tek UPDATE ile uygula"""
+        
+        with self._lock:
+            ids, deltas = self._ids, self._deltas
+            self._ids, self._deltas = [], {}
+        
+        if not ids:
+            return 0
+        
+        try:
+            deleted = db.execute(delete(deltas_table).where(deltas_table.c.id.in_(ids))).rowcount
+            
+            if deleted != len(ids):
+                # Bazı satırlar başka yerde (kurtarma veya onarım) işlenmiş: kalanları outbox'tan oku
+                db.rollback()
+                return self._drain(db, deltas_table.c.id.in_(ids))
+            
+            for content_id, fields in deltas.items():
+                apply_counter_deltas(db, content_id, fields)
+            db.commit()
+        except Exception:
+            db.rollback()
+            self._requeue(ids, deltas)
+            raise
+        
+        return len(ids)
+    
+    def _drain(self, db: Session, condition) -> int:
+        """Koşula uyan outbox satırlarını kilitleyip toplu uygula"""
+        
+        applied = 0
+        while True:
+            rows = db.execute(
+                select(deltas_table.c.id, deltas_table.c.content_id, deltas_table.c.field, deltas_table.c.delta)
+                .where(condition)
+                .order_by(deltas_table.c.id)
+                .limit(self.DRAIN_CHUNK_SIZE)
+                .with_for_update(skip_locked=True)
+            ).all()
+            
+            if not rows:
+                break
+            
+            deltas: Dict[int, Dict[str, float]] = {}
+            for _, content_id, field, delta in rows:
+                fields = deltas.setdefault(content_id, {})
+                fields[field] = fields.get(field, 0.0) + delta
+            
+            for content_id, fields in deltas.items():
+                apply_counter_deltas(db, content_id, fields)
+            db.execute(delete(deltas_table).where(deltas_table.c.id.in_([row[0] for row in rows])))
+            db.commit()
+            
+            applied += len(rows)
+            if len(rows) < self.DRAIN_CHUNK_SIZE:
+                break
+        
+        return applied
+    
+    def recover(self, db: Session) -> int:
+        """Çöken süreçlerden kalan eski outbox satırlarını uygula"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.STALE_SECONDS)
+        return self._drain(db, deltas_table.c.created_at < cutoff)
+    
+    def drain_all(self, db: Session) -> int:
+        """Outbox'taki tüm satırları uygula (bakım ve onarım öncesi)"""
+        return self._drain(db, true())
+    
+    def _tick(self, db: Session):
+        """Periyodik iş: tamponu boşalt, arada bir de eski outbox satırlarını kurtar"""
+        
+        self.flush(db)
+        if time.monotonic() >= self._next_recovery:
+            self.recover(db)
+            self._next_recovery = time.monotonic() + self.RECOVERY_INTERVAL_SECONDS
+    
+    def start(self, session_factory, interval_seconds: float):
+        """Periyodik boşaltma iş parçacığını başlat"""
+        self._task.start(session_factory, interval_seconds)
+    
+    def stop(self, timeout: float = 10.0):
+        """İş parçacığını durdur; tampondakiler son bir kez boşaltılır"""
+        self._task.stop(timeout)
+
+
+# Singleton instance
+stats_write_behind = StatsWriteBehind()
+
+
+@event.listens_for(Session, "after_commit")
+def _buffer_committed_deltas(session: Session):
+    pending = session.info.pop(StatsWriteBehind.PENDING_KEY, None)
+    if pending:
+        stats_write_behind._on_commit(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_deltas(session: Session):
+    session.info.pop(StatsWriteBehind.PENDING_KEY, None)
+
+
+def reconcile_rating_stats(db: Session, content_ids: Optional[List[int]] = None) -> int:
+    """
+    Puanlama sayaçlarını ratings tablosundan yeniden hesapla (sapma onarımı)
+    
+    Kilitsiz okunan toplamları mutlak değer olarak yazar: yalnızca çevrimdışı onarım aracıdır,
+    istek yolunda çağrılmamalıdır (eşzamanlı puanlamaları ezer).
+    """
+    
+    # Bekleyen puanlama deltaları zaten ratings tablosuna yansımış durumda: ikinci kez uygulanmasınlar
+    pending = delete(deltas_table).where(deltas_table.c.field.in_(RATING_FIELDS))
+    if content_ids is not None:
+        pending = pending.where(deltas_table.c.content_id.in_(content_ids))
+    db.execute(pending)
+    
+    bucket_counts = [func.sum(case((_bucket_condition(bucket), 1), else_=0)) for bucket in RATING_BUCKETS]
+    
+    aggregates = select(
+        Rating.content_id,
+        func.sum(Rating.score),
+        func.count(Rating.id),
+        *bucket_counts
+    ).group_by(Rating.content_id)
+    
+    if content_ids is not None:
+        aggregates = aggregates.where(Rating.content_id.in_(content_ids))
+    
+    params = []
+    for content_id, score_sum, count, *histogram in db.execute(aggregates).all():
+        row = {
+            "b_id": content_id,
+            "b_sum": float(score_sum),
+            "b_count": count,
+            "b_average": round(float(score_sum) / count, 2)
+        }
+        for bucket, bucket_count in zip(RATING_BUCKETS, histogram):
+            row[f"b_count_{bucket}"] = int(bucket_count)
+        params.append(row)
+    
+    histogram_values = {f"rating_count_{bucket}": bindparam(f"b_count_{bucket}") for bucket in RATING_BUCKETS}
+    
+    statement = update(contents_table)\
+        .where(contents_table.c.id == bindparam("b_id"))\
+        .values(
+            rating_sum=bindparam("b_sum"),
+            total_ratings=bindparam("b_count"),
+            average_rating=bindparam("b_average"),
+            **histogram_values
+        )
+    
+    for start in range(0, len(params), RECONCILE_CHUNK_SIZE):
+        db.execute(statement, params[start:start + RECONCILE_CHUNK_SIZE])
+    
+    # Hiç puanlaması kalmamış içerikleri sıfırla
+    reset = update(contents_table)\
+        .where(
+            ~contents_table.c.id.in_(select(Rating.content_id)),
+            or_(
+                contents_table.c.total_ratings != 0,
+                contents_table.c.rating_sum != 0,
+                *[_histogram_column(bucket) != 0 for bucket in RATING_BUCKETS]
+            )
+        )\
+        .values(
+            rating_sum=0.0,
+            total_ratings=0,
+            average_rating=0.0,
+            **{f"rating_count_{bucket}": 0 for bucket in RATING_BUCKETS}
+        )
+    
+    if content_ids is not None:
+        reset = reset.where(contents_table.c.id.in_(content_ids))
+    
+    db.execute(reset)
+    db.commit()
+    
+    return len(params)
+
+
+def reconcile_review_counts(db: Session, content_ids: Optional[List[int]] = None) -> int:
+    """Yorum sayaçlarını reviews tablosundan yeniden hesapla (sapma onarımı)"""
+    
+    pending = delete(deltas_table).where(deltas_table.c.field == "total_reviews")
+    if content_ids is not None:
+        pending = pending.where(deltas_table.c.content_id.in_(content_ids))
+    db.execute(pending)
+    
+    review_count = select(func.count(Review.id))\
+        .where(Review.content_id == contents_table.c.id)\
+        .scalar_subquery()
+    
+    statement = update(contents_table)\
+        .where(contents_table.c.total_reviews != review_count)\
+        .values(total_reviews=review_count)
+    
+    if content_ids is not None:
+        statement = statement.where(contents_table.c.id.in_(content_ids))
+    
+    repaired = db.execute(statement).rowcount
+    db.commit()
+    
+    return repaired
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+    
+    db = SessionLocal()
+    try:
+        drained = stats_write_behind.drain_all(db)
+        print(f"[OK] {drained} bekleyen istatistik deltasi uygulandi")
+        repaired = reconcile_rating_stats(db)
+        print(f"[OK] {repaired} icerigin puanlama istatistikleri yeniden hesaplandi")
+        repaired = reconcile_review_counts(db)
+        print(f"[OK] {repaired} icerigin yorum sayisi duzeltildi")
+    finally:
+        db.close()
@@ -0,0 +1,243 @@
+import os
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import List, Optional
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.email_outbox import OutboxEmail
+from app.utils.periodic import PeriodicTask
+
+
+class ConsoleTransport:
+    """Geliştirme için: e-postayı göndermek yerine konsola yazar"""
+    
+    def send(self, message: EmailMessage):
+        print(f"[EMAIL] {message['To']} - {message['Subject']}\n{message.get_body(('plain',)).get_content()}")
+    
+    def close(self):
+        pass
+
+
+class FileTransport:
+    """Testler için: her e-postayı dizine .eml dosyası olarak yazar"""
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._counter = 0
+        self._lock = threading.Lock()
+    
+    def send(self, message: EmailMessage):
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            self._counter += 1
+            name = f"{datetime.utcnow():%Y%m%d%H%M%S%f}-{self._counter}.eml"
+        with open(os.path.join(self.directory, name), "wb") as file:
+            file.write(message.as_bytes())
+    
+    def close(self):
+        pass
+
+
+class SMTPTransport:
+    """Kimliği doğrulanmış tek SMTP bağlantısını mesajlar arasında yeniden kullanır"""
+    
+    IDLE_SECONDS = 60  # Bu süre kullanılmayan bağlantı NOOP ile yoklanır
+    
+    def __init__(self, host: str, port: int, user: str, password: str):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = datetime.min
+    
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=30)
+        server.starttls()
+        server.login(self.user, self.password)
+        return server
+    
+    def _connection(self) -> smtplib.SMTP:
+        if self._server is not None and datetime.utcnow() - self._last_used > timedelta(seconds=self.IDLE_SECONDS):
+            # Sunucu boştaki bağlantıyı kapatmış olabilir
+            try:
+                self._server.noop()
+            except smtplib.SMTPException:
+                self.close()
+        if self._server is None:
+            self._server = self._connect()
+        return self._server
+    
+    def send(self, message: EmailMessage):
+        try:
+            self._connection().send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # Bağlantı arada kopmuş: bir kez yeniden bağlanıp dene
+            self.close()
+            self._connection().send_message(message)
+        self._last_used = datetime.utcnow()
+    
+    def close(self):
+        server, self._server = self._server, None
+        if server is not None:
+            try:
+                server.quit()
+            except smtplib.SMTPException:
+                server.close()
+
+
+def create_transport():
+    """EMAIL_TRANSPORT ayarına göre gönderici (boşsa SMTP bilgileri varsa smtp, yoksa console)"""
+    
+    name = settings.EMAIL_TRANSPORT or ("smtp" if settings.SMTP_USER and settings.SMTP_PASSWORD else "console")
+    if name == "smtp":
+        return SMTPTransport(settings.SMTP_HOST, settings.SMTP_PORT, settings.SMTP_USER, settings.SMTP_PASSWORD)
+    if name == "file":
+        return FileTransport(settings.EMAIL_FILE_DIR)
+    return ConsoleTransport()
+
+
+class EmailOutboxService:
+    """
+    E-posta outbox'ı
+    
+    İstekler e-postayı yalnızca email_outbox tablosuna yazar (aynı transaction içinde).
+    Arka plan iş parçacığı bekleyenleri partiler halinde tek SMTP bağlantısı üzerinden
+    gönderir; başarısız olanlar üstel geri çekilmeyle tekrar denenir.
+    """
+    
+    BATCH_SIZE = 50
+    MAX_ATTEMPTS = 6
+    BACKOFF_SECONDS = 30  # İlk tekrar denemeden önceki bekleme; her denemede iki katına çıkar
+    MAX_BACKOFF_SECONDS = 3600
+    PURGE_INTERVAL_SECONDS = 3600  # Eski kayıtların silinme aralığı (gönderim döngüsü içinde)
+    RETENTION_DAYS = 7
+    
+    def __init__(self, transport=None):
+        self._transport = transport
+        self._purged_at: Optional[float] = None
+        self._task = PeriodicTask("email-outbox", self._tick)
+    
+    @property
+    def transport(self):
+        if self._transport is None:
+            self._transport = create_transport()
+        return self._transport
+    
+    def enqueue(self, db: Session, recipient: str, subject: str, text_body: str, html_body: Optional[str] = None):
+        """E-postayı gönderilmek üzere kuyruğa ekle (commit etmez)"""
+        db.add(OutboxEmail(recipient=recipient, subject=subject, text_body=text_body, html_body=html_body))
+    
+    def _message(self, email: OutboxEmail) -> EmailMessage:
+        message = EmailMessage()
+        message["Subject"] = email.subject
+        message["From"] = settings.EMAIL_FROM
+        message["To"] = email.recipient
+        message.set_content(email.text_body)
+        if email.html_body:
+            message.add_alternative(email.html_body, subtype="html")
+        return message
+    
+    def _backoff(self, attempts: int) -> timedelta:
+        return timedelta(seconds=min(self.BACKOFF_SECONDS * 2 ** (attempts - 1), self.MAX_BACKOFF_SECONDS))
+    
+    def _claim(self, db: Session) -> List[OutboxEmail]:
+        """Zamanı gelmiş e-postaları kilitle (diğer worker'ların kilitlediklerini atla)"""
+        return db.query(OutboxEmail)\
+            .filter(OutboxEmail.status == "pending", OutboxEmail.next_attempt_at <= datetime.utcnow())\
+            .order_by(OutboxEmail.next_attempt_at, OutboxEmail.id)\
+            .limit(self.BATCH_SIZE)\
+            .with_for_update(skip_locked=True)\
+            .all()
+    
+    def _redact(self, email: OutboxEmail):
+        """İşi biten e-postanın içeriğini sil (ör. şifre sıfırlama linkindeki ham token DB'de kalmasın)"""
+        email.text_body = ""
+        email.html_body = None
+    
+    def deliver(self, db: Session) -> int:
+        """Bekleyen e-postaları gönder; gönderilen sayısını döndür"""
+        
+        sent = 0
+        while True:
+            batch = self._claim(db)
+            if not batch:
+                break
+            
+            for email in batch:
+                try:
+                    self.transport.send(self._message(email))
+                except Exception as e:
+                    # Bağlantı bozulmuş olabilir: sonraki mesaj yeni bağlantıyla denensin
+                    self.transport.close()
+                    email.attempts += 1
+                    email.last_error = str(e)[:500]
+                    if email.attempts >= self.MAX_ATTEMPTS:
+                        email.status = "failed"
+                        self._redact(email)
+                        print(f"[HATA] E-posta gonderilemedi, deneme hakki bitti (id={email.id}): {e}")
+                    else:
+                        email.next_attempt_at = datetime.utcnow() + self._backoff(email.attempts)
+                else:
+                    email.status = "sent"
+                    email.sent_at = datetime.utcnow()
+                    self._redact(email)
+                    sent += 1
+            
+            db.commit()
+            if len(batch) < self.BATCH_SIZE:
+                break
+        
+        return sent
+    
+    def purge(self, db: Session, older_than_days: Optional[int] = None) -> int:
+        """Gönderilmiş veya deneme hakkı bitmiş eski kayıtları sil"""
+        
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days or self.RETENTION_DAYS)
+        deleted = db.query(OutboxEmail)\
+            .filter(or_(
+                and_(OutboxEmail.status == "sent", OutboxEmail.sent_at < cutoff),
+                and_(OutboxEmail.status == "failed", OutboxEmail.next_attempt_at < cutoff)
+            ))\
+            .delete(synchronize_session=False)
+        db.commit()
+        
+        self._purged_at = time.monotonic()
+        return deleted
+    
+    def _tick(self, db: Session):
+        """Periyodik iş: bekleyenleri gönder, saatte bir eski kayıtları temizle"""
+        
+        self.deliver(db)
+        if self._purged_at is None or time.monotonic() - self._purged_at > self.PURGE_INTERVAL_SECONDS:
+            self.purge(db)
+    
+    def start(self, session_factory, interval_seconds: float):
+        """Periyodik gönderim iş parçacığını başlat"""
+        self._task.start(session_factory, interval_seconds)
+    
+    def stop(self, timeout: float = 10.0):
+        self._task.stop(timeout)
+        self.transport.close()
+
+
+# Singleton instance
+email_outbox = EmailOutboxService()
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+    
+    db = SessionLocal()
+    try:
+        sent = email_outbox.deliver(db)
+        print(f"[OK] {sent} e-posta gonderildi")
+        purged = email_outbox.purge(db)
+        print(f"[OK] {purged} eski e-posta kaydi silindi")
+    finally:
+        email_outbox.transport.close()
+        db.close()
@@ -0,0 +1,398 @@
+import time
+import threading
+import numpy as np
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from app.models.follow import Follow
+from app.models.rating import Rating
+from app.models.user import User
+from app.utils.periodic import PeriodicTask
+
+
+class CSRAdjacency:
+    """Sıralı CSR komşuluk dizileri ve henüz dizilere işlenmemiş değişiklikler (tek yön)"""
+    
+    def __init__(self):
+        self.nodes = np.empty(0, dtype=np.int32)  # Kaynak kullanıcı ID'leri (sıralı)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.empty(0, dtype=np.int32)  # Hedef ID'ler (satır içinde sıralı)
+        self.added: Dict[int, Set[int]] = {}
+        self.removed: Dict[int, Set[int]] = {}
+    
+    def set_edges(self, sources: np.ndarray, targets: np.ndarray):
+        """(kaynak, hedef) dizilerinden CSR yapısını kur ve bekleyen değişiklikleri temizle"""
+        
+        order = np.lexsort((targets, sources))
+        sources, targets = sources[order], targets[order]
+        
+        nodes, starts = np.unique(sources, return_index=True)
+        
+        self.nodes = nodes.astype(np.int32)
+        self.indptr = np.append(starts, sources.size).astype(np.int64)
+        self.indices = targets.astype(np.int32)
+        self.added = {}
+        self.removed = {}
+    
+    def _base_row(self, user_id: int) -> np.ndarray:
+        """Kullanıcının dizilerdeki satırı (kopyasız dilim)"""
+        
+        position = np.searchsorted(self.nodes, user_id)
+        if position >= self.nodes.size or self.nodes[position] != user_id:
+            return self.indices[:0]
+        return self.indices[self.indptr[position]:self.indptr[position + 1]]
+    
+    def _base_rows(self, user_ids: np.ndarray) -> np.ndarray:
+        """Verilen kullanıcıların dizilerdeki satırlarını tek dizide topla"""
+        
+        positions = np.searchsorted(self.nodes, user_ids)
+        valid = positions < self.nodes.size
+        positions, user_ids = positions[valid], user_ids[valid]
+        positions = positions[self.nodes[positions] == user_ids]
+        
+        starts, ends = self.indptr[positions], self.indptr[positions + 1]
+        lengths = ends - starts
+        if lengths.sum() == 0:
+            return np.empty(0, dtype=np.int32)
+        
+        # Satır dilimlerini döngüsüz birleştir
+        offsets = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+        return self.indices[offsets + np.arange(lengths.sum())]
+    
+    def row(self, user_id: int) -> np.ndarray:
+        """Bekleyen değişiklikler uygulanmış sıralı satır"""
+        
+        base = self._base_row(user_id)
+        if user_id not in self.added and user_id not in self.removed:
+            return base
+        
+        merged = set(base.tolist())
+        merged -= self.removed.get(user_id, set())
+        merged |= self.added.get(user_id, set())
+        return np.array(sorted(merged), dtype=np.int32)
+    
+    def rows(self, user_ids: np.ndarray) -> np.ndarray:
+        """Bekleyen değişiklikler uygulanmış olarak kullanıcıların satırları (tekrarlı)"""
+        
+        changed = [user_id for user_id in user_ids.tolist() if user_id in self.added or user_id in self.removed]
+        unchanged = np.setdiff1d(user_ids, changed) if changed else user_ids
+        
+        # Bekleyen değişikliği olan az sayıdaki kullanıcının satırı tek tek birleştirilir
+        parts = [self._base_rows(unchanged)] + [self.row(user_id) for user_id in changed]
+        return np.concatenate(parts).astype(np.int64)
+    
+    def contains(self, source: int, target: int) -> bool:
+        """Kenar var mı? (satır içinde ikili arama)"""
+        
+        if target in self.removed.get(source, ()):
+            return False
+        if target in self.added.get(source, ()):
+            return True
+        
+        base = self._base_row(source)
+        position = np.searchsorted(base, target)
+        return bool(position < base.size and base[position] == target)
+    
+    def add(self, source: int, target: int):
+        removed = self.removed.get(source)
+        if removed and target in removed:
+            removed.discard(target)
+        else:
+            self.added.setdefault(source, set()).add(target)
+    
+    def remove(self, source: int, target: int):
+        added = self.added.get(source)
+        if added and target in added:
+            added.discard(target)
+        else:
+            self.removed.setdefault(source, set()).add(target)
+    
+    def nbytes(self) -> int:
+        return self.nodes.nbytes + self.indptr.nbytes + self.indices.nbytes
+
+
+class FollowGraphIndex:
+    """
+    Takip grafiği için dizi tabanlı (CSR) komşuluk indeksi
+    
+    Takip edilenler (out) ve takipçiler (in) için iki ayrı CSR tutulur; üyelik sorgusu
+    satır içinde ikili arama, ortak takipçi ve 2 adım sorguları sıralı satırların kesişimidir.
+    Her worker kendi kopyasını başlangıçta yükler ve takip olaylarıyla güncel tutar.
+    """
+    
+    COMPACT_THRESHOLD = 10000  # Bu kadar bekleyen değişiklikten sonra diziler yeniden oluşturulur
+    REFRESH_SECONDS = 600  # Diğer worker'ların yazdıklarını görmek için arka planda yeniden yükleme aralığı
+    CANDIDATE_LIMIT = 200  # Ortak aktivitesi hesaplanacak maksimum aday
+    CO_ACTIVITY_WEIGHT = 0.5
+    POPULAR_LIMIT = 100
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()  # Aynı anda tek yükleme
+        self._out = CSRAdjacency()  # takip eden -> takip edilenler
+        self._in = CSRAdjacency()  # takip edilen -> takipçiler
+        self._popular = np.empty(0, dtype=np.int32)
+        self._pending = 0
+        self._loaded_at = None
+        self._replay: Optional[List[Tuple[bool, int, int]]] = None  # Yükleme sürerken gelen olaylar
+        self._task = PeriodicTask("follow-graph-refresh", self.build)
+    
+    def _set_edges(self, followers: np.ndarray, followed: np.ndarray):
+        """(takip eden, takip edilen) dizilerinden iki yönlü CSR yapısını kur"""
+        
+        self._out.set_edges(followers, followed)
+        self._in.set_edges(followed, followers)
+        
+        # Önerisi olmayan kullanıcılar için en çok takip edilenler
+        counts = np.diff(self._in.indptr)
+        self._popular = self._in.nodes[np.argsort(-counts, kind="stable")[:self.POPULAR_LIMIT]]
+        self._pending = 0
+    
+    def build(self, db: Session) -> int:
+        """İndeksi follows tablosundan yükle"""
+        with self._build_lock:
+            return self._build(db)
+    
+    def _build(self, db: Session) -> int:
+        with self._lock:
+            self._replay = []
+        
+        try:
+            rows = db.execute(select(Follow.follower_id, Follow.followed_id)).all()
+            count = len(rows)
+            followers = np.fromiter((row[0] for row in rows), dtype=np.int64, count=count)
+            followed = np.fromiter((row[1] for row in rows), dtype=np.int64, count=count)
+            
+            with self._lock:
+                self._set_edges(followers, followed)
+                
+                # Sorgu sürerken işlenen takip olayları yeni dizilerde kaybolmasın
+                for added, follower_id, followed_id in self._replay:
+                    self._apply(added, follower_id, followed_id)
+                self._loaded_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._replay = None
+        
+        return count
+    
+    def build_in_background(self, session_factory) -> threading.Thread:
+        """İndeksi uygulamayı bloklamadan arka planda oluştur"""
+        
+        def run():
+            db = session_factory()
+            try:
+                self.build(db)
+            finally:
+                db.close()
+        
+        thread = threading.Thread(target=run, name="follow-graph-build", daemon=True)
+        thread.start()
+        return thread
+    
+    def start(self, session_factory, interval_seconds: Optional[float] = None):
+        """İndeksi arka planda yükle ve periyodik yenilemeyi başlat (istekler yalnızca okur)"""
+        self.build_in_background(session_factory)
+        self._task.start(session_factory, interval_seconds or self.REFRESH_SECONDS)
+    
+    def stop(self, timeout: float = 10.0):
+        self._task.stop(timeout)
+    
+    def ensure_loaded(self, db: Session):
+        """İndeks hiç yüklenmediyse yükle (yenileme arka planda yapılır)"""
+        
+        if self._loaded_at is not None:
+            return
+        
+        with self._build_lock:
+            # Kilit beklenirken başka bir iş parçacığı yüklemiş olabilir
+            if self._loaded_at is None:
+                self._build(db)
+    
+    def _edges_from(self, user_ids: np.ndarray) -> np.ndarray:
+        """Bekleyen değişiklikler uygulanmış olarak kullanıcıların takip ettikleri (tekrarlı)"""
+        with self._lock:
+            return self._out.rows(user_ids)
+    
+    def following(self, user_id: int) -> np.ndarray:
+        """Kullanıcının takip ettikleri (sıralı)"""
+        with self._lock:
+            return self._out.row(user_id)
+    
+    def followers(self, user_id: int) -> np.ndarray:
+        """Kullanıcının takipçileri (sıralı)"""
+        with self._lock:
+            return self._in.row(user_id)
+    
+    def follows(self, follower_id: int, followed_id: int) -> bool:
+        """follower_id, followed_id'yi takip ediyor mu?"""
+        with self._lock:
+            return self._out.contains(follower_id, followed_id)
+    
+    def mutual_followers(self, user_id: int, other_id: int) -> np.ndarray:
+        """İki kullanıcıyı birden takip edenler"""
+        return np.intersect1d(self.followers(user_id), self.followers(other_id), assume_unique=True)
+    
+    def followed_by_following(self, viewer_id: int, user_id: int) -> np.ndarray:
+        """Görüntüleyenin takip ettiklerinden user_id'yi takip edenler (2 adım)"""
+        return np.intersect1d(self.following(viewer_id), self.followers(user_id), assume_unique=True)
+    
+    def relationship(self, viewer_id: int, user_id: int, db: Session, sample: int = 3) -> dict:
+        """Profil için görüntüleyen ile kullanıcı arasındaki takip ilişkisi özeti"""
+        
+        self.ensure_loaded(db)
+        
+        followed_by = self.followed_by_following(viewer_id, user_id)
+        
+        # Örnek olarak en fazla birkaç kullanıcı adı göster
+        sample_ids = followed_by[:sample].tolist()
+        names = dict(db.query(User.id, User.username).filter(User.id.in_(sample_ids)).all()) if sample_ids else {}
+        
+        return {
+            "you_follow": self.follows(viewer_id, user_id),
+            "follows_you": self.follows(user_id, viewer_id),
+            "mutual_followers_count": int(self.mutual_followers(viewer_id, user_id).size),
+            "followed_by_following_count": int(followed_by.size),
+            "followed_by_following": [names[i] for i in sample_ids if i in names]
+        }
+    
+    def memory_report(self) -> dict:
+        """Dizilerin bellek kullanımı (milyon kenar başına bayt dahil)"""
+        
+        with self._lock:
+            edges = int(self._out.indices.size)
+            out_bytes = self._out.nbytes()
+            in_bytes = self._in.nbytes()
+            pending = self._pending
+        
+        total = out_bytes + in_bytes + self._popular.nbytes
+        return {
+            "edges": edges,
+            "pending_changes": pending,
+            "following_bytes": out_bytes,
+            "followers_bytes": in_bytes,
+            "total_bytes": total,
+            "bytes_per_million_edges": int(total * 1_000_000 / edges) if edges else 0
+        }
+    
+    def _apply(self, added: bool, follower_id: int, followed_id: int):
+        if added:
+            self._out.add(follower_id, followed_id)
+            self._in.add(followed_id, follower_id)
+        else:
+            self._out.remove(follower_id, followed_id)
+            self._in.remove(followed_id, follower_id)
+    
+    def add_edge(self, follower_id: int, followed_id: int):
+        """Takip olayını indekse uygula"""
+        self._on_event(True, follower_id, followed_id)
+    
+    def remove_edge(self, follower_id: int, followed_id: int):
+        """Takipten çıkma olayını indekse uygula"""
+        self._on_event(False, follower_id, followed_id)
+    
+    def _on_event(self, added: bool, follower_id: int, followed_id: int):
+        with self._lock:
+            self._apply(added, follower_id, followed_id)
+            if self._replay is not None:
+                self._replay.append((added, follower_id, followed_id))
+            self._pending += 1
+            if self._pending >= self.COMPACT_THRESHOLD:
+                self._compact()
+    
+    def _compact(self):
+        """Bekleyen değişiklikleri DB'ye gitmeden dizilere işle"""
+        
+        out = self._out
+        followers = np.repeat(out.nodes.astype(np.int64), np.diff(out.indptr))
+        followed = out.indices.astype(np.int64)
+        
+        keys = (followers << 32) | followed
+        removed = [(a << 32) | b for a, targets in out.removed.items() for b in targets]
+        added = [(a << 32) | b for a, targets in out.added.items() for b in targets]
+        
+        if removed:
+            keys = keys[~np.isin(keys, np.array(removed, dtype=np.int64))]
+        if added:
+            keys = np.union1d(keys, np.array(added, dtype=np.int64))
+        
+        self._set_edges(keys >> 32, keys & 0xFFFFFFFF)
+    
+    def suggest(self, user_id: int, db: Session, limit: int = 20) -> List[dict]:
+        """Takip önerileri: arkadaşların arkadaşları, ortak bağlantı ve ortak aktiviteye göre"""
+        
+        self.ensure_loaded(db)
+        
+        following = self.following(user_id)
+        second_hop = self._edges_from(following) if following.size else np.empty(0, dtype=np.int64)
+        
+        candidates, mutual = np.unique(second_hop, return_counts=True)
+        keep = (candidates != user_id) & ~np.isin(candidates, following)
+        candidates, mutual = candidates[keep], mutual[keep]
+        
+        if candidates.size == 0:
+            # Bağlantısı olmayanlar için en çok takip edilenler
+            popular = self._popular[(self._popular != user_id) & ~np.isin(self._popular, following)]
+            candidates = popular[:self.CANDIDATE_LIMIT].astype(np.int64)
+            mutual = np.zeros(candidates.size, dtype=np.int64)
+        elif candidates.size > self.CANDIDATE_LIMIT:
+            top = np.argsort(-mutual, kind="stable")[:self.CANDIDATE_LIMIT]
+            candidates, mutual = candidates[top], mutual[top]
+        
+        if candidates.size == 0:
+            return []
+        
+        candidate_ids = candidates.tolist()
+        
+        # Ortak aktivite: benim de puanladığım içerikleri puanlama sayısı
+        my_contents = select(Rating.content_id).where(Rating.user_id == user_id)
+        co_activity = dict(db.execute(
+            select(Rating.user_id, func.count(Rating.id))
+            .where(Rating.user_id.in_(candidate_ids), Rating.content_id.in_(my_contents))
+            .group_by(Rating.user_id)
+        ).all())
+        
+        shared = np.array([co_activity.get(candidate, 0) for candidate in candidate_ids], dtype=np.float64)
+        scores = mutual + self.CO_ACTIVITY_WEIGHT * np.log1p(shared)
+        order = np.argsort(-scores, kind="stable")
+        
+        users = {
+            user.id: user
+            for user in db.query(User).filter(User.id.in_(candidate_ids), User.is_active == True).all()
+        }
+        
+        suggestions = []
+        for i in order:
+            user = users.get(candidate_ids[i])
+            if user is None:
+                continue
+            suggestions.append({
+                "id": user.id,
+                "username": user.username,
+                "avatar_url": user.avatar_url,
+                "mutual_count": int(mutual[i]),
+                "co_activity": int(shared[i]),
+                "score": round(float(scores[i]), 3)
+            })
+            if len(suggestions) >= limit:
+                break
+        
+        return suggestions
+
+
+# Singleton instance
+follow_graph = FollowGraphIndex()
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+    
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        edges = follow_graph.build(db)
+        print(f"[OK] {edges} takip kenari {time.perf_counter() - started:.2f} sn'de yuklendi")
+        for key, value in follow_graph.memory_report().items():
+            print(f"  {key}: {value}")
+    finally:
+        db.close()
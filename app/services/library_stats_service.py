@@ -0,0 +1,286 @@
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.models.movie import Movie
+from app.models.book import Book
+from app.models.rating import Rating
+from app.models.library import UserLibrary, LibraryStatus
+from app.models.library_stat import LibraryStat
+
+library_stats_table = LibraryStat.__table__
+
+# (boyut, kova) -> {sayaç sütunu: delta}
+StatDeltas = Dict[Tuple[str, str], Dict[str, float]]
+
+# Kütüphane değişikliği: (içerik ID, eski durum, yeni durum, kütüphaneye eklenme zamanı); ekleme/çıkarmada eski/yeni None
+LibraryChange = Tuple[int, Optional[LibraryStatus], Optional[LibraryStatus], Optional[datetime]]
+
+# Puanlama değişikliği: (içerik ID, eski puan, yeni puan, puanlama zamanı); ekleme/silmede eski/yeni None
+RatingChange = Tuple[int, Optional[float], Optional[float], Optional[datetime]]
+
+
+@dataclass
+class ContentFacts:
+    """İstatistiklerde kullanılan içerik bilgileri"""
+    runtime: int
+    pages: int
+    genres: List[str]
+
+
+def _genre_key(genre: str) -> str:
+    """
+    Türün kova anahtarı: boşluklar sadeleştirilmiş, küçük harfe katlanmış yazım
+    
+    İçerik içindeki tekrarlar ve kullanıcının kovaları aynı anahtarla birleşir ("Bilim kurgu",
+    "bilim  Kurgu"). Aksanlar korunur: Türkçe tür adları ("Suç") gösterimde bozulmasın.
+    """
+    return " ".join(unicodedata.normalize("NFC", genre).casefold().split())[:100]
+
+
+def _genre_label(key: str) -> str:
+    # Kelime başları büyük harf (casefold "İ" noktasını birleştirici işaretle koruduğundan geri döner)
+    return unicodedata.normalize("NFC", " ".join(word[:1].upper() + word[1:] for word in key.split(" ")))
+
+
+def _split_genres(raw: Optional[str]) -> List[str]:
+    genres = []
+    for genre in (raw or "").split(","):
+        key = _genre_key(genre)
+        if key and key not in genres:
+            genres.append(key)
+    return genres
+
+
+def _month(value: Optional[datetime]) -> Optional[str]:
+    return f"{value:%Y-%m}" if value else None
+
+
+class LibraryStatsService:
+    """
+    Kişisel kütüphane istatistikleri (durum sayıları, izleme süresi, okunan sayfa, türler, aylık aktivite)
+    
+    Her kullanıcı için (boyut, kova) satırları tutulur ve kütüphane/puanlama yazmalarıyla aynı
+    transaction içinde göreli olarak güncellenir; istatistik sayfası kullanıcının satırlarını
+    birincil anahtar üzerinden tek aralık okumasıyla getirir. Sapmalar rebuild ile onarılır.
+    """
+    
+    COMPLETED = (LibraryStatus.WATCHED, LibraryStatus.READ)  # Tür istatistiklerine sayılan durumlar
+    COUNTERS = ("items", "runtime_minutes", "pages", "ratings", "rating_sum")
+    REBUILD_BATCH_SIZE = 500  # Yeniden hesaplamada tek seferde işlenen kullanıcı sayısı
+    
+    def _facts(self, db: Session, content_ids: Iterable[int]) -> Dict[int, ContentFacts]:
+        """İçeriklerin süre/sayfa/tür bilgilerini toplu getir"""
+        
+        content_ids = set(content_ids)
+        if not content_ids:
+            return {}
+        
+        facts = {}
+        for content_id, runtime, genres in db.execute(
+            select(Movie.id, Movie.runtime, Movie.genres).where(Movie.id.in_(content_ids))
+        ):
+            facts[content_id] = ContentFacts(runtime or 0, 0, _split_genres(genres))
+        for content_id, pages, categories in db.execute(
+            select(Book.id, Book.page_count, Book.categories).where(Book.id.in_(content_ids))
+        ):
+            facts[content_id] = ContentFacts(0, pages or 0, _split_genres(categories))
+        return facts
+    
+    def _add(self, deltas: StatDeltas, dimension: str, bucket: Optional[str], sign: int, **values: float):
+        if bucket is None:
+            return
+        row = deltas.setdefault((dimension, bucket), {})
+        for field, value in values.items():
+            row[field] = row.get(field, 0) + sign * value
+    
+    def _library_deltas(self, deltas: StatDeltas, facts: ContentFacts, status: Optional[LibraryStatus], sign: int):
+        """Bir içeriğin belirli bir durumdaki katkısını ekle (sign=-1 ile geri al)"""
+        
+        if status is None:
+            return
+        status = LibraryStatus(status)
+        amounts = {"items": 1, "runtime_minutes": facts.runtime, "pages": facts.pages}
+        self._add(deltas, "status", status.value, sign, **amounts)
+        if status in self.COMPLETED:
+            for genre in facts.genres:
+                self._add(deltas, "genre", genre, sign, **amounts)
+    
+    def _collect_library(self, deltas: StatDeltas, facts: Dict[int, ContentFacts], changes: Iterable[LibraryChange]):
+        for content_id, old_status, new_status, added_at in changes:
+            content = facts.get(content_id, ContentFacts(0, 0, []))
+            self._library_deltas(deltas, content, old_status, -1)
+            self._library_deltas(deltas, content, new_status, 1)
+            
+            # Aylık aktivite kütüphaneye eklenme ayına yazılır; durum değişikliği ayı değiştirmez
+            if old_status is None and new_status is not None:
+                self._add(deltas, "month", _month(added_at), 1, items=1)
+            elif old_status is not None and new_status is None:
+                self._add(deltas, "month", _month(added_at), -1, items=1)
+    
+    def _collect_ratings(self, deltas: StatDeltas, facts: Dict[int, ContentFacts], changes: Iterable[RatingChange]):
+        for content_id, old_score, new_score, rated_at in changes:
+            genres = facts[content_id].genres if content_id in facts else []
+            for score, sign in ((old_score, -1), (new_score, 1)):
+                if score is None:
+                    continue
+                self._add(deltas, "month", _month(rated_at), sign, ratings=1, rating_sum=score)
+                for genre in genres:
+                    self._add(deltas, "genre", genre, sign, ratings=1, rating_sum=score)
+    
+    def library_changed(self, db: Session, user_id: int, changes: List[LibraryChange]):
+        """Kütüphane ekleme/durum değişikliği/çıkarma sonrası istatistikleri güncelle (commit etmez)"""
+        
+        deltas: StatDeltas = {}
+        self._collect_library(deltas, self._facts(db, [change[0] for change in changes]), changes)
+        self._apply(db, user_id, deltas)
+    
+    def ratings_changed(self, db: Session, user_id: int, changes: List[RatingChange]):
+        """Puanlama ekleme/güncelleme/silme sonrası istatistikleri güncelle (commit etmez)"""
+        
+        deltas: StatDeltas = {}
+        self._collect_ratings(deltas, self._facts(db, [change[0] for change in changes]), changes)
+        self._apply(db, user_id, deltas)
+    
+    def _apply(self, db: Session, user_id: int, deltas: StatDeltas):
+        # Satırlar hep aynı sırada kilitlensin: eşzamanlı yazmalarda deadlock olmasın
+        for dimension, bucket in sorted(deltas):
+            values = {field: delta for field, delta in deltas[(dimension, bucket)].items() if delta}
+            if not values:
+                continue
+            
+            statement = mysql_insert(library_stats_table).values(
+                user_id=user_id,
+                dimension=dimension,
+                bucket=bucket,
+                updated_at=datetime.utcnow(),
+                **{field: max(delta, 0) for field, delta in values.items()}
+            )
+            db.execute(statement.on_duplicate_key_update(
+                updated_at=statement.inserted.updated_at,
+                **{field: library_stats_table.c[field] + delta for field, delta in values.items()}
+            ))
+    
+    def get(self, db: Session, user_id: int) -> dict:
+        """Kullanıcının istatistikleri"""
+        
+        rows = db.query(LibraryStat).filter(LibraryStat.user_id == user_id).all()
+        
+        def average(row):
+            return round(row.rating_sum / row.ratings, 2) if row.ratings else None
+        
+        status_rows = {row.bucket: row for row in rows if row.dimension == "status"}
+        status_counts = {
+            status.value: status_rows[status.value].items if status.value in status_rows else 0
+            for status in LibraryStatus
+        }
+        
+        watched = status_rows.get(LibraryStatus.WATCHED.value)
+        read = status_rows.get(LibraryStatus.READ.value)
+        
+        genres = sorted(
+            [row for row in rows if row.dimension == "genre" and (row.items or row.ratings)],
+            key=lambda row: (-row.items, -row.ratings, row.bucket)
+        )
+        months = sorted(
+            [row for row in rows if row.dimension == "month" and (row.items or row.ratings)],
+            key=lambda row: row.bucket
+        )
+        
+        return {
+            "status_counts": status_counts,
+            "total_items": sum(status_counts.values()),
+            "watched_minutes": watched.runtime_minutes if watched else 0,
+            "pages_read": read.pages if read else 0,
+            "genres": [
+                {
+                    "genre": _genre_label(row.bucket),
+                    "items": row.items,
+                    "runtime_minutes": row.runtime_minutes,
+                    "pages": row.pages,
+                    "ratings": row.ratings,
+                    "average_rating": average(row)
+                }
+                for row in genres
+            ],
+            "monthly": [
+                {
+                    "month": row.bucket,
+                    "library_added": row.items,
+                    "ratings": row.ratings,
+                    "average_rating": average(row)
+                }
+                for row in months
+            ]
+        }
+    
+    def _rebuild_users(self, db: Session, user_ids: List[int]) -> int:
+        """Verilen kullanıcıların satırlarını kaynak tablolardan sıfırdan hesapla"""
+        
+        library_rows = db.execute(
+            select(UserLibrary.user_id, UserLibrary.content_id, UserLibrary.status, UserLibrary.created_at)
+            .where(UserLibrary.user_id.in_(user_ids))
+        ).all()
+        rating_rows = db.execute(
+            select(Rating.user_id, Rating.content_id, Rating.score, Rating.created_at)
+            .where(Rating.user_id.in_(user_ids))
+        ).all()
+        
+        facts = self._facts(db, [row[1] for row in library_rows] + [row[1] for row in rating_rows])
+        
+        # Artımlı güncellemeyle aynı delta hesabı kullanılır: iki yol aynı sonucu üretir
+        deltas: Dict[int, StatDeltas] = defaultdict(dict)
+        for user_id, content_id, status, created_at in library_rows:
+            self._collect_library(deltas[user_id], facts, [(content_id, None, status, created_at)])
+        for user_id, content_id, score, created_at in rating_rows:
+            self._collect_ratings(deltas[user_id], facts, [(content_id, None, score, created_at)])
+        
+        now = datetime.utcnow()
+        rows = [
+            {
+                "user_id": user_id,
+                "dimension": dimension,
+                "bucket": bucket,
+                "updated_at": now,
+                **{field: values.get(field, 0) for field in self.COUNTERS}
+            }
+            for user_id, user_deltas in deltas.items()
+            for (dimension, bucket), values in user_deltas.items()
+        ]
+        
+        db.execute(delete(library_stats_table).where(library_stats_table.c.user_id.in_(user_ids)))
+        if rows:
+            db.execute(library_stats_table.insert(), rows)
+        db.commit()
+        return len(rows)
+    
+    def rebuild(self, db: Session, user_ids: Optional[List[int]] = None) -> int:
+        """İstatistikleri toplu olarak yeniden hesapla (sapma onarımı); yazılan satır sayısı"""
+        
+        if user_ids is None:
+            user_ids = db.execute(select(User.id).order_by(User.id)).scalars().all()
+        
+        written = 0
+        for start in range(0, len(user_ids), self.REBUILD_BATCH_SIZE):
+            written += self._rebuild_users(db, list(user_ids[start:start + self.REBUILD_BATCH_SIZE]))
+        return written
+
+
+# Singleton instance
+library_stats = LibraryStatsService()
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+    
+    db = SessionLocal()
+    try:
+        written = library_stats.rebuild(db)
+        print(f"[OK] Kutuphane istatistikleri yeniden hesaplandi ({written} satir)")
+    finally:
+        db.close()
@@ -0,0 +1,137 @@
+import random
+from typing import Dict, Iterable
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+from app.models.review import Review
+from app.models.activity import Activity
+from app.models.like import Like, ReviewLikeShard
+from app.utils.periodic import PeriodicTask
+
+reviews_table = Review.__table__
+shards_table = ReviewLikeShard.__table__
+activities_table = Activity.__table__
+likes_table = Like.__table__
+
+
+class LikeCounterService:
+    """
+    Parçalı (sharded) yorum beğeni sayacı
+    
+    Her beğeni, yorumun SHARD_COUNT parçasından rastgele birine göreli olarak yazılır;
+    böylece popüler bir yoruma gelen eşzamanlı beğeniler tek satırda sıraya girmez.
+    Okurken likes_count ile parçaların toplamı alınır, parçalar periyodik olarak
+    likes_count'a katlanır.
+    """
+    
+    SHARD_COUNT = 16
+    FOLD_CHUNK_SIZE = 1000  # Tek transaction'da katlanan yorum sayısı
+    
+    def __init__(self):
+        self._task = PeriodicTask("review-like-fold", self.fold)
+    
+    def increment(self, db: Session, review_id: int, delta: int = 1):
+        """Rastgele bir parçayı göreli olarak güncelle (commit etmez)"""
+        
+        statement = mysql_insert(shards_table).values(
+            review_id=review_id,
+            shard=random.randrange(self.SHARD_COUNT),
+            count=delta
+        )
+        db.execute(statement.on_duplicate_key_update(count=shards_table.c.count + delta))
+    
+    def get_counts(self, db: Session, reviews: Iterable[Review]) -> Dict[int, int]:
+        """Yorumların güncel beğeni sayıları (tek sorguda)"""
+        
+        counts = {review.id: review.likes_count or 0 for review in reviews}
+        if not counts:
+            return counts
+        
+        pending = db.execute(
+            select(shards_table.c.review_id, func.sum(shards_table.c.count))
+            .where(shards_table.c.review_id.in_(counts.keys()))
+            .group_by(shards_table.c.review_id)
+        ).all()
+        
+        for review_id, count in pending:
+            counts[review_id] += int(count)
+        
+        return counts
+    
+    def get_count(self, db: Session, review: Review) -> int:
+        return self.get_counts(db, [review])[review.id]
+    
+    def fold(self, db: Session) -> int:
+        """Parçaları likes_count'a katla ve sil; katlanan yorum sayısını döndür"""
+        
+        folded = 0
+        while True:
+            review_ids = db.execute(
+                select(shards_table.c.review_id)
+                .distinct()
+                .limit(self.FOLD_CHUNK_SIZE)
+            ).scalars().all()
+            
+            if not review_ids:
+                break
+            
+            # Parçaları kilitle: katlama sırasında gelen beğeniler commit'i bekler
+            sums = db.execute(
+                select(shards_table.c.review_id, func.sum(shards_table.c.count))
+                .where(shards_table.c.review_id.in_(review_ids))
+                .group_by(shards_table.c.review_id)
+                .with_for_update()
+            ).all()
+            
+            for review_id, count in sums:
+                if count:
+                    db.execute(
+                        update(reviews_table)
+                        .where(reviews_table.c.id == review_id)
+                        .values(likes_count=reviews_table.c.likes_count + int(count))
+                    )
+            
+            db.execute(delete(shards_table).where(shards_table.c.review_id.in_(review_ids)))
+            db.commit()
+            
+            folded += len(review_ids)
+            if len(review_ids) < self.FOLD_CHUNK_SIZE:
+                break
+        
+        return folded
+    
+    def reconcile_activity_likes(self, db: Session) -> int:
+        """Aktivite beğeni sayaçlarını likes tablosundan yeniden hesapla"""
+        
+        actual = select(func.count(likes_table.c.id))\
+            .where(likes_table.c.activity_id == activities_table.c.id)\
+            .scalar_subquery()
+        
+        result = db.execute(update(activities_table).values(likes_count=actual))
+        db.commit()
+        return result.rowcount
+    
+    def start(self, session_factory, interval_seconds: float):
+        """Periyodik katlama iş parçacığını başlat"""
+        self._task.start(session_factory, interval_seconds)
+    
+    def stop(self, timeout: float = 10.0):
+        self._task.stop(timeout)
+
+
+# Singleton instance
+like_counter = LikeCounterService()
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+    
+    db = SessionLocal()
+    try:
+        folded = like_counter.fold(db)
+        print(f"[OK] {folded} yorumun begeni parcalari likes_count'a katlandi")
+        
+        reconciled = like_counter.reconcile_activity_likes(db)
+        print(f"[OK] {reconciled} aktivitenin begeni sayaci yeniden hesaplandi")
+    finally:
+        db.close()
@@ -0,0 +1,302 @@
+import asyncio
+import codecs
+import csv
+import json
+import httpx
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+from sqlalchemy import select, insert, update, bindparam
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.database import SessionLocal
+from app.models.movie import Movie
+from app.models.rating import Rating
+from app.models.activity import Activity, ActivityType
+from app.services.tmdb_service import tmdb_service
+from app.services.content_stats_service import apply_rating_delta
+from app.services.taste_service import taste_service
+from app.services.user_stats_service import user_stats
+from app.services.library_stats_service import library_stats
+from app.services.catalog_service import save_movie_from_tmdb
+
+
+@dataclass
+class ImportRow:
+    """CSV'den okunan tek puanlama satırı"""
+    line: int
+    title: Optional[str]
+    year: Optional[int]
+    imdb_id: Optional[str]
+    tmdb_id: Optional[int]
+    score: float
+
+
+class RatingImportService:
+    """Harici servis dışa aktarımlarından (CSV) toplu puanlama içe aktarma"""
+    
+    BATCH_SIZE = 500  # Tek seferde eşleştirilip yazılan satır sayısı
+    UPSTREAM_CONCURRENCY = 5  # Aynı anda yapılan TMDb isteği
+    MAX_UPSTREAM_LOOKUPS = 500  # Bir içe aktarmada TMDb'ye sorulacak maksimum satır
+    MAX_REPORTED_UNMATCHED = 50
+    
+    # Farklı servislerin dışa aktarımlarındaki sütun adları
+    COLUMN_ALIASES = {
+        "title": ["title", "name", "film", "movie", "başlık", "baslik"],
+        "year": ["year", "release_year", "release year", "yıl", "yil"],
+        "imdb_id": ["imdb_id", "imdb", "const", "imdb id", "imdbid"],
+        "tmdb_id": ["tmdb_id", "tmdb", "tmdb id", "tmdbid"],
+        "score": ["score", "rating", "your rating", "puan"],
+    }
+    
+    def _resolve_columns(self, fieldnames: List[str]) -> Dict[str, str]:
+        normalized = {name.strip().lower(): name for name in fieldnames if name}
+        columns = {}
+        for key, aliases in self.COLUMN_ALIASES.items():
+            for alias in aliases:
+                if alias in normalized:
+                    columns[key] = normalized[alias]
+                    break
+        return columns
+    
+    def _parse_row(self, line: int, row: Dict[str, str], columns: Dict[str, str], scale: float) -> Optional[ImportRow]:
+        """Satırı doğrula ve puanı 1-10 ölçeğine çevir (geçersizse None)"""
+        
+        def value(key):
+            column = columns.get(key)
+            raw = row.get(column) if column else None
+            return raw.strip() if raw and raw.strip() else None
+        
+        try:
+            score = float(value("score").replace(",", "."))
+            year = int(value("year")[:4]) if value("year") else None
+            tmdb_id = int(value("tmdb_id")) if value("tmdb_id") else None
+        except (AttributeError, ValueError):
+            return None
+        
+        title, imdb_id = value("title"), value("imdb_id")
+        if not (title or imdb_id or tmdb_id) or score <= 0:
+            return None
+        
+        score = round(min(max(score * 10.0 / scale, 1.0), 10.0), 1)
+        return ImportRow(line, title, year, imdb_id, tmdb_id, score)
+    
+    def _match_local(self, rows: List[ImportRow], db: Session) -> Dict[int, int]:
+        """Satırları yerel katalogla toplu eşleştir: satır no -> içerik ID"""
+        
+        tmdb_ids = {row.tmdb_id for row in rows if row.tmdb_id}
+        imdb_ids = {row.imdb_id for row in rows if row.imdb_id}
+        titles = {row.title for row in rows if row.title}
+        
+        by_tmdb, by_imdb, by_title = {}, {}, {}
+        
+        if tmdb_ids:
+            by_tmdb = dict(db.execute(select(Movie.tmdb_id, Movie.id).where(Movie.tmdb_id.in_(tmdb_ids))).all())
+        if imdb_ids:
+            by_imdb = dict(db.execute(select(Movie.imdb_id, Movie.id).where(Movie.imdb_id.in_(imdb_ids))).all())
+        if titles:
+            # Dışa aktarımlar film puanlamasıdır: aynı başlıklı kitaplarla eşleşmesin
+            for title, release, content_id in db.execute(
+                select(Movie.title, Movie.release_date, Movie.id).where(Movie.title.in_(titles))
+            ):
+                by_title.setdefault(title.lower(), []).append((release.year if release else None, content_id))
+        
+        matches = {}
+        for row in rows:
+            content_id = by_tmdb.get(row.tmdb_id) or by_imdb.get(row.imdb_id)
+            if not content_id and row.title:
+                candidates = by_title.get(row.title.lower(), [])
+                exact = [cid for year, cid in candidates if row.year and year == row.year]
+                if exact:
+                    content_id = exact[0]
+                elif len(candidates) == 1 and not row.year:
+                    content_id = candidates[0][1]
+            if content_id:
+                matches[row.line] = content_id
+        
+        return matches
+    
+    async def _lookup_upstream(self, row: ImportRow, semaphore: asyncio.Semaphore) -> Optional[dict]:
+        """Eşleşmeyen satırı TMDb'de ara: (tmdb_id, film verisi); bulunamaz veya TMDb hata verirse None"""
+        
+        async with semaphore:
+            try:
+                tmdb_id = row.tmdb_id
+                if not tmdb_id and row.imdb_id:
+                    tmdb_id = await tmdb_service.find_by_imdb_id(row.imdb_id)
+                if not tmdb_id and row.title:
+                    results = (await tmdb_service.search_movies(row.title, 1, row.year)).get("results", [])
+                    tmdb_id = results[0]["id"] if results else None
+                if not tmdb_id:
+                    return None
+                
+                movie_data = await tmdb_service.get_movie_details(tmdb_id)
+            except httpx.HTTPError:
+                # Tek satırın zaman aşımı/bağlantı hatası tüm içe aktarmayı yarıda kesmesin: eşleşmemiş sayılır
+                return None
+            return {"tmdb_id": tmdb_id, "data": movie_data} if movie_data else None
+    
+    def _save_upstream(self, found: List[dict], db: Session) -> Dict[int, int]:
+        """TMDb'den bulunan filmleri kaydet (varsa mevcut kaydı kullan): tmdb_id -> içerik ID"""
+        
+        tmdb_ids = {item["tmdb_id"] for item in found}
+        existing = dict(db.execute(select(Movie.tmdb_id, Movie.id).where(Movie.tmdb_id.in_(tmdb_ids))).all()) if tmdb_ids else {}
+        
+        for item in found:
+            if item["tmdb_id"] not in existing:
+                existing[item["tmdb_id"]] = save_movie_from_tmdb(item["tmdb_id"], item["data"], db).id
+        
+        return existing
+    
+    def _write_ratings(self, user_id: int, scores: Dict[int, float], overwrite: bool, db: Session) -> Dict[str, int]:
+        """Puanlamaları parça halinde ekle/güncelle"""
+        
+        existing = {
+            content_id: (rating_id, old_score, created_at)
+            for content_id, rating_id, old_score, created_at in db.execute(
+                select(Rating.content_id, Rating.id, Rating.score, Rating.created_at)
+                .where(Rating.user_id == user_id, Rating.content_id.in_(scores.keys()))
+            )
+        }
+        
+        new_rows = [
+            {"user_id": user_id, "content_id": content_id, "score": score}
+            for content_id, score in scores.items()
+            if content_id not in existing
+        ]
+        updated_rows = [
+            {"b_id": existing[content_id][0], "b_score": score}
+            for content_id, score in scores.items()
+            if content_id in existing
+        ] if overwrite else []
+        
+        if new_rows:
+            db.execute(insert(Rating), new_rows)
+            user_stats.change(db, user_id, total_ratings=len(new_rows))
+        if updated_rows:
+            db.execute(
+                update(Rating.__table__)
+                .where(Rating.__table__.c.id == bindparam("b_id"))
+                .values(score=bindparam("b_score")),
+                updated_rows
+            )
+        
+        # Tekil puanlamadaki gibi göreli sayaç güncellemesi: aynı içerikleri eşzamanlı
+        # puanlayan diğer kullanıcıların değişiklikleri ezilmez (sıralı: deadlock olmasın)
+        now = datetime.utcnow()
+        changes = [
+            (row["content_id"], None, row["score"], now) for row in new_rows
+        ] + [
+            (content_id, existing[content_id][1], score, existing[content_id][2])
+            for content_id, score in scores.items()
+            if overwrite and content_id in existing
+        ]
+        for content_id, old_score, new_score, _ in sorted(changes, key=lambda change: change[0]):
+            apply_rating_delta(db, content_id, old_score, new_score)
+        library_stats.ratings_changed(db, user_id, changes)
+        db.commit()
+        
+        return {
+            "imported": len(new_rows),
+            "updated": len(updated_rows),
+            "skipped": len(existing) - len(updated_rows)
+        }
+    
+    def _finish(self, user_id: int, imported: int, db: Session):
+        """İçe aktarma için tek aktivite oluştur"""
+        
+        if imported:
+            db.add(Activity(
+                user_id=user_id,
+                activity_type=ActivityType.RATING,
+                extra_data=json.dumps({"imported": imported})
+            ))
+            db.commit()
+    
+    async def import_csv(
+        self,
+        file,
+        user_id: int,
+        scale: float = 10.0,
+        overwrite: bool = False,
+        upstream: bool = True
+    ) -> AsyncIterator[str]:
+        """CSV'yi akış halinde işle; her partiden sonra NDJSON ilerleme satırı üret"""
+        
+        db = SessionLocal()
+        semaphore = asyncio.Semaphore(self.UPSTREAM_CONCURRENCY)
+        totals = {"processed": 0, "imported": 0, "updated": 0, "skipped": 0, "invalid": 0, "unmatched": 0}
+        unmatched_rows = []
+        written = False
+        upstream_budget = self.MAX_UPSTREAM_LOOKUPS
+        
+        try:
+            reader = csv.DictReader(codecs.iterdecode(file, "utf-8-sig"))
+            fieldnames = await run_in_threadpool(lambda: reader.fieldnames) or []
+            columns = self._resolve_columns(fieldnames)
+            
+            if "score" not in columns or not ({"title", "imdb_id", "tmdb_id"} & columns.keys()):
+                yield json.dumps({"error": "CSV en az puan ve başlık/IMDb/TMDb ID sütunu içermeli", "columns": fieldnames}) + "\n"
+                return
+            
+            while True:
+                raw_rows = await run_in_threadpool(
+                    lambda: [(reader.line_num, row) for _, row in zip(range(self.BATCH_SIZE), reader)]
+                )
+                if not raw_rows:
+                    break
+                
+                rows = []
+                for line, raw in raw_rows:
+                    row = self._parse_row(line, raw, columns, scale)
+                    if row:
+                        rows.append(row)
+                    else:
+                        totals["invalid"] += 1
+                
+                matches = await run_in_threadpool(self._match_local, rows, db)
+                
+                # Yerelde bulunamayanları sınırlı eşzamanlılıkla TMDb'de ara
+                missing = [row for row in rows if row.line not in matches]
+                if upstream and missing and upstream_budget > 0:
+                    lookup = missing[:upstream_budget]
+                    upstream_budget -= len(lookup)
+                    results = await asyncio.gather(*[self._lookup_upstream(row, semaphore) for row in lookup])
+                    found = [item for item in results if item]
+                    if found:
+                        saved = await run_in_threadpool(self._save_upstream, found, db)
+                        for row, item in zip(lookup, results):
+                            if item:
+                                matches[row.line] = saved[item["tmdb_id"]]
+                
+                # Aynı içerik dosyada birden fazla geçerse son satır kazanır
+                scores = {}
+                for row in rows:
+                    if row.line in matches:
+                        scores[matches[row.line]] = row.score
+                    else:
+                        totals["unmatched"] += 1
+                        if len(unmatched_rows) < self.MAX_REPORTED_UNMATCHED:
+                            unmatched_rows.append({"line": row.line, "title": row.title, "year": row.year})
+                
+                if scores:
+                    counts = await run_in_threadpool(self._write_ratings, user_id, scores, overwrite, db)
+                    for key, count in counts.items():
+                        totals[key] += count
+                    written = True
+                
+                totals["processed"] += len(raw_rows)
+                yield json.dumps({"progress": totals}) + "\n"
+            
+            await run_in_threadpool(self._finish, user_id, totals["imported"], db)
+            
+            yield json.dumps({"done": True, "result": totals, "unmatched_rows": unmatched_rows}) + "\n"
+        finally:
+            # Yarıda kesilse bile yazılmış puanlamalar zevk uyumuna yansısın
+            if written:
+                taste_service.invalidate_user(user_id)
+            db.close()
+
+
+# Singleton instance
+rating_import_service = RatingImportService()
@@ -0,0 +1,192 @@
+import numpy as np
+from scipy import sparse
+from typing import List, Optional, Tuple
+from datetime import datetime
+from sqlalchemy import select, delete, insert, func
+from sqlalchemy.orm import Session, aliased
+from app.models.content import Content
+from app.models.rating import Rating
+from app.models.recommendation import ContentNeighbor
+
+
+class RecommendationService:
+    """Item-to-item işbirlikçi filtreleme servisi"""
+    
+    TOP_K = 20  # İçerik başına saklanan komşu sayısı
+    MIN_OVERLAP = 2  # İki içeriği ortak puanlamış minimum kullanıcı sayısı
+    SHRINKAGE = 5.0  # Az ortak puanlamalı benzerlikleri küçültme katsayısı
+    BLOCK_SIZE = 512  # Benzerlik matrisi kaç satırlık bloklarla hesaplanır
+    LIKED_SCORE = 7.0  # Öneri tohumu sayılan minimum puan
+    INSERT_CHUNK_SIZE = 5000
+    
+    def load_rating_matrix(self, db: Session) -> Tuple[Optional[sparse.csr_matrix], np.ndarray]:
+        """Kullanıcı x içerik seyrek matrisini oluştur (kullanıcı ortalaması çıkarılmış)"""
+        
+        rows = db.execute(select(Rating.user_id, Rating.content_id, Rating.score)).all()
+        
+        if not rows:
+            return None, np.empty(0, dtype=np.int64)
+        
+        count = len(rows)
+        user_keys = np.fromiter((row[0] for row in rows), dtype=np.int64, count=count)
+        content_keys = np.fromiter((row[1] for row in rows), dtype=np.int64, count=count)
+        scores = np.fromiter((row[2] for row in rows), dtype=np.float64, count=count)
+        
+        user_ids, user_index = np.unique(user_keys, return_inverse=True)
+        content_ids, content_index = np.unique(content_keys, return_inverse=True)
+        
+        # Adjusted cosine: her puandan kullanıcının ortalamasını çıkar
+        user_means = np.bincount(user_index, weights=scores) / np.bincount(user_index)
+        centered = scores - user_means[user_index]
+        
+        matrix = sparse.csr_matrix(
+            (centered, (user_index, content_index)),
+            shape=(len(user_ids), len(content_ids))
+        )
+        matrix.eliminate_zeros()
+        
+        return matrix, content_ids
+    
+    def compute_neighbors(self, matrix: sparse.csr_matrix, top_k: int = TOP_K) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Her içerik için en benzer top-K içeriği bul (satır, komşu, skor, sıra)"""
+        
+        items = matrix.T.tocsr()
+        
+        # Satırları L2 normuna böl, böylece çarpım doğrudan kosinüs olur
+        norms = np.sqrt(np.asarray(items.multiply(items).sum(axis=1)).ravel())
+        inverse_norms = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        normalized = (sparse.diags(inverse_norms) @ items).tocsr()
+        normalized_t = normalized.T.tocsc()
+        
+        # Ortak puanlayan kullanıcı sayısı (shrinkage ve eşik için)
+        binary = items.copy()
+        binary.data = np.ones_like(binary.data)
+        binary_t = binary.T.tocsc()
+        
+        sources, targets, similarities, ranks = [], [], [], []
+        
+        for start in range(0, items.shape[0], self.BLOCK_SIZE):
+            stop = min(start + self.BLOCK_SIZE, items.shape[0])
+            
+            overlap = (binary[start:stop] @ binary_t).tocsr()
+            overlap.data[overlap.data < self.MIN_OVERLAP] = 0
+            overlap.data = overlap.data / (overlap.data + self.SHRINKAGE)
+            overlap.eliminate_zeros()
+            
+            block = (normalized[start:stop] @ normalized_t).multiply(overlap).tocsr()
+            
+            for offset in range(stop - start):
+                row_start, row_end = block.indptr[offset], block.indptr[offset + 1]
+                columns = block.indices[row_start:row_end]
+                values = block.data[row_start:row_end]
+                
+                # Kendisini ve pozitif olmayan benzerlikleri at
+                keep = (columns != start + offset) & (values > 0)
+                columns, values = columns[keep], values[keep]
+                
+                if columns.size == 0:
+                    continue
+                
+                if columns.size > top_k:
+                    best = np.argpartition(-values, top_k - 1)[:top_k]
+                    columns, values = columns[best], values[best]
+                
+                order = np.argsort(-values, kind="stable")
+                sources.append(np.full(order.size, start + offset, dtype=np.int64))
+                targets.append(columns[order])
+                similarities.append(values[order])
+                ranks.append(np.arange(1, order.size + 1, dtype=np.int64))
+        
+        if not sources:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0, dtype=np.float64), empty
+        
+        return (
+            np.concatenate(sources),
+            np.concatenate(targets),
+            np.concatenate(similarities),
+            np.concatenate(ranks)
+        )
+    
+    def rebuild_neighbors(self, db: Session, top_k: int = TOP_K) -> int:
+        """Komşu tablosunu puanlamalardan yeniden oluştur"""
+        
+        matrix, content_ids = self.load_rating_matrix(db)
+        
+        rows = []
+        if matrix is not None:
+            sources, targets, similarities, ranks = self.compute_neighbors(matrix, top_k)
+            computed_at = datetime.utcnow()
+            rows = [
+                {
+                    "content_id": int(content_ids[source]),
+                    "neighbor_id": int(content_ids[target]),
+                    "similarity": round(float(similarity), 6),
+                    "rank": int(rank),
+                    "computed_at": computed_at
+                }
+                for source, target, similarity, rank in zip(sources, targets, similarities, ranks)
+            ]
+        
+        # Eski komşuları tek transaction içinde yenileriyle değiştir
+        db.execute(delete(ContentNeighbor))
+        for start in range(0, len(rows), self.INSERT_CHUNK_SIZE):
+            db.execute(insert(ContentNeighbor), rows[start:start + self.INSERT_CHUNK_SIZE])
+        db.commit()
+        
+        return len(rows)
+    
+    def get_similar_contents(self, content_id: int, db: Session, limit: int = 10) -> List[Tuple[Content, float]]:
+        """Önceden hesaplanmış benzer içerikleri getir"""
+        
+        return db.query(Content, ContentNeighbor.similarity)\
+            .join(ContentNeighbor, ContentNeighbor.neighbor_id == Content.id)\
+            .filter(ContentNeighbor.content_id == content_id)\
+            .order_by(ContentNeighbor.rank)\
+            .limit(limit)\
+            .all()
+    
+    def get_recommendations(self, user_id: int, db: Session, limit: int = 20) -> List[Tuple[Content, float]]:
+        """Kullanıcının beğendiği içeriklerin komşularından öneri üret"""
+        
+        my_rating = aliased(Rating)
+        
+        strength = select(
+            ContentNeighbor.neighbor_id,
+            func.sum(ContentNeighbor.similarity).label("strength")
+        ).join(
+            Rating,
+            (Rating.content_id == ContentNeighbor.content_id)
+            & (Rating.user_id == user_id)
+            & (Rating.score >= self.LIKED_SCORE)
+        ).outerjoin(
+            my_rating,
+            (my_rating.content_id == ContentNeighbor.neighbor_id)
+            & (my_rating.user_id == user_id)
+        ).where(
+            my_rating.id.is_(None)
+        ).group_by(
+            ContentNeighbor.neighbor_id
+        ).order_by(
+            func.sum(ContentNeighbor.similarity).desc()
+        ).limit(limit).subquery()
+        
+        return db.query(Content, strength.c.strength)\
+            .join(strength, strength.c.neighbor_id == Content.id)\
+            .order_by(strength.c.strength.desc())\
+            .all()
+
+
+# Singleton instance
+recommendation_service = RecommendationService()
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+    
+    db = SessionLocal()
+    try:
+        stored = recommendation_service.rebuild_neighbors(db)
+        print(f"[OK] {stored} komsu kaydi olusturuldu")
+    finally:
+        db.close()
@@ -0,0 +1,84 @@
+import re
+from typing import List, Optional
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session, joinedload
+from app.models.review import Review
+
+
+class ReviewSearchService:
+    """Yorum metinlerinde FULLTEXT indeksli arama"""
+    
+    SNIPPET_LENGTH = 200
+    TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+    
+    def _terms(self, query: str) -> List[str]:
+        return [term.lower() for term in self.TERM_PATTERN.findall(query) if len(term) > 1]
+    
+    def make_snippet(self, text: str, terms: List[str]) -> str:
+        """Metinden ilk eşleşen terimin çevresindeki parçayı kes"""
+        
+        if len(text) <= self.SNIPPET_LENGTH:
+            return text
+        
+        lowered = text.lower()
+        positions = [position for position in (lowered.find(term) for term in terms) if position >= 0]
+        
+        # Eşleşme metnin başına yakınsa baştan, değilse eşleşmeyi ortalayarak kes
+        first = min(positions) if positions else 0
+        start = max(0, min(first - self.SNIPPET_LENGTH // 3, len(text) - self.SNIPPET_LENGTH))
+        end = start + self.SNIPPET_LENGTH
+        
+        # Kelime ortasından kesme
+        if start > 0:
+            space = text.find(" ", start)
+            start = space + 1 if 0 <= space < first else start
+        if end < len(text):
+            space = text.rfind(" ", start, end)
+            end = space if space > start else end
+        
+        return ("…" if start > 0 else "") + text[start:end].strip() + ("…" if end < len(text) else "")
+    
+    def search(
+        self,
+        db: Session,
+        query: str,
+        content_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> List[dict]:
+        """Yorumları ilgi skoruna göre sıralı ara"""
+        
+        relevance = match(Review.text, against=query).in_natural_language_mode()
+        
+        statement = db.query(Review, relevance.label("score"))\
+            .options(joinedload(Review.user), joinedload(Review.content))\
+            .filter(relevance)
+        
+        if content_id is not None:
+            statement = statement.filter(Review.content_id == content_id)
+        if user_id is not None:
+            statement = statement.filter(Review.user_id == user_id)
+        
+        rows = statement.order_by(relevance.desc(), Review.id.desc())\
+            .offset(skip).limit(limit).all()
+        
+        terms = self._terms(query)
+        
+        return [
+            {
+                "id": review.id,
+                "user_id": review.user_id,
+                "username": review.user.username if review.user else "Bilinmeyen",
+                "content_id": review.content_id,
+                "content_title": review.content.title if review.content else None,
+                "snippet": self.make_snippet(review.text, terms),
+                "score": round(float(score), 4),
+                "created_at": review.created_at
+            }
+            for review, score in rows
+        ]
+
+
+# Singleton instance
+review_search_service = ReviewSearchService()
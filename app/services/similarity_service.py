@@ -0,0 +1,274 @@
+import re
+import time
+import zlib
+import threading
+import numpy as np
+from scipy import sparse
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.models.content import Content
+
+
+class ContentSimilarityIndex:
+    """Açıklama ve metadata tabanlı içerik benzerlik indeksi (hashed TF-IDF)"""
+    
+    N_FEATURES = 2 ** 18
+    MIN_TOKEN_LENGTH = 3
+    TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+    
+    # Metadata alanları ve ağırlıkları (film türü ile kitap kategorisi aynı uzayda eşleşir)
+    FIELD_FEATURES = {
+        "genres": ("genre", 2.0),
+        "categories": ("genre", 2.0),
+        "director": ("creator", 3.0),
+        "authors": ("creator", 3.0),
+        "cast": ("cast", 1.0),
+    }
+    
+    QUERY_BUDGET_MS = 50  # Tek sorgu için tarama süresi sınırı
+    SCAN_BLOCK_SIZE = 20000  # Bütçe kontrolü arasındaki satır sayısı
+    BUILD_CHUNK_SIZE = 1000
+    COMPACT_THRESHOLD = 256  # Bu kadar yeni satır birikince ana matrise toplu olarak eklenir
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._matrix = sparse.csr_matrix((0, self.N_FEATURES), dtype=np.float32)
+        self._pending: List[sparse.csr_matrix] = []
+        self._pending_matrix: Optional[sparse.csr_matrix] = None  # Bekleyen satırların birleşik hali (önbellek)
+        self._replay: Optional[List[Tuple[int, Dict[int, float]]]] = None  # Yükleme sürerken eklenenler
+        self._content_ids: List[int] = []
+        self._positions: Dict[int, int] = {}
+        self._document_frequency = np.zeros(self.N_FEATURES, dtype=np.float64)
+        self._documents = 0
+        self.is_built = False
+    
+    def _hash(self, token: str) -> int:
+        return zlib.crc32(token.encode("utf-8")) % self.N_FEATURES
+    
+    def _term_frequencies(self, content: Content) -> Dict[int, float]:
+        """İçeriğin hashlenmiş özellik frekanslarını çıkar"""
+        
+        frequencies: Dict[int, float] = {}
+        
+        text = " ".join(filter(None, [content.title, content.description]))
+        for token in self.TOKEN_PATTERN.findall(text.lower()):
+            if len(token) >= self.MIN_TOKEN_LENGTH and not token.isdigit():
+                index = self._hash(token)
+                frequencies[index] = frequencies.get(index, 0.0) + 1.0
+        
+        # Sublinear TF: uzun açıklamalar metadata'yı bastırmasın
+        for index, count in frequencies.items():
+            frequencies[index] = 1.0 + np.log(count)
+        
+        for field, (prefix, weight) in self.FIELD_FEATURES.items():
+            value = getattr(content, field, None)
+            if not value:
+                continue
+            for part in value.split(","):
+                part = part.strip().lower()
+                if part:
+                    index = self._hash(f"{prefix}:{part}")
+                    frequencies[index] = frequencies.get(index, 0.0) + weight
+        
+        return frequencies
+    
+    def _idf(self, indices: np.ndarray) -> np.ndarray:
+        return np.log((1.0 + self._documents) / (1.0 + self._document_frequency[indices])) + 1.0
+    
+    def _vector(self, frequencies: Dict[int, float]) -> sparse.csr_matrix:
+        """Frekanslardan normalize edilmiş TF-IDF satırı oluştur"""
+        
+        indices = np.fromiter(frequencies.keys(), dtype=np.int64, count=len(frequencies))
+        values = np.fromiter(frequencies.values(), dtype=np.float64, count=len(frequencies))
+        values = values * self._idf(indices)
+        
+        norm = np.linalg.norm(values)
+        if norm > 0:
+            values = values / norm
+        
+        return sparse.csr_matrix(
+            (values.astype(np.float32), indices, np.array([0, len(indices)])),
+            shape=(1, self.N_FEATURES)
+        )
+    
+    def build(self, db: Session) -> int:
+        """Tüm katalogdan indeksi toplu olarak oluştur"""
+        
+        with self._lock:
+            self._replay = []
+        
+        try:
+            return self._build(db)
+        finally:
+            with self._lock:
+                self._replay = None
+    
+    def _build(self, db: Session) -> int:
+        content_ids: List[int] = []
+        row_indices: List[np.ndarray] = []
+        row_values: List[np.ndarray] = []
+        
+        for content in db.query(Content).order_by(Content.id).yield_per(self.BUILD_CHUNK_SIZE):
+            frequencies = self._term_frequencies(content)
+            content_ids.append(content.id)
+            row_indices.append(np.fromiter(frequencies.keys(), dtype=np.int64, count=len(frequencies)))
+            row_values.append(np.fromiter(frequencies.values(), dtype=np.float64, count=len(frequencies)))
+        
+        lengths = np.array([len(indices) for indices in row_indices], dtype=np.int64)
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        indices = np.concatenate(row_indices) if row_indices else np.empty(0, dtype=np.int64)
+        values = np.concatenate(row_values) if row_values else np.empty(0, dtype=np.float64)
+        
+        # IDF ve satır normalizasyonu tamamen vektörel
+        document_frequency = np.bincount(indices, minlength=self.N_FEATURES).astype(np.float64)
+        documents = len(content_ids)
+        values = values * (np.log((1.0 + documents) / (1.0 + document_frequency[indices])) + 1.0)
+        
+        row_of_value = np.repeat(np.arange(documents), lengths)
+        norms = np.sqrt(np.bincount(row_of_value, weights=values ** 2, minlength=documents))
+        values = values / np.where(norms > 0, norms, 1.0)[row_of_value]
+        
+        matrix = sparse.csr_matrix(
+            (values.astype(np.float32), indices, indptr),
+            shape=(documents, self.N_FEATURES)
+        )
+        
+        with self._lock:
+            self._matrix = matrix
+            self._pending = []
+            self._pending_matrix = None
+            self._content_ids = content_ids
+            self._positions = {content_id: row for row, content_id in enumerate(content_ids)}
+            self._document_frequency = document_frequency
+            self._documents = documents
+            self.is_built = True
+            
+            # Katalog okunurken eklenen içerikler yeni indekste kaybolmasın
+            for content_id, frequencies in self._replay:
+                self._append(content_id, frequencies)
+        
+        return documents
+    
+    def build_in_background(self, session_factory) -> threading.Thread:
+        """İndeksi uygulamayı bloklamadan arka planda oluştur"""
+        
+        def run():
+            db = session_factory()
+            try:
+                self.build(db)
+            finally:
+                db.close()
+        
+        thread = threading.Thread(target=run, name="content-similarity-build", daemon=True)
+        thread.start()
+        return thread
+    
+    def add(self, content: Content):
+        """Yeni içe aktarılan içeriği indekse ekle"""
+        
+        frequencies = self._term_frequencies(content)
+        
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((content.id, frequencies))
+            self._append(content.id, frequencies)
+    
+    def _append(self, content_id: int, frequencies: Dict[int, float]):
+        """Satırı bekleyenlere ekle; eşik dolunca ana matrise toplu ekle (kilit tutulurken çağrılır)"""
+        
+        if content_id in self._positions:
+            return
+        
+        indices = np.fromiter(frequencies.keys(), dtype=np.int64, count=len(frequencies))
+        self._document_frequency[indices] += 1.0
+        self._documents += 1
+        
+        self._positions[content_id] = len(self._content_ids)
+        self._content_ids.append(content_id)
+        self._pending.append(self._vector(frequencies))
+        self._pending_matrix = None
+        
+        # Tam kopya her eklemede veya sorguda değil, birkaç yüz eklemede bir yapılır
+        if len(self._pending) >= self.COMPACT_THRESHOLD:
+            self._matrix = sparse.vstack([self._matrix] + self._pending, format="csr")
+            self._pending = []
+    
+    def _pending_rows(self) -> sparse.csr_matrix:
+        """Henüz ana matrise eklenmemiş satırlar (kilit tutulurken çağrılır)"""
+        
+        if self._pending_matrix is None:
+            self._pending_matrix = sparse.vstack(self._pending, format="csr") if self._pending \
+                else sparse.csr_matrix((0, self.N_FEATURES), dtype=np.float32)
+        return self._pending_matrix
+    
+    def _block_scores(self, matrix: sparse.csr_matrix, pending: sparse.csr_matrix, start: int, stop: int, query_t) -> np.ndarray:
+        """[start, stop) satırlarının skorları; aralık ana matris ile bekleyen satırlara bölünebilir"""
+        
+        main_rows = matrix.shape[0]
+        parts = []
+        if start < main_rows:
+            parts.append((matrix[start:min(stop, main_rows)] @ query_t).toarray().ravel())
+        if stop > main_rows:
+            parts.append((pending[max(start, main_rows) - main_rows:stop - main_rows] @ query_t).toarray().ravel())
+        return np.concatenate(parts) if len(parts) > 1 else parts[0]
+    
+    def similar_to(
+        self,
+        content: Content,
+        top_k: int = 10,
+        budget_ms: Optional[float] = None
+    ) -> Tuple[List[Tuple[int, float]], bool]:
+        """En benzer içerikleri döndür; bütçe aşılırsa o ana kadarki en iyi sonuçlar döner"""
+        
+        budget_ms = self.QUERY_BUDGET_MS if budget_ms is None else budget_ms
+        deadline = time.perf_counter() + budget_ms / 1000.0
+        
+        with self._lock:
+            matrix = self._matrix
+            pending = self._pending_rows()
+            content_ids = self._content_ids
+            position = self._positions.get(content.id)
+            if position is None:
+                query = self._vector(self._term_frequencies(content))
+            elif position < matrix.shape[0]:
+                query = matrix[position]
+            else:
+                query = pending[position - matrix.shape[0]]
+        
+        total_rows = matrix.shape[0] + pending.shape[0]
+        
+        query_t = query.T.tocsc()
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        complete = True
+        
+        for start in range(0, total_rows, self.SCAN_BLOCK_SIZE):
+            if start > 0 and time.perf_counter() > deadline:
+                complete = False
+                break
+            
+            stop = min(start + self.SCAN_BLOCK_SIZE, total_rows)
+            scores = self._block_scores(matrix, pending, start, stop, query_t)
+            
+            if position is not None and start <= position < stop:
+                scores[position - start] = 0.0
+            
+            candidates = np.flatnonzero(scores > 0)
+            if candidates.size > top_k:
+                candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+            
+            best_rows = np.concatenate([best_rows, candidates + start])
+            best_scores = np.concatenate([best_scores, scores[candidates]])
+            
+            if best_rows.size > top_k:
+                keep = np.argpartition(-best_scores, top_k - 1)[:top_k]
+                best_rows, best_scores = best_rows[keep], best_scores[keep]
+        
+        order = np.argsort(-best_scores, kind="stable")
+        results = [(content_ids[best_rows[i]], float(best_scores[i])) for i in order]
+        
+        return results, complete
+
+
+# Singleton instance
+content_similarity_index = ContentSimilarityIndex()
@@ -0,0 +1,198 @@
+import itertools
+import threading
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from app.models.rating import Rating
+from app.models.user import User
+from app.utils.cache import TTLCache
+
+# Kullanıcının puanlama vektörü: (sıralı içerik ID'leri, kullanıcı ortalaması çıkarılmış puanlar)
+RatingVector = Tuple[np.ndarray, np.ndarray]
+
+
+class TasteService:
+    """
+    Kullanıcılar arası zevk uyumu servisi
+    
+    Benzer kullanıcı listesi yalnızca kullanıcının kendi puanlamalarıyla geçersiz olur;
+    diğer kullanıcıların puanlamaları listeye en geç SIMILAR_USERS_TTL_SECONDS sonra yansır.
+    """
+    
+    MIN_OVERLAP = 3  # Uyum hesaplamak için minimum ortak puanlama
+    SHRINKAGE = 10.0  # Az ortak puanlamalı uyumları küçültme katsayısı
+    CANDIDATE_LIMIT = 200  # Benzer kullanıcı aramasında değerlendirilen aday sayısı
+    CACHE_SIZE = 10000
+    CACHE_TTL_SECONDS = 600
+    SIMILAR_USERS_TTL_SECONDS = 120  # Komşu listesinin diğer kullanıcıların puanlamalarına göre eskiyebileceği süre
+    
+    def __init__(self):
+        self._vectors = TTLCache(self.CACHE_SIZE, self.CACHE_TTL_SECONDS)
+        self._matches = TTLCache(self.CACHE_SIZE, self.CACHE_TTL_SECONDS)
+        self._similar_users = TTLCache(self.CACHE_SIZE, self.SIMILAR_USERS_TTL_SECONDS)
+        
+        # Sürümler uyum skorlarıyla aynı sürede düşer: sürüm düştüğünde ondan önceki skorlar da düşmüştür
+        self._versions = TTLCache(self.CACHE_SIZE, self.CACHE_TTL_SECONDS)
+        self._version_counter = itertools.count(1)
+        self._lock = threading.Lock()
+    
+    def _version(self, user_id: int) -> int:
+        return self._versions.get(user_id, 0)
+    
+    def invalidate_user(self, user_id: int):
+        """Kullanıcının puanlamaları değişti: vektörünü ve ilgili uyum skorlarını geçersiz kıl"""
+        with self._lock:
+            # Sınır dolunca en eski sürüm süresinden önce atılır; ona bağlı eski skorlar geri dönmesin
+            if len(self._versions) >= self.CACHE_SIZE:
+                self._matches.clear()
+            
+            # Yeni sürümle bu kullanıcıyı içeren tüm çift anahtarları eskir
+            self._versions.set(user_id, next(self._version_counter))
+        self._vectors.pop(user_id)
+        self._similar_users.pop(user_id)
+    
+    def _load_vectors(self, user_ids: List[int], db: Session) -> Dict[int, RatingVector]:
+        """Önbellekte olmayan kullanıcıların vektörlerini tek sorguda yükle"""
+        
+        vectors = {}
+        missing = []
+        for user_id in user_ids:
+            vector = self._vectors.get(user_id)
+            if vector is None:
+                missing.append(user_id)
+            else:
+                vectors[user_id] = vector
+        
+        if missing:
+            rows = db.execute(
+                select(Rating.user_id, Rating.content_id, Rating.score)
+                .where(Rating.user_id.in_(missing))
+                .order_by(Rating.user_id, Rating.content_id)
+            ).all()
+            
+            count = len(rows)
+            users = np.fromiter((row[0] for row in rows), dtype=np.int64, count=count)
+            contents = np.fromiter((row[1] for row in rows), dtype=np.int32, count=count)
+            scores = np.fromiter((row[2] for row in rows), dtype=np.float32, count=count)
+            
+            # Satırlar user_id'ye göre sıralı: kullanıcı sınırlarında böl
+            boundaries = np.flatnonzero(np.diff(users)) + 1
+            starts = np.concatenate([[0], boundaries]).astype(np.int64)
+            ends = np.concatenate([boundaries, [count]]).astype(np.int64)
+            
+            for start, end in zip(starts, ends):
+                if start == end:
+                    continue
+                user_scores = scores[start:end]
+                vector = (contents[start:end], user_scores - user_scores.mean())
+                vectors[int(users[start])] = vector
+                self._vectors.set(int(users[start]), vector)
+            
+            for user_id in missing:
+                if user_id not in vectors:
+                    vector = (np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32))
+                    vectors[user_id] = vector
+                    self._vectors.set(user_id, vector)
+        
+        return vectors
+    
+    def _score(self, dot: np.ndarray, norm_a: np.ndarray, norm_b: np.ndarray, overlap: np.ndarray) -> np.ndarray:
+        """Kosinüs benzerliğini shrinkage ile 0-100 arası uyum skoruna çevir"""
+        denominator = np.sqrt(norm_a * norm_b)
+        cosine = np.divide(dot, denominator, out=np.zeros_like(dot), where=denominator > 0)
+        shrunk = cosine * overlap / (overlap + self.SHRINKAGE)
+        return np.round((shrunk + 1.0) * 50.0, 1)
+    
+    def get_match(self, user_id: int, other_id: int, db: Session) -> Optional[dict]:
+        """İki kullanıcı arasındaki zevk uyumu (ortak puanlama yetersizse None)"""
+        
+        low, high = min(user_id, other_id), max(user_id, other_id)
+        key = (low, self._version(low), high, self._version(high))
+        
+        cached = self._matches.get(key)
+        if cached is not None:
+            return cached or None
+        
+        vectors = self._load_vectors([low, high], db)
+        (ids_a, scores_a), (ids_b, scores_b) = vectors[low], vectors[high]
+        
+        _, index_a, index_b = np.intersect1d(ids_a, ids_b, assume_unique=True, return_indices=True)
+        overlap = index_a.size
+        
+        match = {}
+        if overlap >= self.MIN_OVERLAP:
+            x, y = scores_a[index_a], scores_b[index_b]
+            score = self._score(
+                np.array([np.dot(x, y)]), np.array([np.dot(x, x)]), np.array([np.dot(y, y)]), np.array([overlap])
+            )[0]
+            match = {"score": float(score), "common_ratings": int(overlap)}
+        
+        # Boş sözlük de önbelleğe alınır ki yetersiz ortaklık tekrar hesaplanmasın
+        self._matches.set(key, match)
+        return match or None
+    
+    def get_similar_users(self, user_id: int, db: Session, limit: int = 20) -> List[dict]:
+        """Zevki en çok benzeyen kullanıcılar"""
+        
+        cached = self._similar_users.get(user_id)
+        if cached is not None:
+            return cached[:limit]
+        
+        my_contents = select(Rating.content_id).where(Rating.user_id == user_id)
+        candidates = db.execute(
+            select(Rating.user_id)
+            .where(Rating.content_id.in_(my_contents), Rating.user_id != user_id)
+            .group_by(Rating.user_id)
+            .having(func.count(Rating.id) >= self.MIN_OVERLAP)
+            .order_by(func.count(Rating.id).desc())
+            .limit(self.CANDIDATE_LIMIT)
+        ).scalars().all()
+        
+        results = []
+        if candidates:
+            vectors = self._load_vectors([user_id] + list(candidates), db)
+            my_ids, my_scores = vectors[user_id]
+            
+            # Tüm adayların vektörlerini tek dizide birleştirip benim vektörüme eşle
+            owners = np.concatenate([np.full(vectors[c][0].size, i) for i, c in enumerate(candidates)])
+            other_ids = np.concatenate([vectors[c][0] for c in candidates])
+            other_scores = np.concatenate([vectors[c][1] for c in candidates])
+            
+            positions = np.minimum(np.searchsorted(my_ids, other_ids), my_ids.size - 1)
+            common = my_ids[positions] == other_ids
+            owners, x, y = owners[common], my_scores[positions[common]], other_scores[common]
+            
+            size = len(candidates)
+            overlap = np.bincount(owners, minlength=size).astype(np.float64)
+            scores = self._score(
+                np.bincount(owners, weights=x * y, minlength=size),
+                np.bincount(owners, weights=x * x, minlength=size),
+                np.bincount(owners, weights=y * y, minlength=size),
+                overlap
+            )
+            
+            order = np.argsort(-scores, kind="stable")
+            users = {
+                user.id: user
+                for user in db.query(User).filter(User.id.in_(candidates), User.is_active == True).all()
+            }
+            
+            for i in order:
+                user = users.get(candidates[i])
+                if user is None or overlap[i] < self.MIN_OVERLAP:
+                    continue
+                results.append({
+                    "id": user.id,
+                    "username": user.username,
+                    "avatar_url": user.avatar_url,
+                    "score": float(scores[i]),
+                    "common_ratings": int(overlap[i])
+                })
+        
+        self._similar_users.set(user_id, results)
+        return results[:limit]
+
+
+# Singleton instance
+taste_service = TasteService()
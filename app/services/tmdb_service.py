@@ -12,17 +12,21 @@ class TMDbService:
     def __init__(self):
         self.api_key = settings.TMDB_API_KEY
     
-    async def search_movies(self, query: str, page: int = 1) -> Dict[str, Any]:
+    async def search_movies(self, query: str, page: int = 1, year: Optional[int] = None) -> Dict[str, Any]:
         """Film ara"""
+        params = {
+            "api_key": self.api_key,
+            "query": query,
+            "page": page,
+            "language": "tr-TR"
+        }
+        if year:
+            params["primary_release_year"] = year
+        
         async with httpx.AsyncClient() as client:
             response = await client.get(
                 f"{self.BASE_URL}/search/movie",
-                params={
-                    "api_key": self.api_key,
-                    "query": query,
-                    "page": page,
-                    "language": "tr-TR"
-                }
+                params=params
             )
             
             if response.status_code == 200:
@@ -74,6 +78,23 @@ class TMDbService:
             
             return movie_data
     
+    async def find_by_imdb_id(self, imdb_id: str) -> Optional[int]:
+        """IMDb ID'sine karşılık gelen TMDb film ID'sini bul"""
+        async with httpx.AsyncClient() as client:
+            response = await client.get(
+                f"{self.BASE_URL}/find/{imdb_id}",
+                params={
+                    "api_key": self.api_key,
+                    "external_source": "imdb_id"
+                }
+            )
+            
+            if response.status_code == 200:
+                movies = response.json().get("movie_results", [])
+                if movies:
+                    return movies[0]["id"]
+            return None
+    
     async def get_popular_movies(self, page: int = 1) -> Dict[str, Any]:
         """Popüler filmleri getir"""
         async with httpx.AsyncClient() as client:
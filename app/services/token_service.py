@@ -0,0 +1,256 @@
+import hashlib
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import select, update, delete, or_
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.auth_token import RefreshToken, RevokedToken, PasswordResetToken
+from app.utils.bloom import BloomFilter
+from app.utils.periodic import PeriodicTask
+from app.utils.upsert import insert_ignore
+
+refresh_table = RefreshToken.__table__
+revoked_table = RevokedToken.__table__
+reset_table = PasswordResetToken.__table__
+
+
+def hash_token(raw_token: str) -> str:
+    return hashlib.sha256(raw_token.encode("utf-8")).hexdigest()
+
+
+class RefreshTokenService:
+    """Döndürülen (rotating) refresh token'lar: her kullanımda eskisi iptal edilip yenisi verilir"""
+    
+    def issue(self, db: Session, user_id: int, family_id: Optional[str] = None) -> str:
+        """Yeni refresh token oluştur (commit etmez); ham token yalnızca istemciye döner"""
+        
+        raw_token = secrets.token_urlsafe(32)
+        db.add(RefreshToken(
+            user_id=user_id,
+            token_hash=hash_token(raw_token),
+            family_id=family_id or secrets.token_hex(16),
+            expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        ))
+        return raw_token
+    
+    def rotate(self, db: Session, raw_token: str) -> Tuple[int, str]:
+        """Refresh token'ı kullan: (kullanıcı ID, yeni refresh token)"""
+        
+        invalid = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz veya süresi dolmuş oturum",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+        
+        token = db.query(RefreshToken)\
+            .filter(RefreshToken.token_hash == hash_token(raw_token))\
+            .with_for_update()\
+            .first()
+        
+        if token is None:
+            raise invalid
+        
+        if token.revoked_at is not None:
+            # Daha önce kullanılmış token tekrar geldi: çalınmış olabilir, tüm aileyi iptal et
+            self._revoke(db, RefreshToken.family_id == token.family_id)
+            db.commit()
+            raise invalid
+        
+        if token.expires_at <= datetime.utcnow():
+            db.rollback()
+            raise invalid
+        
+        token.revoked_at = datetime.utcnow()
+        new_token = self.issue(db, token.user_id, token.family_id)
+        db.commit()
+        
+        return token.user_id, new_token
+    
+    def _revoke(self, db: Session, condition) -> int:
+        return db.execute(
+            update(refresh_table)
+            .where(condition, refresh_table.c.revoked_at.is_(None))
+            .values(revoked_at=datetime.utcnow())
+        ).rowcount
+    
+    def revoke_family(self, db: Session, raw_token: str) -> int:
+        """Çıkış: token'ın ailesindeki tüm refresh token'ları iptal et (commit etmez)"""
+        
+        family = select(refresh_table.c.family_id)\
+            .where(refresh_table.c.token_hash == hash_token(raw_token))\
+            .scalar_subquery()
+        return self._revoke(db, refresh_table.c.family_id == family)
+    
+    def revoke_user(self, db: Session, user_id: int) -> int:
+        """Kullanıcının tüm refresh token'larını iptal et (ör. şifre sıfırlamada; commit etmez)"""
+        return self._revoke(db, refresh_table.c.user_id == user_id)
+
+
+class PasswordResetTokenService:
+    """
+    Tek kullanımlık şifre sıfırlama token'ları
+    
+    Token'lar users tablosunda değil, özetleri benzersiz indeksli ayrı bir tabloda tutulur:
+    doğrulama kullanıcı sayısından bağımsız tek indeks aramasıdır. Süresi dolanlar periyodik
+    olarak silinir.
+    """
+    
+    def __init__(self):
+        self._task = PeriodicTask("password-reset-sweeper", self.purge)
+    
+    def issue(self, db: Session, user_id: int) -> str:
+        """Yeni token oluştur, kullanıcının önceki token'larını geçersiz kıl (commit etmez)"""
+        
+        raw_token = secrets.token_urlsafe(32)
+        db.execute(delete(reset_table).where(reset_table.c.user_id == user_id))
+        db.add(PasswordResetToken(
+            user_id=user_id,
+            token_hash=hash_token(raw_token),
+            expires_at=datetime.utcnow() + timedelta(minutes=settings.PASSWORD_RESET_TOKEN_EXPIRE_MINUTES)
+        ))
+        return raw_token
+    
+    def get_user_id(self, db: Session, raw_token: str) -> Optional[int]:
+        """Geçerli token'ın kullanıcısı (yoksa veya süresi dolduysa None)"""
+        
+        return db.execute(
+            select(reset_table.c.user_id)
+            .where(reset_table.c.token_hash == hash_token(raw_token), reset_table.c.expires_at > datetime.utcnow())
+        ).scalar()
+    
+    def consume(self, db: Session, raw_token: str) -> bool:
+        """Token'ı sil; aynı token'la eşzamanlı iki istekten yalnızca biri True alır (commit etmez)"""
+        
+        return db.execute(
+            delete(reset_table)
+            .where(reset_table.c.token_hash == hash_token(raw_token), reset_table.c.expires_at > datetime.utcnow())
+        ).rowcount == 1
+    
+    def purge(self, db: Session) -> int:
+        """Süresi dolmuş token'ları sil"""
+        
+        deleted = db.execute(delete(reset_table).where(reset_table.c.expires_at <= datetime.utcnow())).rowcount
+        db.commit()
+        return deleted
+    
+    def start(self, session_factory, interval_seconds: float):
+        """Periyodik temizleyiciyi başlat"""
+        self._task.start(session_factory, interval_seconds)
+    
+    def stop(self, timeout: float = 10.0):
+        self._task.stop(timeout)
+
+
+class TokenRevocationList:
+    """
+    Süresi dolmadan iptal edilen access token'lar (jti)
+    
+    İstek başına kontrol bellekte yapılır: iptal edilmemiş token'ların neredeyse tamamı
+    Bloom filtresinde elenir, filtre "olabilir" derse kesin kümeye bakılır. Her worker
+    revoked_tokens tablosundan periyodik olarak eşitlenir; kendi iptallerini hemen uygular.
+    """
+    
+    FILTER_CAPACITY = 100000
+    FILTER_ERROR_RATE = 0.001
+    SYNC_OVERLAP_SECONDS = 60  # Geç commit edilen satırlar kaçmasın diye her eşitlemede geriye bakılan süre
+    PURGE_INTERVAL_SECONDS = 3600
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = BloomFilter(self.FILTER_CAPACITY, self.FILTER_ERROR_RATE)
+        self._exact: Dict[str, datetime] = {}  # jti -> token'ın son kullanma zamanı
+        self._synced_at: Optional[datetime] = None
+        self._purged_at = 0.0
+        self._task = PeriodicTask("token-revocation-sync", self.sync)
+    
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        """DB'ye gitmeden iptal kontrolü"""
+        
+        if not jti or jti not in self._filter:
+            return False
+        return jti in self._exact
+    
+    def _add(self, jti: str, expires_at: datetime):
+        with self._lock:
+            if jti not in self._exact:
+                self._filter.add(jti)
+            self._exact[jti] = expires_at
+    
+    def revoke(self, db: Session, jti: str, expires_at: datetime):
+        """Access token'ı iptal et (commit etmez; bu worker'da hemen geçerli olur)"""
+        
+        db.execute(insert_ignore(revoked_table).values(jti=jti, expires_at=expires_at, created_at=datetime.utcnow()))
+        self._add(jti, expires_at)
+    
+    def sync(self, db: Session) -> int:
+        """revoked_tokens tablosundaki yeni iptalleri belleğe al, süresi dolanları at"""
+        
+        now = datetime.utcnow()
+        query = select(revoked_table.c.jti, revoked_table.c.expires_at).where(revoked_table.c.expires_at > now)
+        if self._synced_at is not None:
+            query = query.where(revoked_table.c.created_at >= self._synced_at - timedelta(seconds=self.SYNC_OVERLAP_SECONDS))
+        
+        rows = db.execute(query).all()
+        for jti, expires_at in rows:
+            self._add(jti, expires_at)
+        self._synced_at = now
+        
+        self._expire(now)
+        
+        if time.monotonic() - self._purged_at > self.PURGE_INTERVAL_SECONDS:
+            self.purge(db)
+        
+        return len(rows)
+    
+    def _expire(self, now: datetime):
+        """Süresi dolmuş jti'leri at; filtre silme desteklemediği için gerektiğinde yeniden kur"""
+        
+        with self._lock:
+            self._exact = {jti: expires_at for jti, expires_at in self._exact.items() if expires_at > now}
+            
+            # Filtre doldukça yanlış pozitif oranı artar: kalan kayıtlarla yeniden kur
+            if self._filter.count >= max(self._filter.capacity, 2 * len(self._exact) + 1000):
+                capacity = max(self.FILTER_CAPACITY, 2 * len(self._exact))
+                rebuilt = BloomFilter(capacity, self.FILTER_ERROR_RATE)
+                for jti in self._exact:
+                    rebuilt.add(jti)
+                self._filter = rebuilt
+    
+    def purge(self, db: Session) -> int:
+        """Süresi dolmuş iptal kayıtlarını ve refresh token'ları sil"""
+        
+        now = datetime.utcnow()
+        deleted = db.execute(delete(revoked_table).where(revoked_table.c.expires_at <= now)).rowcount
+        deleted += db.execute(
+            delete(refresh_table).where(or_(
+                refresh_table.c.expires_at <= now,
+                refresh_table.c.revoked_at <= now - timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+            ))
+        ).rowcount
+        db.commit()
+        
+        self._purged_at = time.monotonic()
+        return deleted
+    
+    def start(self, session_factory, interval_seconds: float):
+        """Başlangıçta tüm geçerli iptalleri yükle ve periyodik eşitlemeyi başlat"""
+        
+        db = session_factory()
+        try:
+            self.sync(db)
+        finally:
+            db.close()
+        self._task.start(session_factory, interval_seconds)
+    
+    def stop(self, timeout: float = 10.0):
+        self._task.stop(timeout)
+
+
+# Singleton instances
+refresh_tokens = RefreshTokenService()
+reset_tokens = PasswordResetTokenService()
+revocation_list = TokenRevocationList()
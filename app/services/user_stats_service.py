@@ -0,0 +1,105 @@
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.models.user_stats import UserStats
+from app.models.rating import Rating
+from app.models.review import Review
+from app.models.follow import Follow
+from app.models.library import UserLibrary
+from app.models.custom_list import CustomList
+from app.utils.upsert import insert_ignore
+
+stats_table = UserStats.__table__
+
+
+class UserStatsService:
+    """
+    Kullanıcı başına sayaçlar (puanlama, yorum, takipçi, takip, kütüphane, liste)
+    
+    Sayaçlar yazma işlemiyle aynı transaction içinde göreli olarak güncellenir;
+    profil görüntüleme tek birincil anahtar okumasına iner. Sapmalar reconcile ile onarılır.
+    """
+    
+    # Sayaç sütunu -> (kaynak tablodaki kullanıcı sütunu, sayılan sütun)
+    COUNTERS = {
+        "total_ratings": (Rating.user_id, Rating.id),
+        "total_reviews": (Review.user_id, Review.id),
+        "followers_count": (Follow.followed_id, Follow.id),
+        "following_count": (Follow.follower_id, Follow.id),
+        "library_count": (UserLibrary.user_id, UserLibrary.id),
+        "lists_count": (CustomList.user_id, CustomList.id),
+    }
+    
+    def change(self, db: Session, user_id: int, **deltas: int):
+        """Kullanıcının sayaçlarını göreli olarak güncelle, satır yoksa oluştur (commit etmez)"""
+        self.apply(db, {user_id: deltas})
+    
+    def apply(self, db: Session, changes: Dict[int, Dict[str, int]]):
+        """Birden fazla kullanıcının sayaçlarını güncelle (commit etmez)"""
+        
+        # Satırlar hep aynı sırada kilitlensin: karşılıklı takiplerde deadlock olmasın
+        for user_id in sorted(changes):
+            deltas = {field: delta for field, delta in changes[user_id].items() if delta}
+            if not deltas:
+                continue
+            
+            statement = mysql_insert(stats_table).values(
+                user_id=user_id,
+                updated_at=datetime.utcnow(),
+                **{field: max(delta, 0) for field, delta in deltas.items()}
+            )
+            db.execute(statement.on_duplicate_key_update(
+                updated_at=statement.inserted.updated_at,
+                **{field: stats_table.c[field] + delta for field, delta in deltas.items()}
+            ))
+    
+    def get(self, db: Session, user_id: int) -> Dict[str, int]:
+        """Kullanıcının sayaçları (henüz satırı yoksa sıfırlar)"""
+        
+        stats = db.get(UserStats, user_id)
+        return {field: getattr(stats, field) if stats else 0 for field in self.COUNTERS}
+    
+    def reconcile(self, db: Session, user_ids: Optional[list] = None) -> int:
+        """Sayaçları kaynak tablolardan yeniden hesapla (sapma onarımı); düzeltilen satır sayısı"""
+        
+        # Sayaç satırı olmayan kullanıcılar için sıfır satır aç
+        missing = select(User.id, func.now())
+        if user_ids is not None:
+            missing = missing.where(User.id.in_(user_ids))
+        db.execute(insert_ignore(stats_table).from_select(["user_id", "updated_at"], missing))
+        
+        repaired = 0
+        for field, (owner, counted) in self.COUNTERS.items():
+            actual = select(func.count(counted))\
+                .where(owner == stats_table.c.user_id)\
+                .scalar_subquery()
+            
+            statement = update(stats_table)\
+                .where(stats_table.c[field] != actual)\
+                .values({field: actual, "updated_at": datetime.utcnow()})
+            
+            if user_ids is not None:
+                statement = statement.where(stats_table.c.user_id.in_(user_ids))
+            
+            repaired += db.execute(statement).rowcount
+        
+        db.commit()
+        return repaired
+
+
+# Singleton instance
+user_stats = UserStatsService()
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+    
+    db = SessionLocal()
+    try:
+        repaired = user_stats.reconcile(db)
+        print(f"[OK] {repaired} kullanici sayaci duzeltildi")
+    finally:
+        db.close()
@@ -0,0 +1,38 @@
+import math
+import hashlib
+import numpy as np
+
+
+class BloomFilter:
+    """
+    Sabit boyutlu Bloom filtresi
+    
+    "Kesinlikle yok" cevabı kesindir; "olabilir" cevabı ayrıca kesin bir kümeyle doğrulanmalıdır.
+    """
+    
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self.count = 0
+    
+    def _positions(self, key: str):
+        # Tek özetten iki 64 bitlik değer: çift hash ile k konum (Kirsch-Mitzenmacher)
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+    
+    def add(self, key: str):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+    
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+    
+    @property
+    def nbytes(self) -> int:
+        return self._bits.nbytes
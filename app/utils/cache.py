@@ -0,0 +1,51 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """Boyut sınırlı, süre aşımlı ve thread-safe LRU önbellek"""
+    
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._items: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Süresi dolmamış değeri getir"""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return default
+            
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._items[key]
+                return default
+            
+            self._items.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """Değeri kaydet, gerekirse en eski kaydı at"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._items[key] = (value, time.monotonic() + ttl)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+    
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Değeri önbellekten çıkar"""
+        with self._lock:
+            item = self._items.pop(key, None)
+            return default if item is None else item[0]
+    
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+    
+    def __len__(self) -> int:
+        return len(self._items)
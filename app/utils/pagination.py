@@ -0,0 +1,90 @@
+import json
+import base64
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+# Sonraki sayfanın imleci bu başlıkta döner (liste yanıtlarının şekli değişmesin diye)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any], scope: Optional[str] = None) -> str:
+    """Sıralama anahtarı değerlerini opak bir imlece çevir (scope: imlecin ait olduğu sıralama)"""
+    
+    payload = [{"dt": value.isoformat()} if isinstance(value, datetime) else value for value in values]
+    if scope is not None:
+        payload = {"scope": scope, "values": payload}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, size: int, scope: Optional[str] = None) -> List[Any]:
+    """İmleci sıralama anahtarı değerlerine geri çevir"""
+    
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if scope is not None:
+            # Başka bir sıralamanın imleci farklı türde değerlerle karşılaştırılıp yanlış sayfa döndürmesin
+            if not isinstance(payload, dict) or payload.get("scope") != scope:
+                raise ValueError
+            payload = payload["values"]
+        if not isinstance(payload, list) or len(payload) != size:
+            raise ValueError
+        return [
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for value in payload
+        ]
+    except (ValueError, TypeError, KeyError, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Geçersiz sayfa imleci"
+        )
+
+
+def keyset_condition(columns: Sequence[Any], values: Sequence[Any]):
+    """Azalan sıralamada imleçten sonraki satırlar: (a < x) OR (a = x AND b < y) ..."""
+    
+    conditions = []
+    for index, column in enumerate(columns):
+        equal_prefix = [columns[i] == values[i] for i in range(index)]
+        conditions.append(and_(*equal_prefix, column < values[index]))
+    return or_(*conditions)
+
+
+def keyset_paginate(
+    query: Query,
+    columns: Sequence[Any],
+    cursor: Optional[str],
+    limit: int,
+    key: Optional[Callable[[Any], Sequence[Any]]] = None,
+    scope: Optional[str] = None
+) -> Tuple[list, Optional[str]]:
+    """
+    Sorguyu verilen sütunlara göre azalan sırada imleçle sayfala
+    
+    Son sütun benzersiz olmalıdır (genelde id). OFFSET yerine indeks üzerinde
+    aralık taraması yapıldığı için derin sayfalar da ilk sayfa kadar hızlıdır.
+    Aynı uç nokta birden fazla sıralama sunuyorsa scope imlece yazılır ve
+    başka sıralamanın imleci 400 ile reddedilir.
+    """
+    
+    if cursor:
+        query = query.filter(keyset_condition(columns, decode_cursor(cursor, len(columns), scope)))
+    
+    items = query.order_by(*[column.desc() for column in columns]).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        values = key(last) if key else [getattr(last, column.key) for column in columns]
+        next_cursor = encode_cursor(values, scope)
+    
+    return items, next_cursor
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    """Sonraki sayfa imlecini yanıt başlığına yaz (son sayfada başlık yok)"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,49 @@
+import threading
+from typing import Callable, Optional
+from sqlalchemy.orm import Session
+
+
+class PeriodicTask:
+    """Verilen işi arka plan iş parçacığında belirli aralıklarla, her seferinde yeni bir oturumla çalıştırır"""
+    
+    def __init__(self, name: str, func: Callable[[Session], object], run_on_stop: bool = False):
+        self.name = name
+        self.func = func
+        self.run_on_stop = run_on_stop  # Durdurulurken iş son bir kez çalıştırılsın mı
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def _run_once(self, session_factory):
+        db = session_factory()
+        try:
+            self.func(db)
+        except Exception as e:
+            print(f"[HATA] Arka plan gorevi basarisiz ({self.name}): {e}")
+        finally:
+            db.close()
+    
+    def start(self, session_factory, interval_seconds: float) -> threading.Thread:
+        """İş parçacığını başlat (zaten çalışıyorsa mevcut olanı döndürür)"""
+        
+        if self._thread is not None:
+            return self._thread
+        
+        def run():
+            while not self._stop.wait(interval_seconds):
+                self._run_once(session_factory)
+            if self.run_on_stop:
+                self._run_once(session_factory)
+        
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+        self._thread.start()
+        return self._thread
+    
+    def stop(self, timeout: float = 10.0):
+        """İş parçacığını durdur ve bitmesini bekle"""
+        
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
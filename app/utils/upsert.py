@@ -0,0 +1,12 @@
+from sqlalchemy import insert, Table
+
+
+def insert_ignore(table: Table):
+    """
+    Unique kısıtı ihlal eden satırı hata vermeden atlayan INSERT (MySQL INSERT IGNORE)
+    
+    Satırın eklenip eklenmediği sonucun rowcount değerinden okunur (1: eklendi, 0: atlandı).
+    MySQL bu modda foreign key hatalarını da uyarıya çevirdiğinden, 0 dönerse ilişkili
+    kaydın varlığı ayrıca kontrol edilmelidir.
+    """
+    return insert(table).prefix_with("IGNORE", dialect="mysql")
@@ -0,0 +1,70 @@
+"""
+Bellek içi takip grafiği indeksinin sorgu gecikmesi ve bellek kullanımı
+
+Veritabanına dokunmaz: güç yasası dağılımlı (birkaç çok popüler hesap, çok sayıda
+az takipçili hesap) sentetik bir takip grafiği üretip indekse yükler, ardından
+üyelik, ortak takipçi ve 2 adım sorgularının ortalama süresini mikrosaniye olarak ölçer.
+
+Kullanım:
+    python -m benchmarks.follow_graph_benchmark --users 200000 --edges 5000000
+"""
+import time
+import argparse
+import numpy as np
+from app.services.follow_graph_service import FollowGraphIndex
+
+
+def synthetic_edges(users: int, edges: int, seed: int = 42):
+    """Takip edilenleri Zipf benzeri dağılımdan çeken tekrarsız (takip eden, takip edilen) dizileri"""
+    
+    rng = np.random.default_rng(seed)
+    followers = rng.integers(1, users + 1, size=edges, dtype=np.int64)
+    followed = np.minimum(rng.zipf(1.3, size=edges), users).astype(np.int64)
+    followed = (followed * 7919) % users + 1  # Popüler hesaplar ID uzayına dağılsın
+    
+    keys = np.unique((followers << 32) | followed)
+    keys = keys[(keys >> 32) != (keys & 0xFFFFFFFF)]
+    return keys >> 32, keys & 0xFFFFFFFF
+
+
+def measure(func, pairs) -> float:
+    """Sorgu başına ortalama süre (mikrosaniye)"""
+    started = time.perf_counter()
+    for a, b in pairs:
+        func(a, b)
+    return (time.perf_counter() - started) / len(pairs) * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Takip grafiği indeksi gecikme ve bellek testi")
+    parser.add_argument("--users", type=int, default=200000)
+    parser.add_argument("--edges", type=int, default=5000000)
+    parser.add_argument("--queries", type=int, default=20000)
+    args = parser.parse_args()
+    
+    followers, followed = synthetic_edges(args.users, args.edges)
+    
+    index = FollowGraphIndex()
+    started = time.perf_counter()
+    with index._lock:
+        index._set_edges(followers, followed)
+    print(f"{followers.size} kenar {time.perf_counter() - started:.2f} sn'de yuklendi\n")
+    
+    rng = np.random.default_rng(7)
+    pairs = rng.integers(1, args.users + 1, size=(args.queries, 2)).tolist()
+    
+    print(f"follows                {measure(index.follows, pairs):8.2f} us/sorgu")
+    print(f"mutual_followers       {measure(index.mutual_followers, pairs):8.2f} us/sorgu")
+    print(f"followed_by_following  {measure(index.followed_by_following, pairs):8.2f} us/sorgu")
+    
+    # Bekleyen değişiklikler üzerinden de sorgulanabildiğini ölç
+    for a, b in pairs[:1000]:
+        index.add_edge(a, b)
+    print(f"follows (bekleyenle)   {measure(index.follows, pairs):8.2f} us/sorgu\n")
+    
+    for key, value in index.memory_report().items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
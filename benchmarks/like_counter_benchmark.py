@@ -0,0 +1,106 @@
+"""
+Eşzamanlı yorum beğenisi altında sayaç verimi karşılaştırması
+
+Tek bir popüler yoruma aynı anda gelen beğenileri iki yöntemle yazar:
+- single: reviews.likes_count üzerinde göreli UPDATE (tüm yazarlar tek satırda sıraya girer)
+- sharded: review_like_shards içinde rastgele parçaya göreli upsert
+
+.env içindeki MySQL veritabanına karşı çalışır; geçici bir kullanıcı, içerik ve yorum
+oluşturup sonunda siler.
+
+Kullanım:
+    python -m benchmarks.like_counter_benchmark --threads 32 --likes 200
+"""
+import time
+import argparse
+import threading
+from sqlalchemy import update
+from app.database import SessionLocal
+from app.models.user import User
+from app.models.movie import Movie
+from app.models.review import Review
+from app.services.like_counter_service import like_counter
+
+reviews_table = Review.__table__
+
+
+def single_row_like(db, review_id: int):
+    db.execute(
+        update(reviews_table)
+        .where(reviews_table.c.id == review_id)
+        .values(likes_count=reviews_table.c.likes_count + 1)
+    )
+
+
+def sharded_like(db, review_id: int):
+    like_counter.increment(db, review_id, 1)
+
+
+def run(method, review_id: int, threads: int, likes_per_thread: int, work_ms: float) -> float:
+    """Her iş parçacığı kendi oturumunda beğeni yazar; saniyedeki commit sayısını döndürür"""
+    
+    barrier = threading.Barrier(threads + 1)
+    
+    def worker():
+        db = SessionLocal()
+        try:
+            barrier.wait()
+            for _ in range(likes_per_thread):
+                method(db, review_id)
+                # Aynı transaction'daki diğer işler (beğeni satırı, aktivite...) kilidi bu kadar uzatır
+                if work_ms:
+                    time.sleep(work_ms / 1000.0)
+                db.commit()
+        finally:
+            db.close()
+    
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    
+    return threads * likes_per_thread / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yorum beğeni sayacı verim testi")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--likes", type=int, default=200, help="İş parçacığı başına beğeni")
+    parser.add_argument("--work-ms", type=float, default=2.0, help="Kilit tutulurken yapılan ek iş (ms)")
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    user = User(username=f"bench_{int(time.time())}", email=f"bench_{int(time.time())}@example.com", hashed_password="-")
+    movie = Movie(title="Benchmark")
+    db.add_all([user, movie])
+    db.flush()
+    review = Review(user_id=user.id, content_id=movie.id, text="benchmark")
+    db.add(review)
+    db.commit()
+    
+    try:
+        expected = args.threads * args.likes
+        print(f"{args.threads} is parcacigi x {args.likes} begeni, islem basina {args.work_ms} ms ek is\n")
+        
+        for name, method in (("single", single_row_like), ("sharded", sharded_like)):
+            throughput = run(method, review.id, args.threads, args.likes, args.work_ms)
+            print(f"{name:8s} {throughput:10.0f} begeni/sn")
+        
+        like_counter.fold(db)
+        db.refresh(review)
+        print(f"\n[OK] Toplam sayac: {review.likes_count} (beklenen {2 * expected})")
+    finally:
+        db.delete(review)
+        db.delete(movie)
+        db.delete(user)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Giriş fırtınası altında giriş verimi ve diğer endpoint'lerin gecikmesi
+
+Çalışan bir sunucuya karşı önce boşta /api/feed/global gecikmesini ölçer, ardından
+çok sayıda eşzamanlı girişle (bcrypt) yük bindirirken aynı ölçümü tekrarlar.
+Şifre hashleme süreç havuzunda çalıştığı için fırtına sırasında feed gecikmesi
+boştaki değere yakın kalmalı, havuz dolduğunda girişler 503 + Retry-After almalıdır.
+Karşılaştırma için sunucuyu PASSWORD_HASH_WORKERS=0 ile (bcrypt istek iş parçacığında)
+başlatıp testi tekrarlayın.
+
+Kullanım:
+    uvicorn app.main:app --workers 1
+    python -m benchmarks.login_storm_benchmark --url http://localhost:8000 --threads 64 --seconds 15
+"""
+import time
+import argparse
+import threading
+import statistics
+import httpx
+
+PASSWORD = "benchmark-password"
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000 if values else 0.0
+
+
+def probe(client: httpx.Client, stop: threading.Event, latencies: list):
+    """Kimlik doğrulaması gerektirmeyen endpoint'in gecikmesini sürekli ölç"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        client.get("/api/feed/global", params={"limit": 20})
+        latencies.append(time.perf_counter() - started)
+        time.sleep(0.05)
+
+
+def login_storm(url: str, email: str, threads: int, seconds: float) -> dict:
+    counts = {"ok": 0, "busy": 0, "error": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+    
+    def worker():
+        with httpx.Client(base_url=url, timeout=30) as client:
+            while time.monotonic() < deadline:
+                response = client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+                key = "ok" if response.status_code == 200 else "busy" if response.status_code == 503 else "error"
+                with lock:
+                    counts[key] += 1
+                if response.status_code == 503:
+                    time.sleep(float(response.headers.get("Retry-After", "1")))
+    
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    
+    return counts
+
+
+def measure_probe(url: str, seconds: float, load=None) -> list:
+    latencies = []
+    stop = threading.Event()
+    with httpx.Client(base_url=url, timeout=30) as client:
+        thread = threading.Thread(target=probe, args=(client, stop, latencies))
+        thread.start()
+        result = load() if load else time.sleep(seconds)
+        stop.set()
+        thread.join()
+    return latencies, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Giriş fırtınası testi")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=15.0)
+    args = parser.parse_args()
+    
+    suffix = int(time.time())
+    email = f"bench_{suffix}@example.com"
+    with httpx.Client(base_url=args.url, timeout=30) as client:
+        response = client.post("/api/auth/register", json={
+            "username": f"bench_{suffix}",
+            "email": email,
+            "password": PASSWORD,
+            "password_confirm": PASSWORD
+        })
+        response.raise_for_status()
+    
+    idle, _ = measure_probe(args.url, 5.0)
+    storm, counts = measure_probe(args.url, args.seconds, lambda: login_storm(args.url, email, args.threads, args.seconds))
+    
+    print(f"Giris: {counts['ok'] / args.seconds:.1f} basarili/sn, {counts['busy']} adet 503, {counts['error']} hata\n")
+    print(f"{'feed gecikmesi':16s} {'p50 ms':>8s} {'p99 ms':>8s} {'ort ms':>8s}")
+    for name, values in (("bosta", idle), ("firtinada", storm)):
+        mean = statistics.mean(values) * 1000 if values else 0.0
+        print(f"{name:16s} {percentile(values, 0.5):8.1f} {percentile(values, 0.99):8.1f} {mean:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
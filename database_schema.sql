@@ -27,10 +27,6 @@ CREATE TABLE users (
     is_active BOOLEAN DEFAULT TRUE,
     is_verified BOOLEAN DEFAULT FALSE,
     
-    -- Şifre sıfırlama
-    reset_token VARCHAR(100) NULL,
-    reset_token_expires DATETIME NULL,
-    
     -- Zaman damgaları
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
@@ -57,11 +53,24 @@ CREATE TABLE contents (
     tmdb_id INT NULL,
     google_books_id VARCHAR(50) NULL,
     
-    -- İstatistikler
+    -- İstatistikler (average_rating, rating_sum / total_ratings'ten türetilir)
     average_rating DECIMAL(3, 2) DEFAULT 0.00,
+    rating_sum DOUBLE NOT NULL DEFAULT 0,
     total_ratings INT DEFAULT 0,
     total_reviews INT DEFAULT 0,
     
+    -- Puan dağılımı: her tam puan için bir sayaç (9.5 -> 9, 10 -> 10)
+    rating_count_1 INT NOT NULL DEFAULT 0,
+    rating_count_2 INT NOT NULL DEFAULT 0,
+    rating_count_3 INT NOT NULL DEFAULT 0,
+    rating_count_4 INT NOT NULL DEFAULT 0,
+    rating_count_5 INT NOT NULL DEFAULT 0,
+    rating_count_6 INT NOT NULL DEFAULT 0,
+    rating_count_7 INT NOT NULL DEFAULT 0,
+    rating_count_8 INT NOT NULL DEFAULT 0,
+    rating_count_9 INT NOT NULL DEFAULT 0,
+    rating_count_10 INT NOT NULL DEFAULT 0,
+    
     -- Zaman damgaları
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
@@ -144,9 +153,9 @@ CREATE TABLE ratings (
     -- Bir kullanıcı bir içeriğe sadece bir kez puan verebilir
     UNIQUE KEY unique_user_content_rating (user_id, content_id),
     
-    -- İndeksler
-    INDEX idx_user_id (user_id),
-    INDEX idx_content_id (content_id),
+    -- İndeksler (created_at, id: imleçli sayfalama için)
+    INDEX idx_ratings_user_created (user_id, created_at, id),
+    INDEX idx_ratings_content_created (content_id, created_at, id),
     INDEX idx_score (score)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -172,10 +181,14 @@ CREATE TABLE reviews (
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     FOREIGN KEY (content_id) REFERENCES contents(id) ON DELETE CASCADE,
     
-    -- İndeksler
-    INDEX idx_user_id (user_id),
-    INDEX idx_content_id (content_id),
-    INDEX idx_created_at (created_at)
+    -- İndeksler (created_at, id: imleçli sayfalama için)
+    INDEX idx_reviews_user_created (user_id, created_at, id),
+    INDEX idx_reviews_content_created (content_id, created_at, id),
+    INDEX idx_reviews_content_likes (content_id, likes_count, id),
+    INDEX idx_created_at (created_at),
+    
+    -- Yorum araması için
+    FULLTEXT INDEX idx_reviews_text_fulltext (text)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- ================================================
@@ -248,6 +261,9 @@ CREATE TABLE custom_list_items (
     FOREIGN KEY (list_id) REFERENCES custom_lists(id) ON DELETE CASCADE,
     FOREIGN KEY (content_id) REFERENCES contents(id) ON DELETE CASCADE,
     
+    -- Bir içerik bir listede sadece bir kez bulunabilir
+    UNIQUE KEY unique_list_content (list_id, content_id),
+    
     -- İndeksler
     INDEX idx_list_id (list_id),
     INDEX idx_content_id (content_id),
@@ -274,7 +290,10 @@ CREATE TABLE follows (
     
     -- İndeksler
     INDEX idx_follower_id (follower_id),
-    INDEX idx_followed_id (followed_id)
+    INDEX idx_followed_id (followed_id),
+    -- Takipçi/takip listelerinin imleçli sayfalaması için
+    INDEX idx_follows_followed_created (followed_id, created_at, id),
+    INDEX idx_follows_follower_created (follower_id, created_at, id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- ================================================
@@ -296,6 +315,9 @@ CREATE TABLE activities (
     -- Ek bilgi (JSON formatında ekstra veri saklanabilir)
     extra_data VARCHAR(1000) NULL,
     
+    -- Beğeni sayacı (beğenme/geri almada göreli olarak güncellenir)
+    likes_count INT DEFAULT 0,
+    
     -- Zaman damgası
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     
@@ -314,12 +336,15 @@ CREATE TABLE activities (
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- ================================================
--- 12. LIKES TABLOSU (Beğeniler - Yorumlar için)
+-- 12. LIKES TABLOSU (Beğeniler - Yorumlar ve Aktiviteler için)
 -- ================================================
 CREATE TABLE likes (
     id INT AUTO_INCREMENT PRIMARY KEY,
     user_id INT NOT NULL,
-    review_id INT NOT NULL,
+    
+    -- Ya review ya da activity beğenilir
+    review_id INT NULL,
+    activity_id INT NULL,
     
     -- Zaman damgası
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
@@ -327,13 +352,221 @@ CREATE TABLE likes (
     -- Foreign Keys
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     FOREIGN KEY (review_id) REFERENCES reviews(id) ON DELETE CASCADE,
+    FOREIGN KEY (activity_id) REFERENCES activities(id) ON DELETE CASCADE,
     
-    -- Bir kullanıcı bir yorumu sadece bir kez beğenebilir
+    -- Bir kullanıcı bir yorumu veya aktiviteyi sadece bir kez beğenebilir
     UNIQUE KEY unique_user_review_like (user_id, review_id),
+    UNIQUE KEY unique_user_activity_like (user_id, activity_id),
     
     -- İndeksler
     INDEX idx_user_id (user_id),
-    INDEX idx_review_id (review_id)
+    INDEX idx_review_id (review_id),
+    -- Beğenenler listesinin imleçli sayfalaması için
+    INDEX idx_likes_activity_created (activity_id, created_at, id),
+    INDEX idx_likes_review_created (review_id, created_at, id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ================================================
+-- 13. CONTENT_NEIGHBORS TABLOSU (Benzer İçerikler - Öneriler)
+-- ================================================
+CREATE TABLE content_neighbors (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    content_id INT NOT NULL,
+    neighbor_id INT NOT NULL,
+    
+    -- Benzerlik skoru ve sıra (1 = en benzer)
+    similarity FLOAT NOT NULL,
+    `rank` INT NOT NULL,
+    
+    -- Zaman damgası
+    computed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    
+    -- Foreign Keys
+    FOREIGN KEY (content_id) REFERENCES contents(id) ON DELETE CASCADE,
+    FOREIGN KEY (neighbor_id) REFERENCES contents(id) ON DELETE CASCADE,
+    
+    -- Bir içerik için her komşu sadece bir kez tutulur
+    UNIQUE KEY unique_content_neighbor (content_id, neighbor_id),
+    
+    -- İndeksler
+    INDEX idx_content_neighbors_content_rank (content_id, `rank`),
+    INDEX idx_content_neighbors_neighbor (neighbor_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ================================================
+-- 14. CONTENT_STAT_DELTAS TABLOSU (İstatistik Outbox - Write-Behind)
+-- ================================================
+CREATE TABLE content_stat_deltas (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    
+    -- contents satırı kilitlenmesin diye foreign key yok
+    content_id INT NOT NULL,
+    
+    -- Güncellenecek sayaç sütunu ve değişim
+    field VARCHAR(30) NOT NULL,
+    delta DOUBLE NOT NULL,
+    
+    -- Zaman damgası
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    
+    -- İndeksler
+    INDEX idx_content_stat_deltas_created (created_at),
+    INDEX idx_content_stat_deltas_content (content_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ================================================
+-- 15. REVIEW_LIKE_SHARDS TABLOSU (Parçalı Yorum Beğeni Sayaçları)
+-- ================================================
+CREATE TABLE review_like_shards (
+    review_id INT NOT NULL,
+    shard INT NOT NULL,
+    
+    -- Henüz reviews.likes_count'a katlanmamış değişim (negatif olabilir)
+    count INT NOT NULL DEFAULT 0,
+    
+    PRIMARY KEY (review_id, shard),
+    
+    -- Foreign Keys
+    FOREIGN KEY (review_id) REFERENCES reviews(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ================================================
+-- 16. USER_STATS TABLOSU (Kullanıcı İstatistik Sayaçları)
+-- ================================================
+CREATE TABLE user_stats (
+    user_id INT PRIMARY KEY,
+    
+    -- Yazma işlemleriyle aynı transaction içinde göreli olarak güncellenir
+    total_ratings INT NOT NULL DEFAULT 0,
+    total_reviews INT NOT NULL DEFAULT 0,
+    followers_count INT NOT NULL DEFAULT 0,
+    following_count INT NOT NULL DEFAULT 0,
+    library_count INT NOT NULL DEFAULT 0,
+    lists_count INT NOT NULL DEFAULT 0,
+    
+    -- Zaman damgası
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    
+    -- Foreign Keys
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ================================================
+-- 17. REFRESH_TOKENS TABLOSU (Döndürülen Yenileme Token'ları)
+-- ================================================
+CREATE TABLE refresh_tokens (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    
+    -- Token'ın kendisi değil SHA-256 özeti saklanır
+    token_hash CHAR(64) NOT NULL,
+    
+    -- Aynı girişten dönen token'lar bir aile; kullanılmış token tekrar gelirse aile iptal edilir
+    family_id VARCHAR(32) NOT NULL,
+    
+    -- Zaman damgaları
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    expires_at DATETIME NOT NULL,
+    revoked_at DATETIME NULL,
+    
+    -- Foreign Keys
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    
+    -- İndeksler
+    UNIQUE KEY unique_refresh_token_hash (token_hash),
+    INDEX idx_refresh_tokens_user (user_id),
+    INDEX idx_refresh_tokens_family (family_id),
+    INDEX idx_refresh_tokens_expires (expires_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- ================================================
+-- 18. REVOKED_TOKENS TABLOSU (İptal Edilen Access Token'lar)
+-- ================================================
+CREATE TABLE revoked_tokens (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    jti VARCHAR(32) NOT NULL,
+    
+    -- Token'ın kendi son kullanma zamanı; sonrasında kayıt silinir
+    expires_at DATETIME NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    
+    -- İndeksler
+    UNIQUE KEY unique_revoked_jti (jti),
+    INDEX idx_revoked_tokens_expires (expires_at),
+    INDEX idx_revoked_tokens_created (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- ================================================
+-- 19. EMAIL_OUTBOX TABLOSU (Gönderilmeyi Bekleyen E-postalar)
+-- ================================================
+CREATE TABLE email_outbox (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    recipient VARCHAR(100) NOT NULL,
+    subject VARCHAR(255) NOT NULL,
+    text_body TEXT NOT NULL,
+    html_body TEXT NULL,
+    
+    -- pending: gönderilecek, sent: gönderildi, failed: deneme hakkı bitti
+    status VARCHAR(10) NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    last_error VARCHAR(500) NULL,
+    
+    -- Zaman damgaları
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    next_attempt_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    sent_at DATETIME NULL,
+    
+    -- İndeksler
+    INDEX idx_email_outbox_due (status, next_attempt_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ================================================
+-- 20. PASSWORD_RESET_TOKENS TABLOSU (Şifre Sıfırlama Token'ları)
+-- ================================================
+CREATE TABLE password_reset_tokens (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    
+    -- Token'ın kendisi değil SHA-256 özeti saklanır; doğrulama tek indeks aramasıdır
+    token_hash CHAR(64) NOT NULL,
+    
+    -- Zaman damgaları
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    expires_at DATETIME NOT NULL,
+    
+    -- Foreign Keys
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    
+    -- İndeksler
+    UNIQUE KEY unique_password_reset_token_hash (token_hash),
+    INDEX idx_password_reset_tokens_user (user_id),
+    INDEX idx_password_reset_tokens_expires (expires_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ================================================
+-- 21. USER_LIBRARY_STATS TABLOSU (Kişisel Kütüphane İstatistikleri)
+-- ================================================
+CREATE TABLE user_library_stats (
+    user_id INT NOT NULL,
+    
+    -- status: kütüphane durumu, genre: tür/kategori (izlenen/okunanlar), month: YYYY-MM
+    -- Kova ikili karşılaştırılır: Python'da farklı olan tür adları anahtar çakışmasına yol açmasın
+    dimension VARCHAR(10) NOT NULL,
+    bucket VARCHAR(100) COLLATE utf8mb4_bin NOT NULL,
+    
+    -- Yazma işlemleriyle aynı transaction içinde göreli olarak güncellenir
+    items INT NOT NULL DEFAULT 0,
+    runtime_minutes INT NOT NULL DEFAULT 0,
+    pages INT NOT NULL DEFAULT 0,
+    ratings INT NOT NULL DEFAULT 0,
+    rating_sum FLOAT NOT NULL DEFAULT 0,
+    
+    -- Zaman damgası
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    
+    -- Kullanıcının tüm satırları birincil anahtar üzerinden tek aralık okumasıyla gelir
+    PRIMARY KEY (user_id, dimension, bucket),
+    
+    -- Foreign Keys
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
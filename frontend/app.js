@@ -2,6 +2,8 @@
 const API_BASE_URL = 'http://127.0.0.1:8000/api';
 let currentUser = null;
 let authToken = null;
+let refreshToken = null;
+let refreshPromise = null;
 
 // Utility Functions
 function showToast(message, type = 'success') {
@@ -52,8 +54,45 @@ function getDetailedTimeAgo(dateString) {
     return `${years} yıl önce`;
 }
 
+// Oturum token'larını kaydet
+function saveTokens(data) {
+    authToken = data.access_token;
+    refreshToken = data.refresh_token || null;
+    localStorage.setItem('authToken', authToken);
+    if (refreshToken) {
+        localStorage.setItem('refreshToken', refreshToken);
+    } else {
+        localStorage.removeItem('refreshToken');
+    }
+}
+
+// Access token süresi dolunca refresh token ile yenile (aynı anda tek istek; refresh token her kullanımda değişir)
+async function refreshAccessToken() {
+    if (!refreshToken) {
+        return false;
+    }
+    
+    if (!refreshPromise) {
+        refreshPromise = fetch(`${API_BASE_URL}/auth/refresh`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ refresh_token: refreshToken })
+        }).then(async (response) => {
+            if (!response.ok) {
+                return false;
+            }
+            saveTokens(await response.json());
+            return true;
+        }).catch(() => false).finally(() => {
+            refreshPromise = null;
+        });
+    }
+    
+    return refreshPromise;
+}
+
 // API Functions
-async function apiCall(endpoint, method = 'GET', body = null, useAuth = true) {
+async function apiCall(endpoint, method = 'GET', body = null, useAuth = true, retried = false) {
     const headers = {
         'Content-Type': 'application/json',
     };
@@ -74,13 +113,20 @@ async function apiCall(endpoint, method = 'GET', body = null, useAuth = true) {
     try {
         const response = await fetch(`${API_BASE_URL}${endpoint}`, options);
         
+        // 401 Unauthorized - Access token süresi dolmuşsa bir kez yenileyip tekrar dene
+        if (response.status === 401 && useAuth && !retried && await refreshAccessToken()) {
+            return apiCall(endpoint, method, body, useAuth, true);
+        }
+        
         // 401 Unauthorized - Token geçersiz veya süresi dolmuş
         if (response.status === 401) {
             console.error('Kimlik doğrulanamadı - Token geçersiz');
             // Token'ı temizle ve login sayfasına yönlendir
             authToken = null;
+            refreshToken = null;
             currentUser = null;
             localStorage.removeItem('authToken');
+            localStorage.removeItem('refreshToken');
             localStorage.removeItem('currentUser');
             showToast('Oturum süreniz dolmuş. Lütfen tekrar giriş yapın.', 'error');
             setTimeout(() => showPage('auth'), 2000);
@@ -123,9 +169,8 @@ async function register(username, email, password, passwordConfirm) {
         password_confirm: passwordConfirm
     }, false);
     
-    authToken = data.access_token;
+    saveTokens(data);
     currentUser = data.user;
-    localStorage.setItem('authToken', authToken);
     localStorage.setItem('currentUser', JSON.stringify(currentUser));
     
     return data;
@@ -146,9 +191,8 @@ async function login(email, password) {
         password
     }, false);
     
-    authToken = data.access_token;
+    saveTokens(data);
     currentUser = data.user;
-    localStorage.setItem('authToken', authToken);
     localStorage.setItem('currentUser', JSON.stringify(currentUser));
     
     return data;
@@ -189,9 +233,23 @@ async function resetPassword(token, newPassword, newPasswordConfirm) {
 }
 
 function logout() {
+    // Sunucuda token'ları iptal et (sonucu beklemeden)
+    if (authToken) {
+        fetch(`${API_BASE_URL}/auth/logout`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Authorization': `Bearer ${authToken}`
+            },
+            body: refreshToken ? JSON.stringify({ refresh_token: refreshToken }) : null
+        }).catch(() => {});
+    }
+    
     authToken = null;
+    refreshToken = null;
     currentUser = null;
     localStorage.removeItem('authToken');
+    localStorage.removeItem('refreshToken');
     localStorage.removeItem('currentUser');
     showPage('auth');
 }
@@ -488,6 +546,15 @@ if (typeof window !== 'undefined') {
     });
 }
 
+function parseExtraData(activity) {
+    // extra_data JSON metin olarak gelir (ör. {"status": "watched"} veya toplu işlemlerde {"added": 12})
+    try {
+        return activity.extra_data ? JSON.parse(activity.extra_data) : {};
+    } catch (error) {
+        return {};
+    }
+}
+
 function createFeedPost(activity) {
     // Poster/Kapak görseli
     const posterUrl = activity.content?.cover_image_url || 'https://via.placeholder.com/500x750?text=No+Image';
@@ -514,10 +581,17 @@ function createFeedPost(activity) {
     const contentType = activity.content?.content_type || 'movie';
     const contentTypeText = contentType === 'movie' ? 'film' : 'kitap';
     
+    // Toplu aktiviteler (tek içeriğe bağlı değil): içerik linki yerine özet gösterilir
+    const extraData = parseExtraData(activity);
+    const bulkAdded = !activity.content_id && extraData.added ? extraData.added : null;
+    const bulkImported = !activity.content_id && extraData.imported ? extraData.imported : null;
+    
     const activityTypeConfig = {
         'rating': { 
             icon: '⭐', 
-            text: `<strong>"${contentTitle}"</strong> ${contentTypeText}ini puanladı`, 
+            text: bulkImported
+                ? `<strong>${bulkImported} içerik</strong> puanlamasını içe aktardı`
+                : `<strong>"${contentTitle}"</strong> ${contentTypeText}ini puanladı`, 
             color: '#f59e0b' 
         },
         'review': { 
@@ -527,7 +601,9 @@ function createFeedPost(activity) {
         },
         'library_add': { 
             icon: '📚', 
-            text: `<strong>"${contentTitle}"</strong> ${contentTypeText}ini kütüphanesine ekledi`, 
+            text: bulkAdded
+                ? `<strong>${bulkAdded} içerik</strong> kütüphanesine ekledi`
+                : `<strong>"${contentTitle}"</strong> ${contentTypeText}ini kütüphanesine ekledi`, 
             color: '#6366f1' 
         },
         'list_create': { 
@@ -697,6 +773,11 @@ function createFeedPost(activity) {
                             📝 ${activity.list.name}
                         </a>
                     </div>
+                ` : !activity.content_id ? `
+                    <!-- Toplu Aktivite (İçerik linki yok) -->
+                    <div class="post-title">
+                        <strong style="font-size: 1.1rem;">${config.icon} ${config.text}</strong>
+                    </div>
                 ` : `
                     <!-- Content Title (Tıklanabilir) -->
                     <div class="post-title">
@@ -1657,10 +1738,9 @@ async function removeFromListConfirm(listId, contentId) {
 // Takip Fonksiyonları
 async function checkFollowStatus(username) {
     try {
-        // Kullanıcının takipçilerini kontrol et
-        const followers = await apiCall(`/users/${username}/followers`);
-        const loggedInUser = JSON.parse(localStorage.getItem('currentUser'));
-        const isFollowing = followers.some(f => f.id === loggedInUser?.id);
+        // Profildeki ilişki bilgisini kullan (takipçi listesi sayfalı, tamamı gelmez)
+        const profile = await apiCall(`/users/${username}`);
+        const isFollowing = Boolean(profile.relationship?.you_follow);
         
         if (isFollowing) {
             document.getElementById('unfollow-btn').style.display = 'inline-block';
@@ -2182,6 +2262,7 @@ async function submitReview(contentId) {
 document.addEventListener('DOMContentLoaded', () => {
     // Token ve kullanıcı bilgisini localStorage'dan yükle
     authToken = localStorage.getItem('authToken');
+    refreshToken = localStorage.getItem('refreshToken');
     const savedUser = localStorage.getItem('currentUser');
     if (savedUser) {
         try {